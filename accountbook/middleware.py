@@ -0,0 +1,128 @@
+"""요청별 쿼리 예산·프로파일링 미들웨어.
+
+QueryProfileMiddleware 는 요청마다
+  - connection.execute_wrapper() 로 SQL 실행 수, 총 DB 시간, 가장 느린 SQL 을 재고
+  - 요청 전체 시간에서 DB 시간을 뺀 나머지(뷰 로직 + 템플릿 렌더링)를 app 시간으로 보고
+  - "accountbook.profile" 로거에 한 줄짜리 JSON 으로 남긴다.
+SERVER_TIMING 설정이 켜져 있으면 같은 값을 Server-Timing 헤더로도 보낸다
+(브라우저 개발자 도구 Network → Timing 탭에서 볼 수 있음).
+
+쿼리 예산: QUERY_BUDGETS = {URL 이름: 최대 쿼리 수}. 넘으면 경고 로그를 남기고,
+QUERY_BUDGET_RAISE 가 켜져 있으면(CI) QueryBudgetExceeded 를 일으켜 요청을 실패시킨다.
+스트리밍 응답은 본문을 보내면서 쿼리를 실행하므로 예산 검사에서 제외한다.
+"""
+
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("accountbook.profile")
+
+SLOW_SQL_PREVIEW = 200  # 로그에 남길 가장 느린 SQL 의 최대 글자 수
+
+
+class QueryBudgetExceeded(Exception):
+    """요청 하나가 QUERY_BUDGETS 에 정한 쿼리 수를 넘었을 때 (QUERY_BUDGET_RAISE=True)."""
+
+
+class QueryProfile:
+    """execute_wrapper 로 등록되어 요청 중 실행된 SQL 을 잰다."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = ""
+        self.slowest = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed > self.slowest:
+                self.slowest, self.slowest_sql = elapsed, sql
+
+
+class QueryProfileMiddleware:
+    """동기·비동기 요청 모두 처리한다.
+
+    MIDDLEWARE 맨 앞에 있으므로 동기 전용이면 ASGI 에서 체인 전체가 스레드로 넘어가
+    비동기 뷰(inmoney_gpt_analysis_async)의 이점이 사라진다. get_response 가 코루틴이면
+    __acall__ 로 await 한다.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = QueryProfile()
+        start = time.perf_counter()
+        with self._profiling(profile):
+            response = self.get_response(request)
+        return self._finish(request, response, profile, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        profile = QueryProfile()
+        start = time.perf_counter()
+        with self._profiling(profile):
+            response = await self.get_response(request)
+        return self._finish(request, response, profile, time.perf_counter() - start)
+
+    @staticmethod
+    def _profiling(profile):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+        return stack
+
+    def _finish(self, request, response, profile, total):
+        match = request.resolver_match
+        url_name = match.view_name if match else None
+        budget = getattr(settings, "QUERY_BUDGETS", {}).get(url_name)
+        over_budget = (
+            budget is not None and profile.count > budget and not response.streaming
+        )
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": url_name,
+            "status": response.status_code,
+            "queries": profile.count,
+            "db_ms": round(profile.duration * 1000, 1),
+            "app_ms": round((total - profile.duration) * 1000, 1),
+            "total_ms": round(total * 1000, 1),
+            "slowest_ms": round(profile.slowest * 1000, 1),
+            "slowest_sql": profile.slowest_sql[:SLOW_SQL_PREVIEW],
+        }
+        if budget is not None:
+            record["budget"] = budget
+        logger.log(logging.WARNING if over_budget else logging.INFO, json.dumps(record, ensure_ascii=False))
+
+        if getattr(settings, "SERVER_TIMING", False):
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={record["db_ms"]};desc="{profile.count} queries"',
+                f'app;dur={record["app_ms"]}',
+                f'total;dur={record["total_ms"]}',
+            ])
+
+        if over_budget and getattr(settings, "QUERY_BUDGET_RAISE", False):
+            raise QueryBudgetExceeded(
+                f"{url_name}: 쿼리 {profile.count}회 (예산 {budget}회) — {request.path}"
+            )
+        return response
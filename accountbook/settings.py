@@ -26,6 +26,14 @@ else:
 
 # ── 외부 API ─────────────────────────────────────────
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+GPT_ANALYSIS_CACHE_TTL = int(os.environ.get("GPT_ANALYSIS_CACHE_TTL", 60 * 60 * 24 * 7))  # 초
+GPT_ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get("GPT_ANALYSIS_CACHE_MAX_ENTRIES", 1000))
+# 작업 큐 사용 여부 (기본: 끔 — InMoney 페이지가 GPT 응답을 요청 안에서 기다림).
+# 켜려면 작업을 처리할 `python manage.py run_analysis_jobs` 워커를 상주시켜야 한다
+# (supervisor/systemd 또는 cron 의 --once). 워커 없이 켜면 페이지가 끝나지 않는 작업을 기다린다.
+GPT_ANALYSIS_QUEUE = os.environ.get("GPT_ANALYSIS_QUEUE", "False").lower() in ("true", "1", "yes")
+GPT_ANALYSIS_RATE_LIMIT = int(os.environ.get("GPT_ANALYSIS_RATE_LIMIT", 5))      # 유저별 호출 수
+GPT_ANALYSIS_RATE_WINDOW = int(os.environ.get("GPT_ANALYSIS_RATE_WINDOW", 3600))  # 초
 
 # ── 앱 ───────────────────────────────────────────────
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -46,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "accountbook.middleware.QueryProfileMiddleware",  # 가장 바깥: 세션·인증 쿼리까지 잰다
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -94,6 +103,40 @@ else:
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+# SQLite 는 인덱스 INCLUDE(커버링 컬럼)를 지원하지 않아 Transaction 의
+# tx_user_type_date_idx 가 같은 키의 일반 인덱스로 만들어진다 — 의도한 동작이므로 경고 생략
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
+# ── 쿼리 예산 / 프로파일링 (accountbook/middleware.py) ──
+# 요청 1회에 허용하는 쿼리 수 (URL 이름 기준, 로그인 세션·유저 조회 포함)
+QUERY_BUDGETS = {
+    "home": 4,
+    "dashboard": 6,
+    "inmoney": 10,
+    "transaction_list": 6,
+    "transaction_detail": 5,
+    "account_list": 4,
+    "account_detail": 5,
+    "attachment_download": 3,
+}
+# 예산 초과 시 예외 (기본: 끔 — 경고 로그만). CI 는 워크플로 env 로 켠다
+QUERY_BUDGET_RAISE = os.environ.get("QUERY_BUDGET_RAISE", "False").lower() in ("true", "1", "yes")
+# Server-Timing 응답 헤더 (DB 시간·쿼리 수 노출 — 기본: 개발 모드에서만)
+SERVER_TIMING = os.environ.get("SERVER_TIMING", str(DEBUG)).lower() in ("true", "1", "yes")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        # 요청마다 INFO 한 줄(JSON), 예산 초과는 WARNING
+        "accountbook.profile": {
+            "handlers": ["console"],
+            "level": os.environ.get("QUERY_PROFILE_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
+}
 
 # ── 비밀번호 검증 ─────────────────────────────────────
 AUTH_PASSWORD_VALIDATORS = [
@@ -121,3 +164,10 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# 영수증은 MEDIA_URL 로 공개하지 않고 소유자 확인 뒤 attachment_download 뷰가 보낸다
+# (transactions/serving.py). 파일 바이트 전송을 앞단 서버에 맡기려면:
+#   "x-sendfile"       → X-Sendfile 헤더 (Apache mod_xsendfile 등)
+#   "x-accel-redirect" → X-Accel-Redirect 헤더 (nginx, RECEIPT_ACCEL_PREFIX 를
+#                        MEDIA_ROOT 를 가리키는 internal location 으로 설정)
+RECEIPT_SENDFILE = os.environ.get("RECEIPT_SENDFILE", "").lower()
+RECEIPT_ACCEL_PREFIX = os.environ.get("RECEIPT_ACCEL_PREFIX", "/protected-media/")
@@ -0,0 +1,80 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, Client, override_settings
+
+from transactions.models import Account, Category, Transaction
+from .middleware import QueryBudgetExceeded
+
+
+class QueryProfileMiddlewareTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=1000000,
+        )
+        cat = Category.objects.create(name="식비", cat_type="OUT")
+        for day in range(1, 29):
+            Transaction.objects.create(
+                user=self.user, account=account, category=cat,
+                tx_type="OUT", amount=1000 * day, occurred_at=f"2026-01-{day:02d}",
+            )
+        self.account = account
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        res = self.client.get("/dashboard/")
+        self.assertRegex(
+            res["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+
+    def test_structured_log_per_request(self):
+        with self.assertLogs("accountbook.profile", "INFO") as logs:
+            self.client.get("/transactions/")
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((record["view"], record["status"]), ("transaction_list", 200))
+        self.assertGreater(record["queries"], 0)
+        self.assertIn("SELECT", record["slowest_sql"])
+        self.assertEqual(record["budget"], settings.QUERY_BUDGETS["transaction_list"])
+
+    def test_over_budget_warns_or_raises(self):
+        with override_settings(QUERY_BUDGETS={"dashboard": 1}, QUERY_BUDGET_RAISE=False):
+            with self.assertLogs("accountbook.profile", "WARNING"):
+                self.assertEqual(self.client.get("/dashboard/").status_code, 200)
+        with override_settings(QUERY_BUDGETS={"dashboard": 1}, QUERY_BUDGET_RAISE=True):
+            with self.assertLogs("accountbook.profile", "WARNING"), self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/dashboard/")
+
+    def test_async_capable(self):
+        # ASGI 에서는 비동기 get_response 를 그대로 await 한다 (스레드로 넘기지 않음)
+        from asgiref.sync import async_to_sync, iscoroutinefunction
+        from django.http import HttpResponse
+        from .middleware import QueryProfileMiddleware
+
+        async def get_response(request):
+            return HttpResponse("ok")
+
+        middleware = QueryProfileMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertFalse(iscoroutinefunction(QueryProfileMiddleware(lambda request: None)))
+        request = self.client.get("/").wsgi_request
+        with self.assertLogs("accountbook.profile", "INFO"):
+            response = async_to_sync(middleware)(request)
+        self.assertEqual(response.content, b"ok")
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_pages_stay_within_budget(self):
+        # 예산을 넘으면 미들웨어가 QueryBudgetExceeded 를 일으킨다
+        urls = [
+            "/", "/dashboard/", "/inmoney/", "/transactions/", "/transactions/accounts/",
+            f"/transactions/accounts/{self.account.pk}/",
+            f"/transactions/{Transaction.objects.first().pk}/",
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
@@ -6,10 +6,11 @@
 - /transactions/  → 계좌·거래·정기거래·영수증 CRUD (transactions 앱)
 - /dashboard/     → 대시보드 (dashboard 앱)
 - /inmoney/       → 재무 건강 분석·GPT 분석·목표 관리 (analysis 앱)
+
+미디어(영수증) 파일은 URL 로 직접 공개하지 않는다 — 소유자 확인 뒤
+/transactions/<pk>/attachment/ 가 보낸다 (transactions/serving.py).
 """
 
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
@@ -23,7 +24,3 @@ urlpatterns = [
     path("dashboard/", include("dashboard.urls")),
     path("inmoney/", include("analysis.urls")),
 ]
-
-# 개발 모드에서만 미디어 파일(영수증 이미지 등)을 Django 가 직접 서빙
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,3 +1,12 @@
+"""analysis 앱 Django Admin 설정 — GPT 진단 작업 큐 모니터링."""
+
 from django.contrib import admin
+from .models import AnalysisJob
+
 
-# Register your models here.
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    """GPT 진단 작업 — 상태별 필터, 실패 원인 확인."""
+    list_display = ["user", "status", "cached", "created_at", "started_at", "finished_at"]
+    list_filter = ["status", "cached"]
+    readonly_fields = ["prompt", "analysis", "error"]
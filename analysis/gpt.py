@@ -0,0 +1,140 @@
+"""GPT 재무 진단 요청과 결과 캐시.
+
+같은 모델에 byte 단위로 같은 메시지를 보내면 같은 진단을 받는 것으로 보고,
+(모델, 메시지)의 SHA-256 을 키로 AnalysisCache 테이블에 결과를 보관한다.
+재무 데이터가 바뀌면 data_summary 가 달라지므로 자연히 새 키가 된다.
+
+  - TTL  : settings.GPT_ANALYSIS_CACHE_TTL 초가 지난 결과는 쓰지 않고 지운다
+  - 상한 : settings.GPT_ANALYSIS_CACHE_MAX_ENTRIES 개를 넘으면
+           가장 오래 쓰이지 않은 결과부터 지운다
+
+OpenAI 클라이언트는 호출하는 쪽(views)이 만들어 넘긴다.
+동기 뷰는 OpenAI, 비동기 뷰는 AsyncOpenAI 를 쓰며 요청 형식은 같다.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.timezone import now
+
+from .models import AnalysisCache
+
+GPT_MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.7
+MAX_TOKENS = 2000
+
+SYSTEM_PROMPT = (
+    "당신은 전문 재무 분석가입니다. 인바디(InBody)가 체성분을 분석하듯, "
+    "사용자의 재무 데이터를 종합 분석하여 '재무 건강 진단서'를 작성해주세요.\n\n"
+    "특히 '정기 거래' 데이터를 주의 깊게 분석하세요:\n"
+    "- 정기 수입(월급, 이자 등)은 매달 안정적으로 들어오는 소득입니다.\n"
+    "- 정기 지출(대출이자, 월세, 구독료, 보험료 등)은 매달 빠져나가는 고정 비용입니다.\n"
+    "- 정기 수입 대비 정기 지출 비율이 높으면 가용 소득이 줄어들어 재무 유연성이 떨어집니다.\n"
+    "- 구독료(넷플릭스, 유튜브 프리미엄 등)가 과도하지 않은지도 확인하세요.\n"
+    "- 정기 수입에서 정기 지출을 뺀 '가용 소득'이 변동 지출을 감당할 수 있는지 판단하세요.\n\n"
+    "다음 형식으로 분석해주세요:\n"
+    "1. 재무 건강 종합 등급 (S/A/B/C/D/F 등급과 한 줄 요약)\n"
+    "2. 강점 분석 (잘하고 있는 부분 2~3가지)\n"
+    "3. 약점 분석 (개선이 필요한 부분 2~3가지)\n"
+    "4. 정기 거래 진단 (고정 수입/지출 구조 분석, 구독 서비스 효율성, 가용 소득 평가)\n"
+    "5. 위험 신호 진단 (주의해야 할 사항)\n"
+    "6. 맞춤 실행 조언 (구체적이고 실천 가능한 3~5가지 조언, 정기 거래 최적화 포함)\n"
+    "7. 한 줄 총평\n\n"
+    "한국어로 답변하고, 숫자는 천 단위 쉼표를 사용해주세요. "
+    "분석은 구체적이고 데이터 기반으로 해주세요."
+)
+
+
+def build_messages(data_summary):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": data_summary},
+    ]
+
+
+def cache_key(messages, model=GPT_MODEL):
+    """(모델, 메시지) → 캐시 키 (SHA-256 hex)."""
+    payload = json.dumps([model, messages], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, "GPT_ANALYSIS_CACHE_TTL", 60 * 60 * 24 * 7))
+
+
+def get_cached_analysis(key):
+    """유효한 캐시 결과가 있으면 반환하고 last_used_at 을 갱신한다. 없으면 None."""
+    entry = (
+        AnalysisCache.objects.filter(key=key, created_at__gte=now() - _ttl())
+        .only("pk", "analysis")
+        .first()
+    )
+    if entry is None:
+        return None
+    AnalysisCache.objects.filter(pk=entry.pk).update(last_used_at=now())
+    return entry.analysis
+
+
+def store_analysis(key, analysis, model=GPT_MODEL):
+    """결과를 저장하고 만료·상한 초과 항목을 정리한다."""
+    current = now()
+    AnalysisCache.objects.update_or_create(
+        key=key,
+        defaults={"model": model, "analysis": analysis,
+                  "created_at": current, "last_used_at": current},
+    )
+    AnalysisCache.objects.filter(created_at__lt=current - _ttl()).delete()
+    max_entries = getattr(settings, "GPT_ANALYSIS_CACHE_MAX_ENTRIES", 1000)
+    stale = list(
+        AnalysisCache.objects.order_by("-last_used_at", "-pk")
+        .values_list("pk", flat=True)[max_entries:]
+    )
+    if stale:
+        AnalysisCache.objects.filter(pk__in=stale).delete()
+
+
+def call_model(client, messages):
+    """client(OpenAI)로 모델을 호출해 응답 텍스트를 반환한다. DB 에 접근하지 않는다."""
+    response = client.chat.completions.create(
+        model=GPT_MODEL,
+        messages=messages,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+    )
+    return response.choices[0].message.content
+
+
+def request_analysis(client, data_summary):
+    """캐시에 없으면 client(OpenAI)로 진단을 요청한다. (분석 텍스트, 캐시 적중 여부)"""
+    messages = build_messages(data_summary)
+    key = cache_key(messages)
+    cached = get_cached_analysis(key)
+    if cached is not None:
+        return cached, True
+    analysis = call_model(client, messages)
+    store_analysis(key, analysis)
+    return analysis, False
+
+
+async def arequest_analysis(client, data_summary):
+    """request_analysis 의 비동기판 — client 는 AsyncOpenAI.
+
+    모델 응답을 기다리는 동안 워커 스레드를 점유하지 않는다.
+    """
+    messages = build_messages(data_summary)
+    key = cache_key(messages)
+    cached = await sync_to_async(get_cached_analysis)(key)
+    if cached is not None:
+        return cached, True
+    response = await client.chat.completions.create(
+        model=GPT_MODEL,
+        messages=messages,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+    )
+    analysis = response.choices[0].message.content
+    await sync_to_async(store_analysis)(key, analysis)
+    return analysis, False
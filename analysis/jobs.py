@@ -0,0 +1,168 @@
+"""GPT 재무 진단 작업 큐 (AnalysisJob).
+
+  enqueue_analysis() : 작업 등록 — 같은 진단이 캐시에 있으면 바로 DONE 으로 만든다
+  claim_jobs()       : 실행할 작업을 RUNNING 으로 가져간다 (여러 워커가 동시에 돌아도 안전)
+  process_jobs()     : 모델 호출을 스레드 풀에서 동시에 돌리는 워커 루프 (run_analysis_jobs 커맨드)
+
+유저별 호출 한도: 한 유저의 작업은 동시에 하나만 실행하고,
+GPT_ANALYSIS_RATE_WINDOW 초 동안 실제 모델 호출(캐시 적중 제외)은
+GPT_ANALYSIS_RATE_LIMIT 회까지만 한다. 한도를 넘은 작업은 available_at 을
+가장 오래된 호출이 창을 벗어나는 시각으로 미뤄 대기시킨다.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils.timezone import now
+
+from . import gpt
+from .models import AnalysisJob
+
+# RUNNING 상태로 이 시간 이상 남아 있으면 워커가 죽은 것으로 보고 다시 대기열에 넣는다
+STALE_AFTER = timedelta(minutes=10)
+
+
+def _rate_limit():
+    limit = getattr(settings, "GPT_ANALYSIS_RATE_LIMIT", 5)
+    window = timedelta(seconds=getattr(settings, "GPT_ANALYSIS_RATE_WINDOW", 60 * 60))
+    return limit, window
+
+
+def enqueue_analysis(user, data_summary):
+    """진단 작업을 등록하고 AnalysisJob 을 반환한다.
+
+    같은 데이터로 대기·실행 중인 작업이 있으면 그 작업을 돌려주고,
+    캐시에 결과가 있으면 GPT 호출 없이 완료 상태로 만든다.
+    """
+    existing = (
+        AnalysisJob.objects.filter(
+            user=user, prompt=data_summary,
+            status__in=[AnalysisJob.PENDING, AnalysisJob.RUNNING],
+        )
+        .order_by("pk")
+        .first()
+    )
+    if existing:
+        return existing
+
+    cached = gpt.get_cached_analysis(gpt.cache_key(gpt.build_messages(data_summary)))
+    if cached is not None:
+        current = now()
+        return AnalysisJob.objects.create(
+            user=user, prompt=data_summary, status=AnalysisJob.DONE,
+            analysis=cached, cached=True, started_at=current, finished_at=current,
+        )
+    return AnalysisJob.objects.create(user=user, prompt=data_summary)
+
+
+def _rate_limited_until(user_id, current):
+    """user_id 가 호출 한도에 걸려 있으면 다시 실행할 수 있는 시각, 아니면 None."""
+    limit, window = _rate_limit()
+    recent = list(
+        AnalysisJob.objects.filter(
+            user_id=user_id, cached=False, finished_at__gte=current - window,
+            status__in=[AnalysisJob.DONE, AnalysisJob.FAILED],
+        )
+        .order_by("-finished_at")
+        .values_list("finished_at", flat=True)[:limit]
+    )
+    if len(recent) < limit:
+        return None
+    return recent[-1] + window
+
+
+def requeue_stale_jobs():
+    """워커가 비정상 종료해 RUNNING 으로 남은 작업을 대기열로 되돌린다."""
+    return AnalysisJob.objects.filter(
+        status=AnalysisJob.RUNNING, started_at__lt=now() - STALE_AFTER,
+    ).update(status=AnalysisJob.PENDING, started_at=None)
+
+
+def claim_jobs(limit):
+    """실행 가능한 작업을 최대 limit 건 RUNNING 으로 바꿔 반환한다.
+
+    SKIP LOCKED 를 지원하는 DB 에서는 다른 워커가 보고 있는 작업을 건너뛴다.
+    """
+    current = now()
+    connection = connections[router.db_for_write(AnalysisJob)]
+    with transaction.atomic():
+        qs = AnalysisJob.objects.filter(
+            status=AnalysisJob.PENDING, available_at__lte=current,
+        ).order_by("available_at", "pk")
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        candidates = list(qs[:limit * 4])
+        if not candidates:
+            return []
+
+        busy = set(
+            AnalysisJob.objects.filter(
+                status=AnalysisJob.RUNNING,
+                user_id__in={job.user_id for job in candidates},
+            ).values_list("user_id", flat=True)
+        )
+        claimed = []
+        for job in candidates:
+            if len(claimed) >= limit:
+                break
+            if job.user_id in busy:
+                continue
+            until = _rate_limited_until(job.user_id, current)
+            if until:
+                AnalysisJob.objects.filter(pk=job.pk).update(available_at=until)
+                continue
+            job.status = AnalysisJob.RUNNING
+            job.started_at = current
+            busy.add(job.user_id)
+            claimed.append(job)
+        AnalysisJob.objects.bulk_update(claimed, ["status", "started_at"])
+    return claimed
+
+
+def _finish(job, **fields):
+    AnalysisJob.objects.filter(pk=job.pk).update(finished_at=now(), **fields)
+
+
+def process_jobs(client, threads=4, once=False, poll_interval=2.0):
+    """작업을 동시에 최대 threads 건 처리한다. 처리한 작업 수를 반환한다.
+
+    오래 걸리는 모델 호출만 스레드 풀에서 돌리고, 작업 가져오기·캐시 조회·결과 저장 등
+    DB 작업은 이 루프(한 연결)에서 한다. once=True 이면 지금 실행 가능한 작업이
+    모두 끝났을 때 종료한다.
+    """
+    processed = 0
+    running = {}  # future → (job, 캐시 키)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        while True:
+            requeue_stale_jobs()
+            free = threads - len(running)
+            for job in claim_jobs(free) if free else []:
+                messages = gpt.build_messages(job.prompt)
+                key = gpt.cache_key(messages)
+                cached = gpt.get_cached_analysis(key)
+                if cached is not None:
+                    _finish(job, status=AnalysisJob.DONE, analysis=cached, cached=True)
+                    processed += 1
+                    continue
+                running[pool.submit(gpt.call_model, client, messages)] = (job, key)
+
+            if not running:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+            done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, key = running.pop(future)
+                try:
+                    analysis = future.result()
+                except Exception as e:
+                    _finish(job, status=AnalysisJob.FAILED, error=str(e))
+                else:
+                    gpt.store_analysis(key, analysis)
+                    _finish(job, status=AnalysisJob.DONE, analysis=analysis, cached=False)
+                processed += 1
+    return processed
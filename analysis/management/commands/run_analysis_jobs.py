@@ -0,0 +1,42 @@
+"""GPT 재무 진단 작업 워커 커맨드.
+
+사용법:
+  python manage.py run_analysis_jobs               # 계속 실행 (supervisor/systemd 등으로 상주)
+  python manage.py run_analysis_jobs --threads 8   # 동시에 8건까지 GPT 호출
+  python manage.py run_analysis_jobs --once        # 지금 대기 중인 작업만 처리하고 종료 (cron)
+
+InMoney 페이지의 '최종 분석' 버튼은 작업을 등록만 하고 바로 응답하며,
+이 워커가 작업을 처리하는 동안 페이지는 상태 조회 API 를 폴링한다.
+유저별 호출 한도는 settings.GPT_ANALYSIS_RATE_LIMIT / GPT_ANALYSIS_RATE_WINDOW.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from openai import OpenAI
+
+from analysis.jobs import process_jobs
+
+
+class Command(BaseCommand):
+    help = "대기 중인 GPT 재무 진단 작업을 스레드 풀로 처리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4, help="동시 처리 작업 수 (기본: 4)")
+        parser.add_argument("--once", action="store_true", help="대기 작업을 모두 처리하면 종료")
+        parser.add_argument(
+            "--poll-interval", type=float, default=2.0,
+            help="대기 작업이 없을 때 다시 확인하는 간격(초) (기본: 2)",
+        )
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1:
+            raise CommandError("--threads 는 1 이상이어야 합니다.")
+
+        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        processed = process_jobs(
+            client,
+            threads=options["threads"],
+            once=options["once"],
+            poll_interval=options["poll_interval"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"완료: 작업 {processed}건 처리"))
@@ -0,0 +1,414 @@
+"""InMoney 재무 지표 집계 엔진.
+
+inmoney_view 가 섹션마다 따로 실행하던 약 40개의 aggregate 쿼리를
+소수의 그룹 쿼리로 대체한다.
+
+  ① 버킷 쿼리 : (월, 입출금, 카테고리, 계좌, 월초/월말) 단위로
+                합계·건수·충동소비 건수를 한 번에 집계한다. 카테고리 이름과
+                만족 소비 여부는 JOIN 대신 카테고리 레지스트리(transactions.categories)에서 읽는다.
+                월별 추이·카테고리·만족 소비·계좌·분기·목표 사용률은
+                모두 이 버킷을 파이썬에서 다시 접어 계산한다.
+  ② 소액 지출 쿼리 : 평균 지출액(①에서 계산)의 20% 이하 지출을 월별로 집계
+  ③ 반복 지출 쿼리 : 같은 가맹점·금액으로 3회 이상 반복된 지출
+
+여기에 정기 거래·계좌 목록·목표 조회가 각 1회씩 더해져
+거래 수와 무관하게 고정된 쿼리 수로 모든 지표를 만든다.
+
+get_inmoney_metrics() 는 계산 결과를 요청 객체와 캐시에 보관해
+InMoney 페이지와 GPT 분석 API 가 같은 지표를 다시 집계하지 않도록 한다.
+캐시는 유저 데이터 버전 스탬프(transactions.versioning)로 무효화되므로
+데이터가 그대로인 재방문은 캐시 조회 한 번으로 끝난다.
+"""
+
+from statistics import stdev, mean
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, Count, Q, Sum, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils.timezone import now
+
+from transactions import categories, dates, versioning
+from transactions.models import Transaction, Account, RecurringTransaction, Goal
+
+METRICS_CACHE_TIMEOUT = 60 * 60 * 24  # 무효화는 데이터 버전 스탬프가 담당
+
+
+def _bucket_rows(all_tx):
+    """① 버킷 쿼리 — 월·입출금·카테고리·계좌·월초 여부 단위 합계."""
+    return (
+        all_tx.annotate(
+            month=TruncMonth("occurred_at"),
+            early=Case(
+                When(occurred_at__day__lte=15, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+        .values(
+            "month", "tx_type", "early",
+            "category_id", "account__name",
+        )
+        .annotate(
+            total=Sum("amount"),
+            count=Count("id"),
+            impulse=Count("id", filter=Q(memo="", merchant="")),
+        )
+        .order_by()
+    )
+
+
+def compute_inmoney_metrics(user, today=None):
+    """유저의 InMoney 12개 섹션 지표를 계산해 dict 로 반환한다.
+
+    반환값은 CSS 차트용 가공 전의 원본 지표이며,
+    기존 inmoney_view 의 계산 결과와 동일하다.
+    """
+    today = today or now().date()
+    all_tx = Transaction.objects.filter(user=user)
+
+    # ── 버킷 집계 ──
+    total_income = 0
+    total_expense = 0
+    early_expense = 0
+    late_expense = 0
+    satisfaction_expense = 0
+    expense_count = 0
+    impulse_count = 0
+    month_income = {}
+    month_expense = {}
+    month_satisfaction = {}
+    category_totals = {}
+    account_expense = {}
+    account_income_count = {}
+    quarter_totals = {}
+
+    satisfaction_ids = categories.satisfaction_ids()
+    for row in _bucket_rows(all_tx):
+        total = row["total"] or 0
+        key = (row["month"].year, row["month"].month)
+        if row["tx_type"] == "IN":
+            total_income += total
+            month_income[key] = month_income.get(key, 0) + total
+            name = row["account__name"]
+            account_income_count[name] = account_income_count.get(name, 0) + row["count"]
+            continue
+
+        total_expense += total
+        expense_count += row["count"]
+        impulse_count += row["impulse"]
+        month_expense[key] = month_expense.get(key, 0) + total
+        if row["early"]:
+            early_expense += total
+        else:
+            late_expense += total
+
+        category = categories.get_category(row["category_id"])
+        if category is not None:
+            category_totals[category.name] = category_totals.get(category.name, 0) + total
+        if row["category_id"] in satisfaction_ids:
+            satisfaction_expense += total
+            month_satisfaction[key] = month_satisfaction.get(key, 0) + total
+
+        acc = account_expense.setdefault(row["account__name"], {"total": 0, "count": 0})
+        acc["total"] += total
+        acc["count"] += row["count"]
+
+        quarter = (key[0], (key[1] - 1) // 3 + 1)
+        quarter_totals[quarter] = quarter_totals.get(quarter, 0) + total
+
+    net = total_income - total_expense
+    spending_rate = (total_expense / total_income * 100) if total_income > 0 else 0
+
+    # ── 1. 수입·지출 구조 ──
+    recurring = list(
+        RecurringTransaction.objects.filter(user=user, is_active=True).values(
+            "tx_type", "merchant", "memo", "amount", "recurring_day", "category_id"
+        )
+    )
+    for r in recurring:
+        category = categories.get_category(r.pop("category_id"))
+        r["category__name"] = category.name if category else None
+    recurring_income_list = [r for r in recurring if r["tx_type"] == "IN"]
+    recurring_expense_list = [r for r in recurring if r["tx_type"] == "OUT"]
+    recurring_in_total = sum(r["amount"] for r in recurring_income_list)
+    recurring_total = sum(r["amount"] for r in recurring_expense_list)
+
+    fixed_ratio = (recurring_total / total_expense * 100) if total_expense > 0 else 0
+    variable_ratio = 100 - fixed_ratio if total_expense > 0 else 0
+
+    # ── 2. 저축·잔여 자금 ──
+    monthly = []
+    for y, m in dates.recent_months(today):
+        income = month_income.get((y, m), 0)
+        expense = month_expense.get((y, m), 0)
+        # 현재 월인데 데이터가 전혀 없으면 제외
+        if y == today.year and m == today.month and income == 0 and expense == 0:
+            continue
+        monthly.append({
+            "label": f"{y}-{m:02d}",
+            "income": income,
+            "expense": expense,
+            "saving": income - expense,
+        })
+
+    saving_rate = (net / total_income * 100) if total_income > 0 else 0
+    savings_list = [m["saving"] for m in monthly]
+    saving_volatility = stdev(savings_list) if len(savings_list) >= 2 else 0
+
+    # ── 3. 현금 체력 ──
+    accounts = list(Account.objects.filter(user=user).values("name", "balance", "is_active"))
+    account_balances = [
+        {"name": a["name"], "balance": a["balance"]} for a in accounts if a["is_active"]
+    ]
+    total_assets = sum(a["balance"] for a in account_balances)
+
+    expense_months = [m["expense"] for m in monthly if m["expense"] > 0]
+    avg_monthly_expense = mean(expense_months) if expense_months else 0
+    cash_endurance_months = (
+        total_assets / avg_monthly_expense if avg_monthly_expense > 0 else 0
+    )
+
+    # ── 4. 소비 패턴·리듬 ──
+    monthly_expenses = [m["expense"] for m in monthly]
+    expense_volatility = stdev(monthly_expenses) if len(monthly_expenses) >= 2 else 0
+
+    total_for_split = early_expense + late_expense
+    early_ratio = (early_expense / total_for_split * 100) if total_for_split > 0 else 50
+    late_ratio = (late_expense / total_for_split * 100) if total_for_split > 0 else 50
+
+    # ── 5. 카테고리 소비 ──
+    category_data = sorted(
+        ({"category__name": name, "total": total} for name, total in category_totals.items()),
+        key=lambda c: -c["total"],
+    )
+    category_labels = [c["category__name"] for c in category_data]
+    category_values = [c["total"] for c in category_data]
+    top_categories = category_data[:5]
+
+    # ── 6. 만족 소비 ──
+    satisfaction_ratio = (
+        satisfaction_expense / total_expense * 100 if total_expense > 0 else 0
+    )
+    satisfaction_monthly = []
+    for m in monthly:
+        y, mo = map(int, m["label"].split("-"))
+        satisfaction_monthly.append({
+            "label": m["label"],
+            "amount": month_satisfaction.get((y, mo), 0),
+        })
+
+    # ── 7. 안정성·위험 신호 ──
+    warnings = []
+    if any(a["balance"] <= 0 for a in accounts):
+        warnings.append("계좌 잔액이 0 이하인 계좌가 있습니다.")
+
+    consecutive_deficit = 0
+    max_consecutive_deficit = 0
+    for m in monthly:
+        if m["saving"] < 0:
+            consecutive_deficit += 1
+            max_consecutive_deficit = max(max_consecutive_deficit, consecutive_deficit)
+        else:
+            consecutive_deficit = 0
+    if max_consecutive_deficit >= 2:
+        warnings.append(f"연속 {max_consecutive_deficit}개월 적자가 발생했습니다.")
+
+    if fixed_ratio > 50:
+        warnings.append(f"고정비 비중이 {fixed_ratio:.0f}%로 높습니다.")
+
+    recent_savings = savings_list[-3:] if len(savings_list) >= 3 else savings_list
+    if recent_savings and all(s <= 0 for s in recent_savings):
+        warnings.append("최근 저축이 중단되었습니다.")
+
+    # ── 8. 계좌 관리 ──
+    account_expense_data = sorted(
+        (
+            {"account__name": name, "total": v["total"], "count": v["count"]}
+            for name, v in account_expense.items()
+        ),
+        key=lambda a: -a["total"],
+    )
+    account_freq = {}
+    for item in account_expense_data:
+        name = item["account__name"]
+        account_freq[name] = account_freq.get(name, 0) + item["count"]
+    for name, count in account_income_count.items():
+        account_freq[name] = account_freq.get(name, 0) + count
+
+    # ── 9. 습관·행동 ──
+    repeat_spending = list(
+        all_tx.filter(tx_type="OUT")
+        .exclude(merchant="")
+        .values("merchant", "amount")
+        .annotate(count=Count("id"))
+        .filter(count__gte=3)
+        .order_by("-count")
+    )
+
+    avg_expense_amount = total_expense / expense_count if expense_count > 0 else 0
+    small_threshold = avg_expense_amount * 0.2 if avg_expense_amount > 0 else 0
+    small_spending_total = 0
+    small_spending_count = 0
+    small_by_month = {}
+    if small_threshold > 0:
+        small_rows = (
+            all_tx.filter(tx_type="OUT", amount__lte=small_threshold)
+            .annotate(month=TruncMonth("occurred_at"))
+            .values("month")
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        for row in small_rows:
+            small_spending_total += row["total"] or 0
+            small_spending_count += row["count"]
+            small_by_month[(row["month"].year, row["month"].month)] = row["total"] or 0
+
+    impulse_ratio = (impulse_count / expense_count * 100) if expense_count > 0 else 0
+
+    small_monthly = []
+    for m in monthly:
+        y, mo = map(int, m["label"].split("-"))
+        small_monthly.append({"label": m["label"], "amount": small_by_month.get((y, mo), 0)})
+
+    # ── 10. 시간 기반 ──
+    quarter_labels = []
+    quarter_values = []
+    for (y, q), total in sorted(quarter_totals.items()):
+        quarter_labels.append(f"{y}년 {q}분기")
+        quarter_values.append(total)
+
+    recent_months = monthly[-3:]
+    change_rates = []
+    for i in range(1, len(recent_months)):
+        prev = recent_months[i - 1]["expense"]
+        curr = recent_months[i]["expense"]
+        rate = round((curr - prev) / prev * 100, 1) if prev > 0 else 0
+        change_rates.append({
+            "label": f"{recent_months[i-1]['label']} → {recent_months[i]['label']}",
+            "rate": rate,
+        })
+
+    # ── 11. 목표 관리 ──
+    goal = Goal.objects.filter(user=user).first()
+    saving_achievement = 0
+    spending_usage = 0
+    if goal:
+        if goal.target_saving > 0:
+            saving_achievement = min(net / goal.target_saving * 100, 100) if net > 0 else 0
+        current_month_expense = month_expense.get((today.year, today.month), 0)
+        if goal.monthly_spending_limit > 0:
+            spending_usage = current_month_expense / goal.monthly_spending_limit * 100
+
+    # ── 12. 종합 지표 ──
+    hhi = 0
+    if category_values and total_expense > 0:
+        shares = [(v / total_expense) ** 2 for v in category_values]
+        hhi = sum(shares) * 10000
+
+    score = 50
+    if saving_rate > 20:
+        score += 15
+    elif saving_rate > 10:
+        score += 10
+    elif saving_rate > 0:
+        score += 5
+
+    if cash_endurance_months >= 6:
+        score += 15
+    elif cash_endurance_months >= 3:
+        score += 10
+    elif cash_endurance_months >= 1:
+        score += 5
+
+    if fixed_ratio <= 30:
+        score += 10
+    elif fixed_ratio <= 50:
+        score += 5
+
+    if len(warnings) == 0:
+        score += 10
+    elif len(warnings) <= 1:
+        score += 5
+
+    score = max(0, min(100, score))
+    balance_index = saving_rate - spending_rate if total_income > 0 else 0
+
+    return {
+        "today": today,
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "net": net,
+        "spending_rate": spending_rate,
+        "recurring_total": recurring_total,
+        "recurring_in_total": recurring_in_total,
+        "recurring_income_list": recurring_income_list,
+        "recurring_expense_list": recurring_expense_list,
+        "fixed_ratio": fixed_ratio,
+        "variable_ratio": variable_ratio,
+        "monthly": monthly,
+        "saving_rate": saving_rate,
+        "saving_volatility": saving_volatility,
+        "total_assets": total_assets,
+        "avg_monthly_expense": avg_monthly_expense,
+        "cash_endurance_months": cash_endurance_months,
+        "expense_volatility": expense_volatility,
+        "early_ratio": early_ratio,
+        "late_ratio": late_ratio,
+        "category_data": category_data,
+        "category_labels": category_labels,
+        "category_values": category_values,
+        "top_categories": top_categories,
+        "satisfaction_expense": satisfaction_expense,
+        "satisfaction_ratio": satisfaction_ratio,
+        "satisfaction_monthly": satisfaction_monthly,
+        "warnings": warnings,
+        "account_balances": account_balances,
+        "account_expense_data": account_expense_data,
+        "account_freq": account_freq,
+        "repeat_spending": repeat_spending,
+        "small_spending_total": small_spending_total,
+        "small_spending_count": small_spending_count,
+        "impulse_ratio": impulse_ratio,
+        "small_monthly": small_monthly,
+        "quarter_labels": quarter_labels,
+        "quarter_values": quarter_values,
+        "change_rates": change_rates,
+        "goal": goal,
+        "saving_achievement": saving_achievement,
+        "spending_usage": spending_usage,
+        "hhi": hhi,
+        "financial_score": score,
+        "balance_index": balance_index,
+    }
+
+
+def _metrics_cache_key(user_id):
+    return f"inmoney:metrics:{user_id}"
+
+
+def get_inmoney_metrics(request):
+    """요청 유저의 InMoney 지표를 반환한다 (요청·캐시 단위 메모이즈).
+
+    캐시 항목은 계산 당시의 데이터 버전 스탬프·날짜와 함께 저장된다.
+    지표 + 스탬프를 get_many 한 번으로 읽어 스탬프와 날짜가 그대로면 재사용하고,
+    거래·계좌·정기 거래·목표·카테고리가 바뀌었거나 날짜가 넘어갔으면 다시 계산한다.
+    """
+    metrics = getattr(request, "_inmoney_metrics", None)
+    if metrics is not None:
+        return metrics
+
+    user_id = request.user.pk
+    key = _metrics_cache_key(user_id)
+    today = now().date()
+    found = cache.get_many([key, *versioning.version_keys(user_id)])
+    versions = versioning.current_versions(user_id, found)
+
+    entry = found.get(key)
+    if entry and entry["versions"] == versions and entry["today"] == today:
+        metrics = entry["metrics"]
+    else:
+        metrics = compute_inmoney_metrics(request.user, today=today)
+        cache.set(key, {"versions": versions, "today": today, "metrics": metrics},
+                  METRICS_CACHE_TIMEOUT)
+    request._inmoney_metrics = metrics
+    return metrics
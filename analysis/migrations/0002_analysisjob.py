@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0001_analysiscache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', '대기'), ('RUNNING', '실행 중'), ('DONE', '완료'), ('FAILED', '실패')], default='PENDING', max_length=7, verbose_name='상태')),
+                ('prompt', models.TextField(verbose_name='재무 데이터 요약')),
+                ('analysis', models.TextField(blank=True, verbose_name='분석 결과')),
+                ('error', models.TextField(blank=True, verbose_name='오류 메시지')),
+                ('cached', models.BooleanField(default=False, verbose_name='캐시 결과 여부')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='실행 가능 시각')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='analysis_job_queue_idx'), models.Index(fields=['user', 'status', 'finished_at'], name='analysis_job_user_idx')],
+            },
+        ),
+    ]
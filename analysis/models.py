@@ -1 +1,85 @@
-"""analysis 앱은 별도 모델 없이 transactions 앱의 모델을 집계하여 사용한다."""
+"""analysis 앱 모델.
+
+지표 자체는 별도 모델 없이 transactions 앱의 모델을 집계하여 사용한다.
+
+- AnalysisCache : GPT 재무 진단 결과 캐시 (프롬프트·모델 해시 → 응답)
+- AnalysisJob   : GPT 재무 진단 작업 큐 (run_analysis_jobs 워커가 처리)
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils.timezone import now
+
+
+class AnalysisCache(models.Model):
+    """GPT 분석 결과 캐시.
+
+    key 는 (모델명, 메시지 전체)의 SHA-256 이므로 재무 데이터가 한 글자라도 바뀌면
+    다른 키가 된다. created_at 기준으로 만료(TTL)되고, 개수가 상한을 넘으면
+    last_used_at 이 오래된 것부터 지운다 (analysis/gpt.py).
+    """
+
+    key = models.CharField("프롬프트 해시", max_length=64, unique=True)
+    model = models.CharField("모델", max_length=50)
+    analysis = models.TextField("분석 결과")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} {self.key[:12]}"
+
+
+class AnalysisJob(models.Model):
+    """GPT 재무 진단 작업.
+
+    POST 요청은 지표 요약(prompt)을 만들어 작업을 PENDING 으로 등록만 하고 바로 응답한다.
+    run_analysis_jobs 워커가 available_at 이 지난 작업을 가져가 RUNNING → DONE/FAILED 로
+    바꾸며, 클라이언트는 상태 조회 API 를 폴링한다.
+    유저별 호출 한도를 넘은 작업은 available_at 을 미뤄 대기시킨다.
+    """
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (PENDING, "대기"),
+        (RUNNING, "실행 중"),
+        (DONE, "완료"),
+        (FAILED, "실패"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="analysis_jobs",
+    )
+    status = models.CharField("상태", max_length=7, choices=STATUS_CHOICES, default=PENDING)
+    prompt = models.TextField("재무 데이터 요약")
+    analysis = models.TextField("분석 결과", blank=True)
+    error = models.TextField("오류 메시지", blank=True)
+    cached = models.BooleanField("캐시 결과 여부", default=False)
+    available_at = models.DateTimeField("실행 가능 시각", default=now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def as_dict(self):
+        """상태 조회 API 응답."""
+        data = {"status": "ok", "job_id": self.pk, "job_status": self.status}
+        if self.status == self.DONE:
+            data["analysis"] = self.analysis
+            data["cached"] = self.cached
+        elif self.status == self.FAILED:
+            data["message"] = self.error
+        return data
+
+    def __str__(self):
+        return f"{self.user} {self.get_status_display()} #{self.pk}"
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="analysis_job_queue_idx"),
+            models.Index(fields=["user", "status", "finished_at"], name="analysis_job_user_idx"),
+        ]
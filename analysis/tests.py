@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 
@@ -125,3 +127,344 @@ class GptAnalysisViewTest(TestCase):
     def test_gpt_analysis_get_not_allowed(self):
         res = self.client.get("/inmoney/gpt-analysis/")
         self.assertEqual(res.status_code, 405)
+
+    def test_gpt_analysis_reuses_page_metrics(self):
+        from types import SimpleNamespace
+        from unittest import mock
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        cache.clear()
+        account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=1000000,
+        )
+        Transaction.objects.create(
+            user=self.user, account=account,
+            tx_type="IN", amount=3000000, occurred_at="2026-01-25",
+        )
+        self.client.get("/inmoney/")
+
+        reply = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="진단서"))])
+        with mock.patch("analysis.views.OpenAI") as fake_openai, \
+                CaptureQueriesContext(connection) as ctx:
+            fake_openai.return_value.chat.completions.create.return_value = reply
+            res = self.client.post("/inmoney/gpt-analysis/")
+
+        self.assertEqual(res.json(), {"status": "ok", "analysis": "진단서", "cached": False})
+        prompt = fake_openai.return_value.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("총 수입: 3,000,000원", prompt)
+        # 페이지가 계산한 지표를 재사용하므로 거래·계좌 테이블은 조회하지 않는다
+        self.assertFalse(any("transactions_" in q["sql"] for q in ctx.captured_queries))
+
+
+class InMoneyMetricsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=5000000,
+        )
+        self.cat_food = Category.objects.create(name="식비", cat_type="OUT")
+        self.cat_hobby = Category.objects.create(
+            name="취미", cat_type="OUT", is_satisfaction=True,
+        )
+        Goal.objects.create(
+            user=self.user, target_saving=1000000, monthly_spending_limit=500000,
+        )
+
+    def _add(self, tx_type, amount, occurred_at, category=None, merchant=""):
+        Transaction.objects.create(
+            user=self.user, account=self.account, category=category,
+            tx_type=tx_type, amount=amount, occurred_at=occurred_at,
+            merchant=merchant,
+        )
+
+    def test_fixed_query_count(self):
+        from datetime import date, timedelta
+        from analysis.metrics import compute_inmoney_metrics
+
+        today = date(2026, 1, 31)
+        for i in range(60):
+            self._add("OUT", 10000 + i, today - timedelta(days=i * 5), self.cat_food)
+        self._add("IN", 3000000, today)
+
+        # 카테고리는 프로세스에 한 번 읽어 둔 레지스트리에서 (쿼리 수에서 제외)
+        from transactions.categories import all_categories
+        all_categories()
+
+        # 버킷·소액·반복 지출 + 정기 거래·계좌·목표 = 6
+        with self.assertNumQueries(6):
+            compute_inmoney_metrics(self.user, today=today)
+
+        for i in range(60):
+            self._add("OUT", 500, today - timedelta(days=i * 3), self.cat_hobby, "편의점")
+        with self.assertNumQueries(6):
+            compute_inmoney_metrics(self.user, today=today)
+
+    def test_section_values(self):
+        from datetime import date
+        from analysis.metrics import compute_inmoney_metrics
+
+        self._add("IN", 3000000, "2026-01-25")
+        self._add("OUT", 100000, "2026-01-10", self.cat_food)
+        self._add("OUT", 300000, "2026-01-20", self.cat_hobby)
+        self._add("OUT", 100000, "2025-12-05", self.cat_food)
+
+        m = compute_inmoney_metrics(self.user, today=date(2026, 1, 31))
+        self.assertEqual(m["total_expense"], 500000)
+        self.assertEqual(m["early_ratio"], 40)
+        self.assertEqual(m["late_ratio"], 60)
+        self.assertEqual(m["satisfaction_expense"], 300000)
+        self.assertEqual(
+            m["category_data"],
+            [{"category__name": "취미", "total": 300000},
+             {"category__name": "식비", "total": 200000}],
+        )
+        self.assertEqual(m["monthly"][-1], {
+            "label": "2026-01", "income": 3000000, "expense": 400000, "saving": 2600000,
+        })
+        self.assertEqual(m["quarter_labels"], ["2025년 4분기", "2026년 1분기"])
+        self.assertEqual(m["spending_usage"], 80)
+
+
+class InMoneyCacheTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=1000000,
+        )
+        self.cat = Category.objects.create(name="식비", cat_type="OUT")
+        Transaction.objects.create(
+            user=self.user, account=self.account, category=self.cat,
+            tx_type="OUT", amount=10000, occurred_at="2026-01-10",
+        )
+
+    def _ledger_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/inmoney/")
+        self.assertEqual(res.status_code, 200)
+        return res, [q for q in ctx.captured_queries if "transactions_" in q["sql"]]
+
+    def test_repeat_visit_uses_cache(self):
+        self._ledger_queries()
+        _, queries = self._ledger_queries()
+        self.assertEqual(queries, [])
+
+    def test_transaction_write_invalidates(self):
+        self._ledger_queries()
+        self.client.post("/transactions/new/", {
+            "account": self.account.pk, "category": self.cat.pk, "tx_type": "OUT",
+            "amount": 5000, "occurred_at": "2026-01-11", "confirm": "1",
+        })
+        res, queries = self._ledger_queries()
+        self.assertNotEqual(queries, [])
+        self.assertEqual(res.context["total_expense"], 15000)
+
+    def test_goal_and_recurring_writes_invalidate(self):
+        from datetime import date
+        from transactions.models import RecurringTransaction
+        from transactions.recurring import process_recurring
+        self._ledger_queries()
+        self.client.post("/inmoney/goal/", {"target_saving": 100000, "monthly_spending_limit": 50000})
+        res, _ = self._ledger_queries()
+        self.assertEqual(res.context["goal"].target_saving, 100000)
+
+        RecurringTransaction.objects.create(
+            user=self.user, account=self.account, category=self.cat,
+            tx_type="OUT", amount=7000, recurring_day=5,
+            start_date=date(2026, 1, 1), last_executed=date(2026, 1, 5),
+        )
+        self._ledger_queries()
+        process_recurring(today=date(2026, 2, 10))
+        res, _ = self._ledger_queries()
+        self.assertEqual(res.context["total_expense"], 17000)
+
+    def test_file_based_cache(self):
+        import tempfile
+        from django.core.cache import cache
+        from django.test import override_settings
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                       "LOCATION": tmp}
+            with override_settings(CACHES={"default": backend}):
+                cache.clear()
+                self._ledger_queries()
+                _, queries = self._ledger_queries()
+                self.assertEqual(queries, [])
+                self.account.name = "월급통장"
+                self.account.save()
+                _, queries = self._ledger_queries()
+                self.assertNotEqual(queries, [])
+
+
+class FakeOpenAI:
+    """OpenAI 클라이언트 대역 — 네트워크 없이 호출 횟수와 메시지만 기록한다."""
+
+    def __init__(self, **kwargs):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _reply(self, **kwargs):
+        self.calls.append(kwargs)
+        content = f"진단서 #{len(self.calls)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _create(self, **kwargs):
+        return self._reply(**kwargs)
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    async def _create(self, **kwargs):
+        return self._reply(**kwargs)
+
+
+class GptAnalysisCacheTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=1000000,
+        )
+        self.fake = FakeOpenAI()
+
+    def _post(self):
+        from unittest import mock
+        with mock.patch("analysis.views.OpenAI", return_value=self.fake):
+            return self.client.post("/inmoney/gpt-analysis/").json()
+
+    def test_same_prompt_is_served_from_cache(self):
+        first = self._post()
+        second = self._post()
+        self.assertEqual(len(self.fake.calls), 1)
+        self.assertEqual((first["cached"], second["cached"]), (False, True))
+        self.assertEqual(first["analysis"], second["analysis"])
+
+        # 데이터가 바뀌면 프롬프트가 달라지므로 새로 요청
+        Transaction.objects.create(
+            user=self.user, account=self.account,
+            tx_type="IN", amount=50000, occurred_at="2026-01-25",
+        )
+        self.assertFalse(self._post()["cached"])
+        self.assertEqual(len(self.fake.calls), 2)
+
+    def test_expired_entry_is_not_used(self):
+        from datetime import timedelta
+        from django.utils.timezone import now
+        from .models import AnalysisCache
+        self._post()
+        AnalysisCache.objects.update(created_at=now() - timedelta(days=30))
+        self.assertFalse(self._post()["cached"])
+        self.assertEqual(AnalysisCache.objects.count(), 1)
+
+    def test_size_limit_evicts_least_recently_used(self):
+        from django.test import override_settings
+        from . import gpt
+        from .models import AnalysisCache
+        with override_settings(GPT_ANALYSIS_CACHE_MAX_ENTRIES=2):
+            gpt.store_analysis("a" * 64, "A")
+            gpt.store_analysis("b" * 64, "B")
+            gpt.get_cached_analysis("a" * 64)
+            gpt.store_analysis("c" * 64, "C")
+        self.assertEqual(
+            sorted(AnalysisCache.objects.values_list("analysis", flat=True)), ["A", "C"]
+        )
+
+    async def test_async_endpoint_uses_async_client(self):
+        from unittest import mock
+        from django.test import AsyncClient
+        fake = FakeAsyncOpenAI()
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        with mock.patch("analysis.views.AsyncOpenAI", return_value=fake):
+            first = (await client.post("/inmoney/gpt-analysis/async/")).json()
+            second = (await client.post("/inmoney/gpt-analysis/async/")).json()
+        self.assertEqual(first["status"], "ok")
+        self.assertEqual((first["cached"], second["cached"]), (False, True))
+        self.assertEqual(len(fake.calls), 1)
+        self.assertIn("총 수입", fake.calls[0]["messages"][1]["content"])
+
+
+class GptAnalysisJobViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+
+    def test_enqueue_returns_job_id_without_calling_model(self):
+        from unittest import mock
+        with mock.patch("analysis.views.OpenAI") as fake_openai:
+            res = self.client.post("/inmoney/gpt-analysis/jobs/")
+        fake_openai.assert_not_called()
+        self.assertEqual(res.status_code, 202)
+        data = res.json()
+        self.assertEqual(data["job_status"], "PENDING")
+
+        status = self.client.get(data["status_url"]).json()
+        self.assertEqual((status["job_id"], status["job_status"]), (data["job_id"], "PENDING"))
+        # 같은 데이터로 다시 누르면 기존 작업을 돌려준다
+        again = self.client.post("/inmoney/gpt-analysis/jobs/").json()
+        self.assertEqual(again["job_id"], data["job_id"])
+
+    def test_cached_analysis_completes_immediately(self):
+        from . import gpt
+        from .views import _build_data_summary
+        from .metrics import compute_inmoney_metrics
+        summary = _build_data_summary(compute_inmoney_metrics(self.user))
+        gpt.store_analysis(gpt.cache_key(gpt.build_messages(summary)), "저장된 진단서")
+        data = self.client.post("/inmoney/gpt-analysis/jobs/").json()
+        self.assertEqual(data["job_status"], "DONE")
+        self.assertEqual(data["analysis"], "저장된 진단서")
+
+    def test_other_users_job_is_hidden(self):
+        from .models import AnalysisJob
+        other = User.objects.create_user(username="u2", password="pass1234!")
+        job = AnalysisJob.objects.create(user=other, prompt="x")
+        res = self.client.get(f"/inmoney/gpt-analysis/jobs/{job.pk}/")
+        self.assertEqual(res.status_code, 404)
+
+
+class AnalysisWorkerTest(TestCase):
+    """DB 작업은 워커 루프에서만 하고 스레드는 모델 호출만 한다."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.other = User.objects.create_user(username="u2", password="pass1234!")
+
+    def test_worker_processes_jobs_concurrently(self):
+        from .jobs import process_jobs
+        from .models import AnalysisJob
+        AnalysisJob.objects.create(user=self.user, prompt="요약 A")
+        AnalysisJob.objects.create(user=self.other, prompt="요약 B")
+        fake = FakeOpenAI()
+        processed = process_jobs(fake, threads=2, once=True, poll_interval=0.05)
+        self.assertEqual(processed, 2)
+        self.assertEqual(len(fake.calls), 2)
+        self.assertEqual(
+            set(AnalysisJob.objects.values_list("status", flat=True)), {AnalysisJob.DONE}
+        )
+
+    def test_per_user_rate_limit_postpones_jobs(self):
+        from django.test import override_settings
+        from django.utils.timezone import now
+        from .jobs import process_jobs
+        from .models import AnalysisJob
+        first = AnalysisJob.objects.create(user=self.user, prompt="요약 A")
+        second = AnalysisJob.objects.create(user=self.user, prompt="요약 B")
+        fake = FakeOpenAI()
+        with override_settings(GPT_ANALYSIS_RATE_LIMIT=1, GPT_ANALYSIS_RATE_WINDOW=3600):
+            process_jobs(fake, threads=2, once=True, poll_interval=0.05)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, AnalysisJob.DONE)
+        self.assertEqual(second.status, AnalysisJob.PENDING)
+        self.assertGreater(second.available_at, now())
+        self.assertEqual(len(fake.calls), 1)
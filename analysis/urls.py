@@ -7,4 +7,7 @@ urlpatterns = [
     path("", views.inmoney_view, name="inmoney"),                   # 재무 건강 분석 페이지
     path("goal/", views.goal_update_view, name="goal_update"),      # 목표 설정/수정
     path("gpt-analysis/", views.gpt_analysis_view, name="gpt_analysis"),  # GPT 분석 API (POST)
+    path("gpt-analysis/async/", views.gpt_analysis_async_view, name="gpt_analysis_async"),  # 비동기(ASGI)
+    path("gpt-analysis/jobs/", views.gpt_analysis_job_create_view, name="gpt_analysis_job_create"),  # 작업 등록 (POST)
+    path("gpt-analysis/jobs/<int:pk>/", views.gpt_analysis_job_view, name="gpt_analysis_job"),  # 작업 상태 (GET)
 ]
@@ -1,7 +1,10 @@
 """analysis 앱 뷰 — InMoney 재무 건강 분석·GPT 분석·목표 관리.
 
-inmoney_view()  : 12개 섹션의 재무 지표를 집계하여 InMoney 대시보드 렌더링
-gpt_analysis_view() : 집계 데이터를 GPT-4o-mini 에 전달해 종합 진단서를 생성
+inmoney_view()  : metrics.get_inmoney_metrics() 의 지표를 차트용으로 가공해 렌더링
+gpt_analysis_view() : 같은 지표 객체를 재사용해 GPT-4o-mini 에 종합 진단서를 요청
+gpt_analysis_async_view() : 위의 비동기(ASGI) 버전 — AsyncOpenAI 사용
+gpt_analysis_job_create_view() : GPT 진단 작업을 큐에 등록하고 작업 ID 를 바로 반환
+gpt_analysis_job_view()        : 작업 상태·결과 조회 (폴링용)
 goal_update_view()  : 목표 저축·소비 한도 설정/수정
 
 점수 산정 기준 (50점 기본):
@@ -11,46 +14,22 @@ goal_update_view()  : 목표 저축·소비 한도 설정/수정
   - 위험 신호 0개 → +10  |  1개 → +5
 """
 
-from statistics import stdev, mean
-
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncQuarter
+from django.core.handlers.asgi import ASGIRequest
 from django.http import JsonResponse
-from django.shortcuts import render, redirect
-from django.utils.timezone import now
-from django.views.decorators.http import require_POST
-from openai import OpenAI
+from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+from openai import AsyncOpenAI, OpenAI
 
-from transactions.models import Transaction, Account, RecurringTransaction, Goal
+from transactions.models import Goal
+from . import gpt
 from .forms import GoalForm
-
-
-def _monthly_data(qs, months=12):
-    """최근 N개월 월별 수입/지출 집계를 반환한다.
-    데이터가 전혀 없는 현재 월은 제외한다."""
-    today = now().date()
-    result = []
-    for i in range(months - 1, -1, -1):
-        y = today.year
-        m = today.month - i
-        while m <= 0:
-            m += 12
-            y -= 1
-        month_qs = qs.filter(occurred_at__year=y, occurred_at__month=m)
-        income = month_qs.filter(tx_type="IN").aggregate(s=Sum("amount"))["s"] or 0
-        expense = month_qs.filter(tx_type="OUT").aggregate(s=Sum("amount"))["s"] or 0
-        # 현재 월인데 데이터가 전혀 없으면 제외
-        if y == today.year and m == today.month and income == 0 and expense == 0:
-            continue
-        result.append({
-            "label": f"{y}-{m:02d}",
-            "income": income,
-            "expense": expense,
-            "saving": income - expense,
-        })
-    return result
+from .jobs import enqueue_analysis
+from .metrics import get_inmoney_metrics
+from .models import AnalysisJob
 
 
 @login_required
@@ -59,249 +38,22 @@ def inmoney_view(request):
 
     12개 섹션의 지표를 계산하여 CSS 차트용 데이터와 함께 템플릿에 전달한다.
     """
-    user = request.user
-    all_tx = Transaction.objects.filter(user=user)
-    today = now().date()
-
-    # ── 기본 집계 ──
-    total_income = all_tx.filter(tx_type="IN").aggregate(s=Sum("amount"))["s"] or 0
-    total_expense = all_tx.filter(tx_type="OUT").aggregate(s=Sum("amount"))["s"] or 0
-    net = total_income - total_expense
-    spending_rate = (total_expense / total_income * 100) if total_income > 0 else 0
-
-    # ── 1. 수입·지출 구조 ──
-    recurring_total = RecurringTransaction.objects.filter(
-        user=user, is_active=True, tx_type="OUT"
-    ).aggregate(s=Sum("amount"))["s"] or 0
-
-    fixed_ratio = (recurring_total / total_expense * 100) if total_expense > 0 else 0
-    variable_ratio = 100 - fixed_ratio if total_expense > 0 else 0
-
-    # ── 2. 저축·잔여 자금 ──
-    monthly = _monthly_data(all_tx)
-    saving_rate = (net / total_income * 100) if total_income > 0 else 0
-    savings_list = [m["saving"] for m in monthly]
-    saving_volatility = stdev(savings_list) if len(savings_list) >= 2 else 0
-
-    # ── 3. 현금 체력 ──
-    total_assets = Account.objects.filter(user=user, is_active=True).aggregate(
-        s=Sum("balance")
-    )["s"] or 0
-
-    expense_months = [m["expense"] for m in monthly if m["expense"] > 0]
-    avg_monthly_expense = mean(expense_months) if expense_months else 0
-    cash_endurance_months = (
-        total_assets / avg_monthly_expense if avg_monthly_expense > 0 else 0
-    )
-
-    # ── 4. 소비 패턴·리듬 ──
-    monthly_expenses = [m["expense"] for m in monthly]
-    expense_volatility = stdev(monthly_expenses) if len(monthly_expenses) >= 2 else 0
-
-    early_expense = all_tx.filter(
-        tx_type="OUT", occurred_at__day__lte=15
-    ).aggregate(s=Sum("amount"))["s"] or 0
-    late_expense = all_tx.filter(
-        tx_type="OUT", occurred_at__day__gt=15
-    ).aggregate(s=Sum("amount"))["s"] or 0
-    total_for_split = early_expense + late_expense
-    early_ratio = (early_expense / total_for_split * 100) if total_for_split > 0 else 50
-    late_ratio = (late_expense / total_for_split * 100) if total_for_split > 0 else 50
-
-    # ── 5. 카테고리 소비 ──
-    category_data = (
-        all_tx.filter(tx_type="OUT", category__isnull=False)
-        .values("category__name")
-        .annotate(total=Sum("amount"))
-        .order_by("-total")
-    )
-    category_labels = [c["category__name"] for c in category_data]
-    category_values = [c["total"] for c in category_data]
-    top_categories = list(category_data[:5])
-
-    # ── 6. 만족 소비 ──
-    satisfaction_expense = all_tx.filter(
-        tx_type="OUT", category__is_satisfaction=True
-    ).aggregate(s=Sum("amount"))["s"] or 0
-    satisfaction_ratio = (
-        satisfaction_expense / total_expense * 100 if total_expense > 0 else 0
-    )
-
-    satisfaction_monthly = []
-    for m in monthly:
-        y, mo = map(int, m["label"].split("-"))
-        sat_amt = all_tx.filter(
-            tx_type="OUT",
-            category__is_satisfaction=True,
-            occurred_at__year=y,
-            occurred_at__month=mo,
-        ).aggregate(s=Sum("amount"))["s"] or 0
-        satisfaction_monthly.append({"label": m["label"], "amount": sat_amt})
-
-    # ── 7. 안정성·위험 신호 ──
-    warnings = []
-    neg_balance_accounts = Account.objects.filter(user=user, balance__lte=0).count()
-    if neg_balance_accounts > 0:
-        warnings.append("계좌 잔액이 0 이하인 계좌가 있습니다.")
-
-    consecutive_deficit = 0
-    max_consecutive_deficit = 0
-    for m in monthly:
-        if m["saving"] < 0:
-            consecutive_deficit += 1
-            max_consecutive_deficit = max(max_consecutive_deficit, consecutive_deficit)
-        else:
-            consecutive_deficit = 0
-    if max_consecutive_deficit >= 2:
-        warnings.append(f"연속 {max_consecutive_deficit}개월 적자가 발생했습니다.")
-
-    if fixed_ratio > 50:
-        warnings.append(f"고정비 비중이 {fixed_ratio:.0f}%로 높습니다.")
-
-    recent_savings = savings_list[-3:] if len(savings_list) >= 3 else savings_list
-    if recent_savings and all(s <= 0 for s in recent_savings):
-        warnings.append("최근 저축이 중단되었습니다.")
-
-    # ── 8. 계좌 관리 ──
-    account_balances = list(
-        Account.objects.filter(user=user, is_active=True).values("name", "balance")
-    )
-
-    account_expense_data = list(
-        all_tx.filter(tx_type="OUT")
-        .values("account__name")
-        .annotate(total=Sum("amount"), count=Count("id"))
-        .order_by("-total")
-    )
-    account_income_data = list(
-        all_tx.filter(tx_type="IN")
-        .values("account__name")
-        .annotate(count=Count("id"))
-    )
-    account_freq = {}
-    for item in account_expense_data:
-        name = item["account__name"]
-        account_freq[name] = account_freq.get(name, 0) + item["count"]
-    for item in account_income_data:
-        name = item["account__name"]
-        account_freq[name] = account_freq.get(name, 0) + item["count"]
-
-    # ── 9. 습관·행동 ──
-    repeat_spending = list(
-        all_tx.filter(tx_type="OUT")
-        .exclude(merchant="")
-        .values("merchant", "amount")
-        .annotate(count=Count("id"))
-        .filter(count__gte=3)
-        .order_by("-count")
-    )
-
-    avg_expense_amount = 0
-    expense_tx = all_tx.filter(tx_type="OUT")
-    expense_count = expense_tx.count()
-    if expense_count > 0:
-        avg_expense_amount = (expense_tx.aggregate(s=Sum("amount"))["s"] or 0) / expense_count
-
-    small_threshold = avg_expense_amount * 0.2 if avg_expense_amount > 0 else 0
-    small_spending_total = 0
-    small_spending_count = 0
-    if small_threshold > 0:
-        small_qs = expense_tx.filter(amount__lte=small_threshold)
-        small_spending_total = small_qs.aggregate(s=Sum("amount"))["s"] or 0
-        small_spending_count = small_qs.count()
-
-    impulse_count = expense_tx.filter(memo="", merchant="").count()
-    impulse_ratio = (impulse_count / expense_count * 100) if expense_count > 0 else 0
-
-    small_monthly = []
-    for m in monthly:
-        y, mo = map(int, m["label"].split("-"))
-        if small_threshold > 0:
-            amt = all_tx.filter(
-                tx_type="OUT",
-                amount__lte=small_threshold,
-                occurred_at__year=y,
-                occurred_at__month=mo,
-            ).aggregate(s=Sum("amount"))["s"] or 0
-        else:
-            amt = 0
-        small_monthly.append({"label": m["label"], "amount": amt})
-
-    # ── 10. 시간 기반 ──
-    quarterly_data = (
-        all_tx.filter(tx_type="OUT")
-        .annotate(quarter=TruncQuarter("occurred_at"))
-        .values("quarter")
-        .annotate(total=Sum("amount"))
-        .order_by("quarter")
-    )
-    quarter_labels = []
-    quarter_values = []
-    for q in quarterly_data:
-        qd = q["quarter"]
-        quarter_num = (qd.month - 1) // 3 + 1
-        quarter_labels.append(f"{qd.year}년 {quarter_num}분기")
-        quarter_values.append(q["total"])
-
-    recent_months = monthly[-3:]
-    change_rates = []
-    for i in range(1, len(recent_months)):
-        prev = recent_months[i - 1]["expense"]
-        curr = recent_months[i]["expense"]
-        rate = round((curr - prev) / prev * 100, 1) if prev > 0 else 0
-        change_rates.append({
-            "label": f"{recent_months[i-1]['label']} → {recent_months[i]['label']}",
-            "rate": rate,
-        })
-
-    # ── 11. 목표 관리 ──
-    goal = Goal.objects.filter(user=user).first()
-    saving_achievement = 0
-    spending_usage = 0
-    if goal:
-        if goal.target_saving > 0:
-            saving_achievement = min(net / goal.target_saving * 100, 100) if net > 0 else 0
-        current_month_expense = all_tx.filter(
-            tx_type="OUT",
-            occurred_at__year=today.year,
-            occurred_at__month=today.month,
-        ).aggregate(s=Sum("amount"))["s"] or 0
-        if goal.monthly_spending_limit > 0:
-            spending_usage = current_month_expense / goal.monthly_spending_limit * 100
-
-    # ── 12. 종합 지표 ──
-    hhi = 0
-    if category_values and total_expense > 0:
-        shares = [(v / total_expense) ** 2 for v in category_values]
-        hhi = sum(shares) * 10000
-
-    score = 50
-    if saving_rate > 20:
-        score += 15
-    elif saving_rate > 10:
-        score += 10
-    elif saving_rate > 0:
-        score += 5
-
-    if cash_endurance_months >= 6:
-        score += 15
-    elif cash_endurance_months >= 3:
-        score += 10
-    elif cash_endurance_months >= 1:
-        score += 5
-
-    if fixed_ratio <= 30:
-        score += 10
-    elif fixed_ratio <= 50:
-        score += 5
-
-    if len(warnings) == 0:
-        score += 10
-    elif len(warnings) <= 1:
-        score += 5
-
-    score = max(0, min(100, score))
-    balance_index = saving_rate - spending_rate if total_income > 0 else 0
+    metrics = get_inmoney_metrics(request)
+    today = metrics["today"]
+    total_income = metrics["total_income"]
+    total_expense = metrics["total_expense"]
+    spending_rate = metrics["spending_rate"]
+    monthly = metrics["monthly"]
+    category_labels = metrics["category_labels"]
+    category_values = metrics["category_values"]
+    top_categories = metrics["top_categories"]
+    satisfaction_monthly = metrics["satisfaction_monthly"]
+    small_monthly = metrics["small_monthly"]
+    account_balances = metrics["account_balances"]
+    account_expense_data = metrics["account_expense_data"]
+    quarter_labels = metrics["quarter_labels"]
+    quarter_values = metrics["quarter_values"]
+    score = metrics["financial_score"]
 
     # ── CSS 차트용 데이터 가공 ──
     # 카테고리 파이 차트: 누적 퍼센트 계산
@@ -390,228 +142,127 @@ def inmoney_view(request):
         # 1. 수입·지출
         "total_income": total_income,
         "total_expense": total_expense,
-        "net": net,
+        "net": metrics["net"],
         "spending_rate": round(spending_rate, 1),
         "remaining_rate": round(100 - spending_rate, 1),
-        "fixed_ratio": round(fixed_ratio, 1),
-        "variable_ratio": round(variable_ratio, 1),
+        "fixed_ratio": round(metrics["fixed_ratio"], 1),
+        "variable_ratio": round(metrics["variable_ratio"], 1),
         "max_income_expense": max_income_expense,
         # 2. 저축
-        "saving_rate": round(saving_rate, 1),
-        "saving_volatility": round(saving_volatility),
+        "saving_rate": round(metrics["saving_rate"], 1),
+        "saving_volatility": round(metrics["saving_volatility"]),
         "monthly": monthly,
         "max_monthly_saving_abs": max_monthly_saving_abs,
         # 3. 현금 체력
-        "total_assets": total_assets,
-        "avg_monthly_expense": round(avg_monthly_expense),
-        "cash_endurance_months": round(cash_endurance_months, 1),
+        "total_assets": metrics["total_assets"],
+        "avg_monthly_expense": round(metrics["avg_monthly_expense"]),
+        "cash_endurance_months": round(metrics["cash_endurance_months"], 1),
         # 4. 소비 패턴
-        "expense_volatility": round(expense_volatility),
-        "early_ratio": round(early_ratio, 1),
-        "late_ratio": round(late_ratio, 1),
+        "expense_volatility": round(metrics["expense_volatility"]),
+        "early_ratio": round(metrics["early_ratio"], 1),
+        "late_ratio": round(metrics["late_ratio"], 1),
         "max_monthly_expense": max_monthly_expense,
         # 5. 카테고리
         "category_pie_data": category_pie_data,
         "top_categories": top_categories,
         "max_top_category": max_top_category,
         # 6. 만족 소비
-        "satisfaction_ratio": round(satisfaction_ratio, 1),
-        "satisfaction_remaining": round(100 - satisfaction_ratio, 1),
-        "satisfaction_expense": satisfaction_expense,
+        "satisfaction_ratio": round(metrics["satisfaction_ratio"], 1),
+        "satisfaction_remaining": round(100 - metrics["satisfaction_ratio"], 1),
+        "satisfaction_expense": metrics["satisfaction_expense"],
         "satisfaction_monthly": satisfaction_monthly,
         "max_satisfaction": max_satisfaction,
         # 7. 위험 신호
-        "warnings": warnings,
+        "warnings": metrics["warnings"],
         # 8. 계좌
         "account_balances": account_balances,
         "max_account_balance": max_account_balance,
         "account_expense_data": account_expense_data,
         "max_account_expense": max_account_expense,
-        "account_freq": account_freq,
+        "account_freq": metrics["account_freq"],
         # 9. 습관
-        "repeat_spending": repeat_spending,
-        "small_spending_total": small_spending_total,
-        "small_spending_count": small_spending_count,
-        "impulse_ratio": round(impulse_ratio, 1),
+        "repeat_spending": metrics["repeat_spending"],
+        "small_spending_total": metrics["small_spending_total"],
+        "small_spending_count": metrics["small_spending_count"],
+        "impulse_ratio": round(metrics["impulse_ratio"], 1),
         "small_monthly": small_monthly,
         "max_small": max_small,
         # 10. 시간
         "quarterly_data_list": quarterly_data_list,
         "max_quarterly": max_quarterly,
         "max_monthly_compare": max_monthly_compare,
-        "change_rates": change_rates,
+        "change_rates": metrics["change_rates"],
         # 11. 목표
-        "goal": goal,
-        "saving_achievement": round(saving_achievement, 1),
-        "spending_usage": round(spending_usage, 1),
+        "goal": metrics["goal"],
+        "saving_achievement": round(metrics["saving_achievement"], 1),
+        "spending_usage": round(metrics["spending_usage"], 1),
         # 12. 종합
         "today": today,
-        "hhi": round(hhi),
+        "hhi": round(metrics["hhi"]),
         "financial_score": score,
         "grade": grade,
         "score_color": score_color,
-        "balance_index": round(balance_index, 1),
+        "balance_index": round(metrics["balance_index"], 1),
+        # 작업 큐 사용 시 등록 후 폴링, 아니면 요청 안에서 응답 대기
+        # (ASGI 로 실행 중이면 비동기 엔드포인트)
+        "gpt_use_queue": settings.GPT_ANALYSIS_QUEUE,
+        "gpt_analysis_url": reverse(
+            "gpt_analysis_job_create" if settings.GPT_ANALYSIS_QUEUE
+            else "gpt_analysis_async" if isinstance(request, ASGIRequest)
+            else "gpt_analysis"
+        ),
     }
 
     return render(request, "analysis/inmoney.html", context)
 
 
-@login_required
-@require_POST
-def gpt_analysis_view(request):
-    """InMoney 데이터를 GPT에게 보내 종합 분석 및 조언을 받는다."""
-    user = request.user
-    all_tx = Transaction.objects.filter(user=user)
-    today = now().date()
-
-    # ── 핵심 데이터 수집 ──
-    total_income = all_tx.filter(tx_type="IN").aggregate(s=Sum("amount"))["s"] or 0
-    total_expense = all_tx.filter(tx_type="OUT").aggregate(s=Sum("amount"))["s"] or 0
-    net = total_income - total_expense
-    spending_rate = (total_expense / total_income * 100) if total_income > 0 else 0
-
-    recurring_out_total = RecurringTransaction.objects.filter(
-        user=user, is_active=True, tx_type="OUT"
-    ).aggregate(s=Sum("amount"))["s"] or 0
-    fixed_ratio = (recurring_out_total / total_expense * 100) if total_expense > 0 else 0
-
-    # ── 정기 거래 상세 수집 ──
-    recurring_income_qs = RecurringTransaction.objects.filter(
-        user=user, is_active=True, tx_type="IN"
-    )
-    recurring_expense_qs = RecurringTransaction.objects.filter(
-        user=user, is_active=True, tx_type="OUT"
-    )
-    recurring_in_total = recurring_income_qs.aggregate(s=Sum("amount"))["s"] or 0
-    recurring_income_list = list(recurring_income_qs.values(
-        "merchant", "memo", "amount", "recurring_day", "category__name"
-    ))
-    recurring_expense_list = list(recurring_expense_qs.values(
-        "merchant", "memo", "amount", "recurring_day", "category__name"
-    ))
-
-    monthly = _monthly_data(all_tx)
-    saving_rate = (net / total_income * 100) if total_income > 0 else 0
-    savings_list = [m["saving"] for m in monthly]
-    saving_volatility = stdev(savings_list) if len(savings_list) >= 2 else 0
-
-    total_assets = Account.objects.filter(user=user, is_active=True).aggregate(
-        s=Sum("balance")
-    )["s"] or 0
-    expense_months = [m["expense"] for m in monthly if m["expense"] > 0]
-    avg_monthly_expense = mean(expense_months) if expense_months else 0
-    cash_endurance_months = (
-        total_assets / avg_monthly_expense if avg_monthly_expense > 0 else 0
-    )
-
-    monthly_expenses = [m["expense"] for m in monthly]
-    expense_volatility = stdev(monthly_expenses) if len(monthly_expenses) >= 2 else 0
-
-    early_expense = all_tx.filter(
-        tx_type="OUT", occurred_at__day__lte=15
-    ).aggregate(s=Sum("amount"))["s"] or 0
-    late_expense = all_tx.filter(
-        tx_type="OUT", occurred_at__day__gt=15
-    ).aggregate(s=Sum("amount"))["s"] or 0
-    total_for_split = early_expense + late_expense
-    early_ratio = (early_expense / total_for_split * 100) if total_for_split > 0 else 50
-    late_ratio = 100 - early_ratio
-
-    category_data = list(
-        all_tx.filter(tx_type="OUT", category__isnull=False)
-        .values("category__name")
-        .annotate(total=Sum("amount"))
-        .order_by("-total")[:10]
-    )
-
-    satisfaction_expense = all_tx.filter(
-        tx_type="OUT", category__is_satisfaction=True
-    ).aggregate(s=Sum("amount"))["s"] or 0
-    satisfaction_ratio = (
-        satisfaction_expense / total_expense * 100 if total_expense > 0 else 0
-    )
-
-    # 위험 신호
-    warnings = []
-    neg_balance_accounts = Account.objects.filter(user=user, balance__lte=0).count()
-    if neg_balance_accounts > 0:
-        warnings.append("계좌 잔액이 0 이하인 계좌 존재")
-    consecutive_deficit = 0
-    max_consecutive_deficit = 0
-    for m in monthly:
-        if m["saving"] < 0:
-            consecutive_deficit += 1
-            max_consecutive_deficit = max(max_consecutive_deficit, consecutive_deficit)
-        else:
-            consecutive_deficit = 0
-    if max_consecutive_deficit >= 2:
-        warnings.append(f"연속 {max_consecutive_deficit}개월 적자")
-    if fixed_ratio > 50:
-        warnings.append(f"고정비 비중 {fixed_ratio:.0f}%로 높음")
-
-    # 습관 지표
-    expense_tx = all_tx.filter(tx_type="OUT")
-    expense_count = expense_tx.count()
-    impulse_count = expense_tx.filter(memo="", merchant="").count()
-    impulse_ratio = (impulse_count / expense_count * 100) if expense_count > 0 else 0
-
-    # 종합 지표
-    category_values = [c["total"] for c in category_data]
-    hhi = 0
-    if category_values and total_expense > 0:
-        shares = [(v / total_expense) ** 2 for v in category_values]
-        hhi = sum(shares) * 10000
-
-    score = 50
-    if saving_rate > 20:
-        score += 15
-    elif saving_rate > 10:
-        score += 10
-    elif saving_rate > 0:
-        score += 5
-    if cash_endurance_months >= 6:
-        score += 15
-    elif cash_endurance_months >= 3:
-        score += 10
-    elif cash_endurance_months >= 1:
-        score += 5
-    if fixed_ratio <= 30:
-        score += 10
-    elif fixed_ratio <= 50:
-        score += 5
-    if len(warnings) == 0:
-        score += 10
-    elif len(warnings) <= 1:
-        score += 5
-    score = max(0, min(100, score))
-    balance_index = saving_rate - spending_rate if total_income > 0 else 0
-
-    # 목표
-    goal = Goal.objects.filter(user=user).first()
+def _recurring_label(item):
+    """정기 거래 1건을 GPT 프롬프트용 한 줄 텍스트로 변환한다."""
+    name = item["merchant"] or item["memo"] or item["category__name"] or "미지정"
+    return f"  - {name}: 매월 {item['recurring_day']}일, {item['amount']:,}원"
+
+
+def _build_data_summary(metrics):
+    """InMoney 지표를 GPT 에게 보낼 재무 데이터 요약 텍스트로 만든다."""
+    total_income = metrics["total_income"]
+    total_expense = metrics["total_expense"]
+    net = metrics["net"]
+    spending_rate = metrics["spending_rate"]
+    fixed_ratio = metrics["fixed_ratio"]
+    recurring_in_total = metrics["recurring_in_total"]
+    recurring_out_total = metrics["recurring_total"]
+    recurring_income_list = metrics["recurring_income_list"]
+    recurring_expense_list = metrics["recurring_expense_list"]
+    saving_rate = metrics["saving_rate"]
+    saving_volatility = metrics["saving_volatility"]
+    total_assets = metrics["total_assets"]
+    avg_monthly_expense = metrics["avg_monthly_expense"]
+    cash_endurance_months = metrics["cash_endurance_months"]
+    expense_volatility = metrics["expense_volatility"]
+    early_ratio = metrics["early_ratio"]
+    late_ratio = metrics["late_ratio"]
+    category_data = metrics["category_data"][:10]
+    satisfaction_expense = metrics["satisfaction_expense"]
+    satisfaction_ratio = metrics["satisfaction_ratio"]
+    warnings = metrics["warnings"]
+    impulse_ratio = metrics["impulse_ratio"]
+    monthly = metrics["monthly"]
+    hhi = metrics["hhi"]
+    score = metrics["financial_score"]
+    balance_index = metrics["balance_index"]
+
+    goal = metrics["goal"]
     goal_info = ""
     if goal:
-        saving_achievement = min(net / goal.target_saving * 100, 100) if goal.target_saving > 0 and net > 0 else 0
-        current_month_expense = all_tx.filter(
-            tx_type="OUT",
-            occurred_at__year=today.year,
-            occurred_at__month=today.month,
-        ).aggregate(s=Sum("amount"))["s"] or 0
-        spending_usage = (current_month_expense / goal.monthly_spending_limit * 100) if goal.monthly_spending_limit > 0 else 0
         goal_info = (
-            f"- 목표 저축 금액: {goal.target_saving:,}원, 달성률: {saving_achievement:.1f}%\n"
-            f"- 월 목표 소비 금액: {goal.monthly_spending_limit:,}원, 이번달 사용률: {spending_usage:.1f}%"
+            f"- 목표 저축 금액: {goal.target_saving:,}원, 달성률: {metrics['saving_achievement']:.1f}%\n"
+            f"- 월 목표 소비 금액: {goal.monthly_spending_limit:,}원, 이번달 사용률: {metrics['spending_usage']:.1f}%"
         )
 
-    # ── 정기 거래 텍스트 생성 ──
-    def _recurring_label(item):
-        name = item["merchant"] or item["memo"] or item["category__name"] or "미지정"
-        return f"  - {name}: 매월 {item['recurring_day']}일, {item['amount']:,}원"
-
     recurring_in_text = chr(10).join(_recurring_label(r) for r in recurring_income_list) if recurring_income_list else "  - 없음"
     recurring_out_text = chr(10).join(_recurring_label(r) for r in recurring_expense_list) if recurring_expense_list else "  - 없음"
 
-    # ── GPT에게 보낼 데이터 요약 ──
-    data_summary = f"""[사용자 재무 데이터 - InMoney 분석]
+    return f"""[사용자 재무 데이터 - InMoney 분석]
 
 1. 수입·지출 구조
 - 총 수입: {total_income:,}원
@@ -669,49 +320,69 @@ def gpt_analysis_view(request):
 {goal_info if goal_info else "- 목표 미설정"}
 """
 
+
+@login_required
+@require_POST
+def gpt_analysis_view(request):
+    """InMoney 데이터를 GPT에게 보내 종합 분석 및 조언을 받는다.
+
+    지표는 get_inmoney_metrics() 로 얻으므로, 방금 InMoney 페이지가
+    계산한 값이 캐시에 있으면 DB 를 다시 집계하지 않는다.
+    같은 데이터로 이미 받은 진단이 있으면 GPT 를 다시 호출하지 않는다 (gpt.py).
+    """
+    data_summary = _build_data_summary(get_inmoney_metrics(request))
+
     # ── GPT API 호출 ──
     try:
         client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "당신은 전문 재무 분석가입니다. 인바디(InBody)가 체성분을 분석하듯, "
-                        "사용자의 재무 데이터를 종합 분석하여 '재무 건강 진단서'를 작성해주세요.\n\n"
-                        "특히 '정기 거래' 데이터를 주의 깊게 분석하세요:\n"
-                        "- 정기 수입(월급, 이자 등)은 매달 안정적으로 들어오는 소득입니다.\n"
-                        "- 정기 지출(대출이자, 월세, 구독료, 보험료 등)은 매달 빠져나가는 고정 비용입니다.\n"
-                        "- 정기 수입 대비 정기 지출 비율이 높으면 가용 소득이 줄어들어 재무 유연성이 떨어집니다.\n"
-                        "- 구독료(넷플릭스, 유튜브 프리미엄 등)가 과도하지 않은지도 확인하세요.\n"
-                        "- 정기 수입에서 정기 지출을 뺀 '가용 소득'이 변동 지출을 감당할 수 있는지 판단하세요.\n\n"
-                        "다음 형식으로 분석해주세요:\n"
-                        "1. 재무 건강 종합 등급 (S/A/B/C/D/F 등급과 한 줄 요약)\n"
-                        "2. 강점 분석 (잘하고 있는 부분 2~3가지)\n"
-                        "3. 약점 분석 (개선이 필요한 부분 2~3가지)\n"
-                        "4. 정기 거래 진단 (고정 수입/지출 구조 분석, 구독 서비스 효율성, 가용 소득 평가)\n"
-                        "5. 위험 신호 진단 (주의해야 할 사항)\n"
-                        "6. 맞춤 실행 조언 (구체적이고 실천 가능한 3~5가지 조언, 정기 거래 최적화 포함)\n"
-                        "7. 한 줄 총평\n\n"
-                        "한국어로 답변하고, 숫자는 천 단위 쉼표를 사용해주세요. "
-                        "분석은 구체적이고 데이터 기반으로 해주세요."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": data_summary,
-                },
-            ],
-            temperature=0.7,
-            max_tokens=2000,
-        )
-        analysis_text = response.choices[0].message.content
-        return JsonResponse({"status": "ok", "analysis": analysis_text})
+        analysis_text, cached = gpt.request_analysis(client, data_summary)
+        return JsonResponse({"status": "ok", "analysis": analysis_text, "cached": cached})
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
 
+@login_required
+@require_POST
+async def gpt_analysis_async_view(request):
+    """gpt_analysis_view 의 비동기(ASGI) 버전.
+
+    AsyncOpenAI 로 요청하므로 응답을 기다리는 동안 워커 스레드를 점유하지 않는다.
+    ASGI 로 배포하면 InMoney 페이지가 이 엔드포인트를 사용한다.
+    """
+    metrics = await sync_to_async(get_inmoney_metrics)(request)
+    data_summary = _build_data_summary(metrics)
+
+    try:
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        analysis_text, cached = await gpt.arequest_analysis(client, data_summary)
+        return JsonResponse({"status": "ok", "analysis": analysis_text, "cached": cached})
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+
+@login_required
+@require_POST
+def gpt_analysis_job_create_view(request):
+    """GPT 진단 작업을 등록한다. 모델 응답을 기다리지 않고 202 + 작업 ID 를 반환한다.
+
+    run_analysis_jobs 워커가 작업을 처리하며, 같은 데이터의 진단이 캐시에 있으면
+    작업은 등록과 동시에 완료 상태가 된다.
+    """
+    data_summary = _build_data_summary(get_inmoney_metrics(request))
+    job = enqueue_analysis(request.user, data_summary)
+    data = job.as_dict()
+    data["status_url"] = reverse("gpt_analysis_job", args=[job.pk])
+    return JsonResponse(data, status=202)
+
+
+@login_required
+@require_GET
+def gpt_analysis_job_view(request, pk):
+    """본인 작업의 상태(PENDING/RUNNING/DONE/FAILED)와 결과를 반환한다."""
+    job = get_object_or_404(AnalysisJob, pk=pk, user=request.user)
+    return JsonResponse(job.as_dict())
+
+
 @login_required
 def goal_update_view(request):
     """재무 목표 설정·수정. Goal 이 없으면 자동 생성(get_or_create)."""
@@ -2,14 +2,18 @@
 
 home_view       : 로그인 후 첫 화면 (Quick Action Hub)
 dashboard_view  : 월별 수입·지출 상세 대시보드
+
+집계는 Transaction 원장 대신 MonthlyRollup(유저·월·카테고리·입출금 합계)을
+읽으므로 거래 수와 무관하게 해당 월의 집계 행만 조회한다.
 """
 
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
+from django.db.models import Q, Sum
 from django.shortcuts import render
 from django.utils.timezone import now
 
-from transactions.models import Transaction
+from transactions.dates import month_range
+from transactions.models import MonthlyRollup
 
 
 @login_required
@@ -26,24 +30,26 @@ def dashboard_view(request):
     if month_param:
         try:
             year, month = map(int, month_param.split("-"))
+            month_range(year, month)
         except (ValueError, AttributeError):
             year, month = _default_month(request.user)
     else:
         year, month = _default_month(request.user)
 
-    qs = Transaction.objects.filter(
-        user=request.user,
-        occurred_at__year=year,
-        occurred_at__month=month,
-    )
+    start, _ = month_range(year, month)
+    qs = MonthlyRollup.objects.filter(user=request.user, month=start)
 
-    total_income = qs.filter(tx_type="IN").aggregate(s=Sum("amount"))["s"] or 0
-    total_expense = qs.filter(tx_type="OUT").aggregate(s=Sum("amount"))["s"] or 0
+    totals = qs.aggregate(
+        income=Sum("total", filter=Q(tx_type="IN")),
+        expense=Sum("total", filter=Q(tx_type="OUT")),
+    )
+    total_income = totals["income"] or 0
+    total_expense = totals["expense"] or 0
     net = total_income - total_expense
 
     category_summary = (
         qs.values("category__name")
-        .annotate(total=Sum("amount"))
+        .annotate(total=Sum("total"))
         .order_by("-total")
     )
 
@@ -66,9 +72,9 @@ def dashboard_view(request):
 def _default_month(user):
     """가장 최근 거래가 있는 월을 기본값으로, 없으면 현재 월"""
     latest = (
-        Transaction.objects.filter(user=user)
-        .order_by("-occurred_at")
-        .values_list("occurred_at", flat=True)
+        MonthlyRollup.objects.filter(user=user)
+        .order_by("-month")
+        .values_list("month", flat=True)
         .first()
     )
     if latest:
@@ -5,6 +5,7 @@ RecurringTransaction, Goal)을 관리자 페이지에 등록한다.
 """
 
 from django.contrib import admin
+from . import ledger
 from .models import Account, Category, Transaction, Attachment, RecurringTransaction, Goal
 
 
@@ -15,6 +16,13 @@ class AccountAdmin(admin.ModelAdmin):
     list_filter = ["is_active", "bank_name"]
     search_fields = ["name", "bank_name"]
 
+    def save_model(self, request, obj, form, change):
+        # 잔액을 고치면 개설 잔액·balance_after 도 함께 옮겨야 reconcile --fix 가 되돌리지 않는다
+        if change:
+            ledger.save_account(obj)
+        else:
+            super().save_model(request, obj, form, change)
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -34,6 +42,8 @@ class TransactionAdmin(admin.ModelAdmin):
 @admin.register(Attachment)
 class AttachmentAdmin(admin.ModelAdmin):
     list_display = ["transaction", "original_name", "uploaded_at"]
+    # 파일은 receipts.store() 로만 올려 blob 참조가 어긋나지 않게 한다
+    readonly_fields = ["file", "blob"]
 
 
 @admin.register(RecurringTransaction)
@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _ensure_search_index(sender, using, **kwargs):
+    """테이블 재생성 마이그레이션 뒤에도 검색 인덱스(SQLite 트리거)가 남아 있게 한다."""
+    from django.db import connections
+    from .search import install_search_index
+    install_search_index(connections[using])
 
 
 class TransactionsConfig(AppConfig):
     name = 'transactions'
+
+    def ready(self):
+        from . import signals  # noqa: F401 — 시그널 핸들러 등록
+        post_migrate.connect(_ensure_search_index, sender=self)
@@ -0,0 +1,75 @@
+"""거래 일괄 입력 (transaction_batch_create API 에서 사용).
+
+transaction_create 는 거래 1건마다 계좌 잠금 → 잔액 UPDATE → INSERT → balance_after 재계산을
+하므로 오프라인에서 쌓인 N 건을 올리면 쿼리가 5N 번이다. create_transactions() 는 N 건을
+한 DB 트랜잭션에서 행 수와 관계없는 쿼리 수로 저장한다.
+
+  1. 관련 계좌를 한 번에 잠그고 잔액을 읽는다.
+  2. 계좌별로 거래일 순서대로(같은 날은 입력 순서) balance_after 를 메모리에서 계산한다.
+  3. bulk_create 1회, 계좌별 증감(F() + CASE)을 UPDATE 1회로 반영한다.
+  4. 기존 거래보다 이른 날짜가 섞인 계좌만 그 날짜 이후 balance_after 를 다시 계산한다
+     (ledger.recompute_balance_after).
+  5. 월별 집계·데이터 버전을 직접 반영한다 (bulk_create 는 시그널을 보내지 않음).
+
+잔액 부족 경고는 없다 — 화면의 확인 절차 없이 저장되므로 음수 잔액이 될 수 있다.
+"""
+
+from django.db import transaction
+
+from . import ledger, rollups
+from .models import Transaction
+from .versioning import bump_data_version
+
+INSERT_BATCH_SIZE = 1000
+
+
+def create_transactions(user, rows):
+    """rows(BatchTransactionForm 의 cleaned_data 목록)를 user 의 거래로 저장한다.
+
+    계좌·카테고리는 호출한 쪽(폼셋)에서 user 의 것인지 검증돼 있어야 한다.
+    입력 순서대로 저장된 Transaction 목록을 반환한다.
+    """
+    new_transactions = [
+        Transaction(
+            user_id=user.pk,
+            account_id=row["account"],
+            category_id=row["category"],
+            tx_type=row["tx_type"],
+            amount=row["amount"],
+            occurred_at=row["occurred_at"],
+            merchant=row["merchant"],
+            memo=row["memo"],
+        )
+        for row in rows
+    ]
+    if not new_transactions:
+        return []
+
+    with transaction.atomic():
+        balances = ledger.lock_accounts(tx.account_id for tx in new_transactions)
+        start_balances = dict(balances)
+
+        # sorted 는 안정 정렬이므로 같은 날 거래는 입력 순서를 유지한다
+        first_dates = {}
+        for tx in sorted(new_transactions, key=lambda tx: tx.occurred_at):
+            balances[tx.account_id] += ledger.signed_amount(tx.tx_type, tx.amount)
+            tx.balance_after = balances[tx.account_id]
+            first_dates.setdefault(tx.account_id, tx.occurred_at)
+        stale = ledger.stale_suffixes(first_dates)
+
+        Transaction.objects.bulk_create(new_transactions, batch_size=INSERT_BATCH_SIZE)
+        ledger.apply_deltas({pk: balances[pk] - start_balances[pk] for pk in balances})
+
+        # 기존 거래보다 앞선 날짜가 섞였으면 그 날짜부터 balance_after 를 다시 계산
+        for account_id, since in stale.items():
+            ledger.recompute_balance_after(account_id, balances[account_id], since)
+        if stale:
+            stamped = dict(
+                Transaction.objects.filter(pk__in=[tx.pk for tx in new_transactions])
+                .values_list("pk", "balance_after")
+            )
+            for tx in new_transactions:
+                tx.balance_after = stamped[tx.pk]
+        rollups.apply_transactions(new_transactions)
+        bump_data_version(user.pk)
+    return new_transactions
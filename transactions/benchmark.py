@@ -0,0 +1,142 @@
+"""성능 벤치마크 (benchmark 커맨드에서 사용).
+
+populate()  : N 유저 × M 년치 가계부를 generate_ledger() 로 만든다 (최근 M 년, 이번 달까지)
+run_size()  : 한 데이터 크기에서 주요 화면과 process_recurring 을 재고 결과 dict 를 반환
+compare()   : 두 결과(baseline JSON)의 같은 크기·대상끼리 변화율을 계산
+
+측정 항목 (대상마다):
+  - p50_ms / p95_ms : requests 회 반복한 응답 시간의 백분위
+  - queries        : 요청 1회의 SQL 실행 수 (마지막 요청 기준)
+  - peak_kb        : tracemalloc 으로 잰 요청 1회의 최대 메모리 할당량 (시간 측정과 따로 1회)
+
+화면은 표본 유저(최대 SAMPLE_USERS 명)를 돌아가며 요청한다. process_recurring 은 매번
+롤백되는 트랜잭션 안에서 실행하므로 같은 데이터로 반복해서 잴 수 있다.
+"""
+
+import math
+import time
+import tracemalloc
+from datetime import date
+from itertools import cycle
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client, override_settings
+
+from accountbook.middleware import QueryProfile
+
+from .dates import add_months
+from .dummy import LedgerGenerator, generate_ledger
+from .models import Transaction
+from .recurring import process_recurring
+
+User = get_user_model()
+
+SAMPLE_USERS = 5
+VIEWS = {
+    "transaction_list": "/transactions/",
+    "dashboard": "/dashboard/",
+    "inmoney": "/inmoney/",
+}
+
+
+def percentile(samples, p):
+    """nearest-rank 백분위 (samples 는 비어 있지 않아야 한다)."""
+    ordered = sorted(samples)
+    return ordered[max(1, math.ceil(len(ordered) * p / 100)) - 1]
+
+
+def populate(users, years, seed=42, today=None):
+    """bench00000.. 유저 users 명에게 years 년치 거래를 만들고 생성한 거래 수를 반환한다."""
+    today = today or date.today()
+    LedgerGenerator().ensure_categories()
+    start = User.objects.filter(username__startswith="bench").count()
+    created = 0
+    for i in range(start, start + users):
+        user = User.objects.create(username=f"bench{i:05d}")
+        created += generate_ledger(user, add_months(today, -(years * 12 - 1)), years * 12, seed + i)
+    return created
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} → HTTP {response.status_code}")
+
+
+def _measure(func, repeat):
+    """func 를 repeat 회 실행해 시간·쿼리 수를, 한 번 더 실행해 최대 메모리를 잰다."""
+    timings = []
+    profile = None
+    for _ in range(repeat):
+        profile = QueryProfile()
+        with connection.execute_wrapper(profile):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "queries": profile.count,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_size(users, years, repeat=20, seed=42):
+    """users × years 크기의 데이터를 만들고 각 대상을 잰 결과 dict 를 반환한다."""
+    start = time.perf_counter()
+    created = populate(users, years, seed)
+    result = {
+        "users": users,
+        "years": years,
+        "transactions": Transaction.objects.count(),
+        "created": created,
+        "generate_s": round(time.perf_counter() - start, 2),
+        "results": {},
+    }
+
+    clients = []
+    for user in User.objects.filter(username__startswith="bench").order_by("pk")[:SAMPLE_USERS]:
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+
+    # 예산 초과로 요청이 실패하지 않도록 (재는 것이 목적)
+    with override_settings(ALLOWED_HOSTS=["testserver"], QUERY_BUDGET_RAISE=False):
+        for name, url in VIEWS.items():
+            rotation = cycle(clients)
+            result["results"][name] = _measure(lambda: _get(next(rotation), url), repeat)
+
+    def recurring():
+        with transaction.atomic():
+            process_recurring()
+            transaction.set_rollback(True)
+
+    result["results"]["process_recurring"] = _measure(recurring, max(1, repeat // 4))
+    return result
+
+
+def compare(baseline, current):
+    """(크기, 대상, 항목, 이전 값, 현재 값, 변화율 %) 목록. 같은 크기·대상만 비교한다."""
+    previous = {(run["users"], run["years"]): run["results"] for run in baseline["runs"]}
+    rows = []
+    for run in current["runs"]:
+        old_results = previous.get((run["users"], run["years"]))
+        if not old_results:
+            continue
+        for name, metrics in run["results"].items():
+            old = old_results.get(name)
+            if not old:
+                continue
+            for key, value in metrics.items():
+                before = old.get(key)
+                change = round((value - before) / before * 100, 1) if before else None
+                rows.append((f"{run['users']}x{run['years']}", name, key, before, value, change))
+    return rows
@@ -0,0 +1,135 @@
+"""카테고리 레지스트리 — 프로세스 메모리에 두는 전역 카테고리 목록.
+
+카테고리는 모든 유저가 함께 쓰고 거의 바뀌지 않는데, 거래 목록 필터·거래/정기 거래 폼의
+선택지·일괄 입력·가져오기·InMoney 지표가 요청마다 카테고리를 다시 읽거나 JOIN 했다.
+여기서는 카테고리를 pk → Category 로 한 번 읽어 두고 바뀌었을 때만 다시 읽는다.
+
+  - 같은 프로세스: Category post_save/post_delete 시그널(signals.py)이 invalidate() 를 부른다.
+    전역 목록은 DB 커밋 직후에만 다시 읽게 한다. 커밋 전의 카테고리를 전역에 올려 두면
+    그 트랜잭션이 롤백됐을 때 없는 카테고리를 선택지로 받아 FK 오류가 난다.
+  - 변경을 커밋하지 않은 트랜잭션 안: 그 트랜잭션만 보는 목록을 DB 에서 따로 읽어
+    스레드에 둔다 (저장점 롤백으로 변경이 취소되면 다시 읽음).
+  - 다른 프로세스(웹 워커, 관리 명령): invalidate() 가 캐시의 스탬프(CATEGORY_VERSION_KEY)를
+    새 값으로 바꾸고, 레지스트리는 VERSION_CHECK_INTERVAL 초마다 스탬프를 비교해 다르면
+    다시 읽는다. 비교는 캐시 조회 한 번이다 (DB 쿼리 없음).
+    로컬 메모리 캐시는 프로세스마다 따로이므로 여러 프로세스로 운영할 때는
+    공유 캐시(파일·Redis 등)를 설정해야 다른 프로세스의 변경이 전달된다.
+
+all_categories()  : 전체 카테고리 (pk 순)
+get_category(pk)  : pk 의 카테고리, 없으면 None
+satisfaction_ids(): 만족 소비(is_satisfaction) 카테고리 pk 집합
+attach(objects)   : 거래·정기 거래 목록의 category 를 레지스트리로 채운다 (JOIN 대신)
+invalidate()      : 다시 읽도록 표시 (DB 커밋 직후)
+
+레지스트리의 Category 인스턴스는 여러 요청이 함께 쓰므로 고치지 말 것.
+"""
+
+import threading
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Category
+
+CATEGORY_VERSION_KEY = "category:version"
+VERSION_CHECK_INTERVAL = 1.0  # 초
+
+_lock = threading.Lock()
+_categories = None  # pk → Category (pk 순), 커밋된 카테고리만
+_version = None
+_checked = 0.0
+_local = threading.local()  # 커밋 전 변경이 있는 트랜잭션의 목록: categories = (키, pk → Category)
+
+
+def _current_version():
+    version = cache.get(CATEGORY_VERSION_KEY)
+    if version is None:
+        cache.add(CATEGORY_VERSION_KEY, uuid4().hex, None)
+        version = cache.get(CATEGORY_VERSION_KEY)
+    return version
+
+
+def _load():
+    return {c.pk: c for c in Category.objects.order_by("pk")}
+
+
+def _uncommitted_key():
+    """현재 트랜잭션에 커밋 전 카테고리 변경이 있으면 그 상태를 나타내는 키, 없으면 None.
+
+    invalidate() 가 등록한 on_commit(_reset) 이 아직 남아 있는지로 판단한다. 롤백하면
+    (저장점 롤백 포함) Django 가 그 콜백을 지우므로 키가 바뀌거나 None 이 된다.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return None
+    pending = [sids for sids, func, robust in connection.run_on_commit if func is _reset]
+    if not pending:
+        return None
+    return tuple(connection.savepoint_ids), tuple(pending)
+
+
+def _registry():
+    global _categories, _version, _checked
+    key = _uncommitted_key()
+    if key is not None:
+        key += (_current_version(),)
+        cached = getattr(_local, "categories", None)
+        if cached is None or cached[0] != key:
+            cached = _local.categories = (key, _load())
+        return cached[1]
+
+    categories = _categories
+    now = time.monotonic()
+    if categories is not None and now - _checked < VERSION_CHECK_INTERVAL:
+        return categories
+
+    version = _current_version()
+    with _lock:
+        if _categories is None or _version != version:
+            _categories = _load()
+            _version = version
+        _checked = now
+        return _categories
+
+
+def all_categories():
+    return list(_registry().values())
+
+
+def get_category(pk):
+    return _registry().get(pk)
+
+
+def satisfaction_ids():
+    return {pk for pk, c in _registry().items() if c.is_satisfaction}
+
+
+def attach(objects):
+    """objects 의 category 를 레지스트리의 인스턴스로 채우고 objects 를 반환한다.
+
+    레지스트리에 없는 카테고리(다른 프로세스에서 방금 추가 등)는 그대로 두어
+    접근할 때 평소처럼 조회되게 한다.
+    """
+    registry = _registry()
+    for obj in objects:
+        category = registry.get(obj.category_id)
+        if category is not None:
+            obj.category = category
+    return objects
+
+
+def _reset():
+    global _categories
+    _categories = None
+    cache.set(CATEGORY_VERSION_KEY, uuid4().hex, None)
+
+
+def invalidate():
+    """카테고리가 바뀌었음을 기록한다 — 커밋 직후에 다시 읽는다 (롤백되면 그대로).
+
+    그 전까지 같은 트랜잭션의 조회는 _uncommitted_key() 로 따로 읽는다.
+    """
+    _local.categories = None
+    transaction.on_commit(_reset)
@@ -0,0 +1,67 @@
+"""날짜 조건을 인덱스가 쓸 수 있는 반열린 구간으로 바꾸는 헬퍼.
+
+occurred_at__year / __month / __day 같은 조회는 컬럼을 함수로 감싸므로
+(EXTRACT, django_date_extract …) occurred_at 인덱스를 쓸 수 없다.
+여기의 헬퍼는 "2026년 1월", "date_from ~ date_to" 같은 조건을
+    start <= occurred_at < end
+형태의 반열린 구간으로 바꿔, 컬럼을 그대로 비교하게 한다.
+
+  month_range(2026, 1)                      → (2026-01-01, 2026-02-01)
+  date_range_q("2026-01-01", "2026-01-31")  → occurred_at >= 1/1 AND < 2/1
+"""
+
+from datetime import date, timedelta
+
+from django.db.models import Q
+
+
+def add_months(value, months):
+    """value 가 속한 달의 1일에서 months 개월 이동한 날짜 (음수 가능)."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(year, month):
+    """year 년 month 월의 [시작일, 다음 달 1일) 구간. 잘못된 월이면 ValueError."""
+    start = date(year, month, 1)
+    return start, add_months(start, 1)
+
+
+def recent_months(today, months=12):
+    """오늘을 포함한 최근 N개월의 (연, 월) 목록을 오래된 순으로 반환한다."""
+    first = add_months(today, -(months - 1))
+    result = []
+    for i in range(months):
+        d = add_months(first, i)
+        result.append((d.year, d.month))
+    return result
+
+
+def parse_date(value):
+    """date 또는 'YYYY-MM-DD' 문자열을 date 로. 비었거나 형식이 틀리면 None."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def date_range_q(date_from=None, date_to=None, field="occurred_at"):
+    """date_from ~ date_to (둘 다 포함) 조건. 종료일은 다음 날 미만으로 바꾼다.
+
+    값이 없거나 형식이 틀린 쪽은 조건에서 빠진다. 종료일이 date.max(9999-12-31)면
+    다음 날을 만들 수 없으므로 그 날 이하로 비교한다.
+    """
+    q = Q()
+    start = parse_date(date_from)
+    end = parse_date(date_to)
+    if start:
+        q &= Q(**{f"{field}__gte": start})
+    if end == date.max:
+        q &= Q(**{f"{field}__lte": end})
+    elif end:
+        q &= Q(**{f"{field}__lt": end + timedelta(days=1)})
+    return q
@@ -0,0 +1,481 @@
+"""현실적인 가계부 더미 데이터 생성기.
+
+generate_dummy_data 커맨드와 benchmark 커맨드가 함께 쓴다.
+
+LedgerGenerator    : 유저 한 명의 계좌·정기 거래를 만들고, gen_month() 로 한 달치
+                     수입·이체·고정지출·변동지출·특별지출 거래를 tx_buffer 에 쌓는다.
+                     flush() 는 쌓인 거래에 거래일 순으로 balance_after 를 매기고
+                     batch_size 개씩 bulk_create 한다 (달마다 불러 메모리를 한 달치로 제한).
+generate_ledger()  : 유저 한 명의 기존 데이터를 지우고 months 동안의 가계부를 만든다
+                     (계좌·정기 거래·목표·거래·최종 잔액·월별 집계).
+generate_parallel(): 여러 유저를 프로세스 풀에서 유저 단위로 나눠 generate_ledger() 한다.
+
+난수는 인스턴스마다 random.Random(seed) 를 쓰므로 같은 seed 면 같은 데이터가 나온다.
+여러 유저를 만들 때는 유저 순번 i 에 seed + i 를 쓰므로 프로세스 수와 관계없이 같다.
+"""
+
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from . import parallel
+from .dates import add_months
+from .ledger import signed_amount
+from .models import (
+    Account,
+    Category,
+    Goal,
+    RecurringTransaction,
+    Transaction,
+)
+from .rollups import rebuild_rollups
+from .signals import bulk_delete
+from .versioning import bump_data_version
+
+User = get_user_model()
+
+BATCH_SIZE = 2000  # bulk_create 한 번에 넣는 거래 수
+
+
+# ── 가맹점 사전 ──────────────────────────────────────────
+MERCHANTS = {
+    "편의점": ["CU 역삼점", "GS25 강남점", "세븐일레븐 삼성점", "이마트24 선릉점"],
+    "카페": ["스타벅스 강남점", "투썸플레이스", "메가커피 역삼점", "컴포즈커피", "이디야 선릉점"],
+    "식당": ["김밥천국", "맥도날드 강남점", "서브웨이 삼성점", "한솥도시락", "본죽", "이삭토스트",
+             "풍년돈까스", "명동칼국수", "청기와타운", "마라탕집"],
+    "배달": ["배달의민족", "쿠팡이츠", "요기요"],
+    "마트": ["이마트 역삼점", "홈플러스 강남점", "쿠팡 로켓배송", "마켓컬리"],
+    "지하철": ["서울교통공사", "수도권광역교통"],
+    "버스": ["서울시버스", "경기버스"],
+    "택시": ["카카오택시", "타다"],
+    "주유": ["SK에너지 강남", "GS칼텍스 역삼", "현대오일뱅크"],
+    "영화": ["CGV 강남", "롯데시네마 건대", "메가박스 코엑스"],
+    "공연": ["인터파크 티켓", "예스24 티켓"],
+    "게임": ["Steam", "닌텐도 e숍", "플레이스테이션 스토어"],
+    "의류": ["유니클로 강남점", "자라 코엑스", "무신사 스토어", "에이블리"],
+    "화장품": ["올리브영 역삼점", "이니스프리", "쿠팡 뷰티"],
+    "생활용품": ["다이소 강남점", "아성다이소", "오늘의집"],
+    "전자제품": ["쿠팡 디지털", "하이마트 강남", "애플스토어 가로수길"],
+    "술집": ["포차 강남점", "몽탄 역삼", "맥주창고"],
+    "기타": ["카카오페이", "네이버페이", "토스"],
+    "자기계발": ["교보문고 강남점", "YES24", "알라딘", "클래스101", "탈잉", "인프런"],
+}
+
+
+def last_day(y, m):
+    """해당 월의 마지막 날짜(28~31)를 반환."""
+    nxt = date(y, m + 1, 1) if m < 12 else date(y + 1, 1, 1)
+    return (nxt - timedelta(days=1)).day
+
+
+class LedgerGenerator:
+    """유저 한 명의 가계부 데이터를 만드는 생성기."""
+
+    def __init__(self, seed=None, batch_size=BATCH_SIZE):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.cats = {}
+        self.tx_buffer = []
+        self.tx_count = 0
+        self.settled = {}  # 계좌 pk → 저장한 마지막 거래 후 잔액
+
+    def pick(self, key):
+        """가맹점 사전에서 랜덤 가맹점명을 반환."""
+        return self.rng.choice(MERCHANTS[key])
+
+    def ensure_categories(self):
+        """더미 데이터에 쓰는 카테고리를 준비해 self.cats 에 담는다."""
+        needed = {
+            "월급": (Category.INCOME, False),
+            "기타수입": (Category.INCOME, False),
+            "이체": (Category.COMMON, False),
+            "식비": (Category.EXPENSE, False),
+            "카페/간식": (Category.EXPENSE, True),
+            "교통": (Category.EXPENSE, False),
+            "쇼핑": (Category.EXPENSE, True),
+            "구독": (Category.EXPENSE, False),
+            "주거/통신": (Category.EXPENSE, False),
+            "의료/건강": (Category.EXPENSE, False),
+            "기타지출": (Category.EXPENSE, False),
+            "문화생활": (Category.EXPENSE, True),
+            "유흥": (Category.EXPENSE, True),
+            "자기계발": (Category.EXPENSE, True),
+        }
+        for name, (cat_type, is_sat) in needed.items():
+            obj, created = Category.objects.get_or_create(
+                name=name, defaults={"cat_type": cat_type, "is_satisfaction": is_sat},
+            )
+            if not created:
+                # 기존 카테고리의 is_satisfaction 값도 갱신
+                if obj.is_satisfaction != is_sat:
+                    obj.is_satisfaction = is_sat
+                    obj.save(update_fields=["is_satisfaction"])
+            self.cats[name] = obj
+
+    # ── 계좌 ─────────────────────────────────────────────
+    def create_accounts(self, user):
+        specs = [
+            ("월급통장", "국민은행", "110456789012", 0),
+            ("저축통장", "카카오뱅크", "333012345678", 0),
+            ("체크카드(생활비통장)", "신한은행", "260987654321", 0),
+        ]
+        accounts = []
+        for name, bank, num, balance in specs:
+            acc = Account.objects.create(
+                user=user, name=name, bank_name=bank,
+                account_number=num, balance=balance,
+            )
+            accounts.append(acc)
+        return accounts
+
+    # ── 거래 추가 ────────────────────────────────────────
+    def add_tx(self, user, account, category, tx_type, amount, dt, merchant="", memo=""):
+        if tx_type == "OUT" and account.balance < amount:
+            return None
+        self.settled.setdefault(account.pk, account.balance)
+        account.balance += signed_amount(tx_type, amount)
+
+        self.tx_buffer.append(Transaction(
+            user=user, account=account, category=category,
+            tx_type=tx_type, amount=amount,
+            occurred_at=dt, merchant=merchant, memo=memo,
+        ))
+        self.tx_count += 1
+        return True
+
+    def flush(self):
+        """쌓인 거래를 거래일 순으로 저장한다.
+
+        생성 순서는 거래일 순이 아니므로 balance_after 는 여기서 거래일(같은 날은 생성)
+        순으로 매긴다. 버퍼의 거래는 이미 저장한 거래보다 늦은 날짜여야 한다.
+        """
+        if not self.tx_buffer:
+            return
+        ordered = sorted(self.tx_buffer, key=lambda tx: tx.occurred_at)
+        for tx in ordered:
+            self.settled[tx.account_id] += signed_amount(tx.tx_type, tx.amount)
+            tx.balance_after = self.settled[tx.account_id]
+        Transaction.objects.bulk_create(ordered, batch_size=self.batch_size)
+        self.tx_buffer = []
+
+    # ── 수입 ─────────────────────────────────────────────
+    def gen_income(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        pay_day = date(y, m, min(25, last_day(y, m)))
+        self.add_tx(user, acc, self.cats["월급"], "IN", 3_000_000, pay_day,
+                    "(주)테크스타트업", "월급")
+        # 부수입 (40% 확률)
+        if self.rng.random() < 0.4:
+            d = date(y, m, self.rng.randint(1, last_day(y, m)))
+            amt = self.rng.randrange(50_000, 200_001, 10_000)
+            self.add_tx(user, acc, self.cats["기타수입"], "IN", amt, d, "용돈/부수입", "부수입")
+
+    # ── 이체: 월급통장 → 생활비통장 ─────────────────────
+    def gen_transfer(self, user, acc_from, acc_to, dt):
+        y, m = dt.year, dt.month
+        d = date(y, m, 1)
+        amt = 1_500_000
+        self.add_tx(user, acc_from, self.cats["이체"], "OUT", amt, d,
+                    "생활비 이체", "체크카드(생활비통장) 이체")
+        self.add_tx(user, acc_to, self.cats["이체"], "IN", amt, d,
+                    "생활비 입금", "월급통장에서 이체")
+
+    # ── 저축 이체: 월급통장 → 저축통장 ──────────────────
+    def gen_saving(self, user, acc_from, acc_to, dt):
+        y, m = dt.year, dt.month
+        d = date(y, m, min(26, last_day(y, m)))
+        amt = self.rng.randrange(300_000, 500_001, 50_000)
+        self.add_tx(user, acc_from, self.cats["이체"], "OUT", amt, d,
+                    "저축 이체", "저축통장 이체")
+        self.add_tx(user, acc_to, self.cats["이체"], "IN", amt, d,
+                    "저축 입금", "월급통장에서 이체")
+
+    # ── 정기 지출 ────────────────────────────────────────
+    def gen_fixed(self, user, acc_main, acc_card, dt):
+        y, m = dt.year, dt.month
+        fixed = [
+            (1, "넷플릭스", 13_500, "구독", acc_card),
+            (5, "월세", 500_000, "주거/통신", acc_main),
+            (10, "SKT 통신비", 55_000, "주거/통신", acc_main),
+            (15, "스포애니 헬스장", 60_000, "자기계발", acc_card),
+            (20, "유튜브 프리미엄", 14_900, "구독", acc_card),
+            (25, "삼성화재 자동차보험", 120_000, "기타지출", acc_main),
+        ]
+        for day, merchant, amount, cat_name, account in fixed:
+            d = date(y, m, min(day, last_day(y, m)))
+            self.add_tx(user, account, self.cats[cat_name], "OUT", amount, d,
+                        merchant, "정기 결제")
+
+    # ── 식비 (월 15~22건, ~35만원) ───────────────────────
+    def gen_food(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        ld = last_day(y, m)
+        for _ in range(self.rng.randint(15, 22)):
+            d = date(y, m, self.rng.randint(1, ld))
+            weekend = d.weekday() >= 5
+            r = self.rng.random()
+
+            if r < 0.25:
+                merchant, amount, memo = self.pick("편의점"), self.rng.randrange(2_000, 6_001, 500), "편의점"
+            elif r < 0.45:
+                merchant = self.pick("카페")
+                amount = self.rng.randrange(4_000, 6_501, 500)
+                self.add_tx(user, acc, self.cats["카페/간식"], "OUT", amount, d, merchant, "카페")
+                continue
+            elif r < 0.70:
+                merchant = self.pick("식당")
+                amount = self.rng.randrange(8_000, 20_001, 1_000)
+                if weekend:
+                    amount = int(amount * 1.3)
+                memo = "외식"
+            elif r < 0.85:
+                merchant = self.pick("배달")
+                amount = self.rng.randrange(12_000, 28_001, 1_000)
+                memo = "배달"
+            else:
+                merchant = self.pick("마트")
+                amount = self.rng.randrange(20_000, 80_001, 5_000)
+                memo = "장보기"
+
+            self.add_tx(user, acc, self.cats["식비"], "OUT", amount, d, merchant, memo)
+
+    # ── 교통 (월 12~18건, ~8만원) ────────────────────────
+    def gen_transport(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        ld = last_day(y, m)
+        for _ in range(self.rng.randint(12, 18)):
+            d = date(y, m, self.rng.randint(1, ld))
+            r = self.rng.random()
+
+            if r < 0.65:
+                merchant = self.pick("지하철") if self.rng.random() < 0.5 else self.pick("버스")
+                amount = self.rng.choice([1_400, 1_500, 2_500, 3_000])
+                memo = "대중교통"
+            elif r < 0.85:
+                merchant = self.pick("택시")
+                amount = self.rng.randrange(6_000, 15_001, 1_000)
+                memo = "택시"
+            else:
+                merchant = self.pick("주유")
+                amount = self.rng.randrange(50_000, 70_001, 5_000)
+                memo = "주유"
+
+            self.add_tx(user, acc, self.cats["교통"], "OUT", amount, d, merchant, memo)
+
+    # ── 문화생활 (월 3~5건, ~6만원) ──────────────────────
+    def gen_culture(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        ld = last_day(y, m)
+        for _ in range(self.rng.randint(3, 5)):
+            d = date(y, m, self.rng.randint(1, ld))
+            r = self.rng.random()
+
+            if r < 0.45:
+                merchant, amount, memo = self.pick("영화"), 15_000, "영화 관람"
+            elif r < 0.70:
+                merchant = self.pick("게임")
+                amount = self.rng.randrange(10_000, 30_001, 5_000)
+                memo = "게임 결제"
+            else:
+                merchant = self.pick("공연")
+                amount = self.rng.randrange(20_000, 50_001, 10_000)
+                memo = "공연/전시"
+
+            self.add_tx(user, acc, self.cats["문화생활"], "OUT", amount, d, merchant, memo)
+
+    # ── 쇼핑 (월 3~6건, ~15만원) ─────────────────────────
+    def gen_shopping(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        ld = last_day(y, m)
+        for _ in range(self.rng.randint(3, 6)):
+            d = date(y, m, self.rng.randint(1, ld))
+            r = self.rng.random()
+
+            if r < 0.35:
+                merchant = self.pick("의류")
+                amount = self.rng.randrange(20_000, 80_001, 5_000)
+                memo = "의류 구매"
+            elif r < 0.55:
+                merchant = self.pick("화장품")
+                amount = self.rng.randrange(10_000, 40_001, 5_000)
+                memo = "화장품"
+            elif r < 0.80:
+                merchant = self.pick("생활용품")
+                amount = self.rng.randrange(5_000, 30_001, 5_000)
+                memo = "생활용품"
+            else:
+                merchant = self.pick("전자제품")
+                amount = self.rng.randrange(50_000, 200_001, 10_000)
+                memo = "전자제품"
+
+            self.add_tx(user, acc, self.cats["쇼핑"], "OUT", amount, d, merchant, memo)
+
+    # ── 자기계발 (월 2~4건, ~5만원) ──────────────────────
+    def gen_selfdev(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        ld = last_day(y, m)
+        for _ in range(self.rng.randint(2, 4)):
+            d = date(y, m, self.rng.randint(1, ld))
+            merchant = self.pick("자기계발")
+            r = self.rng.random()
+
+            if r < 0.50:
+                amount = self.rng.randrange(10_000, 30_001, 5_000)
+                memo = "도서 구매"
+            else:
+                amount = self.rng.randrange(20_000, 60_001, 10_000)
+                memo = "온라인 강의"
+
+            self.add_tx(user, acc, self.cats["자기계발"], "OUT", amount, d, merchant, memo)
+
+    # ── 기타 (월 3~5건, ~5만원) ──────────────────────────
+    def gen_misc(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        ld = last_day(y, m)
+        for _ in range(self.rng.randint(3, 5)):
+            d = date(y, m, self.rng.randint(1, ld))
+            merchant = self.pick("기타")
+            amount = self.rng.randrange(5_000, 30_001, 5_000)
+            self.add_tx(user, acc, self.cats["기타지출"], "OUT", amount, d, merchant, "기타 결제")
+
+    # ── 금요일 유흥 (60% 확률, ~5만원) ───────────────────
+    def gen_friday(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        ld = last_day(y, m)
+        for day in range(1, ld + 1):
+            d = date(y, m, day)
+            if d.weekday() == 4 and self.rng.random() < 0.5:
+                merchant = self.pick("술집")
+                amount = self.rng.randrange(20_000, 60_001, 5_000)
+                self.add_tx(user, acc, self.cats["유흥"], "OUT", amount, d,
+                            merchant, "금요일 회식/술자리")
+
+    # ── 특별 지출 ────────────────────────────────────────
+    def gen_specials(self, user, acc, dt):
+        y, m = dt.year, dt.month
+        if m == 9:
+            self.add_tx(user, acc, self.cats["기타지출"], "OUT", 300_000,
+                        date(y, m, 15), "명절 선물", "추석 명절 지출")
+        elif m == 1:
+            self.add_tx(user, acc, self.cats["기타지출"], "OUT", 300_000,
+                        date(y, m, 25), "명절 선물", "설 명절 지출")
+
+    def gen_big(self, user, acc, dt):
+        events = [
+            (date(2025, 10, 12), 350_000, "하나투어", "제주도 여행 (숙소)"),
+            (date(2025, 12, 20), 250_000, "크리스마스 선물", "연말 선물"),
+        ]
+        for d, amount, merchant, memo in events:
+            if (d.year, d.month) == (dt.year, dt.month):
+                self.add_tx(user, acc, self.cats["쇼핑"], "OUT", amount, d, merchant, memo)
+
+    # ── 정기 거래 등록 ───────────────────────────────────
+    def create_recurring(self, user, acc_main, acc_card, start_date=date(2025, 8, 1)):
+        specs = [
+            (1, "넷플릭스", 13_500, "OUT", "구독", acc_card),
+            (5, "월세", 500_000, "OUT", "주거/통신", acc_main),
+            (10, "SKT 통신비", 55_000, "OUT", "주거/통신", acc_main),
+            (15, "스포애니 헬스장", 60_000, "OUT", "자기계발", acc_card),
+            (20, "유튜브 프리미엄", 14_900, "OUT", "구독", acc_card),
+            (25, "삼성화재 자동차보험", 120_000, "OUT", "기타지출", acc_main),
+            (25, "(주)테크스타트업", 3_000_000, "IN", "월급", acc_main),
+        ]
+        count = 0
+        for day, merchant, amount, tx_type, cat_name, account in specs:
+            _, created = RecurringTransaction.objects.get_or_create(
+                user=user, account=account, recurring_day=day, merchant=merchant,
+                defaults={
+                    "category": self.cats[cat_name], "tx_type": tx_type,
+                    "amount": amount, "start_date": start_date,
+                    "is_active": True,
+                    "memo": "정기 결제" if tx_type == "OUT" else "월급",
+                },
+            )
+            if created:
+                count += 1
+        return count
+
+    # ── 한 달치 ──────────────────────────────────────────
+    def gen_month(self, user, acc_main, acc_save, acc_card, dt):
+        """dt 가 속한 달의 거래를 모두 만들고 생성 건수를 반환한다."""
+        before = self.tx_count
+
+        # 1) 수입
+        self.gen_income(user, acc_main, dt)
+
+        # 2) 이체: 월급통장 → 생활비통장 (매달 1일)
+        self.gen_transfer(user, acc_main, acc_card, dt)
+
+        # 3) 정기 지출
+        self.gen_fixed(user, acc_main, acc_card, dt)
+
+        # 4) 변동 지출 (체크카드)
+        self.gen_food(user, acc_card, dt)
+        self.gen_transport(user, acc_card, dt)
+        self.gen_culture(user, acc_card, dt)
+        self.gen_shopping(user, acc_card, dt)
+        self.gen_selfdev(user, acc_card, dt)
+        self.gen_misc(user, acc_card, dt)
+        self.gen_friday(user, acc_card, dt)
+
+        # 5) 특별 지출 (월급통장)
+        self.gen_specials(user, acc_main, dt)
+        self.gen_big(user, acc_main, dt)
+
+        # 6) 저축 이체 (월급 다음날)
+        self.gen_saving(user, acc_main, acc_save, dt)
+
+        return self.tx_count - before
+
+
+# ── 유저 단위 생성 ───────────────────────────────────────
+def generate_ledger(user, start, months, seed=None, batch_size=BATCH_SIZE):
+    """user 의 기존 데이터를 지우고 start 가 속한 달부터 months 개월치 가계부를 만든다.
+
+    반환값은 생성한 거래 수. 카테고리는 미리 준비돼 있어야 한다 (ensure_categories).
+    """
+    gen = LedgerGenerator(seed=seed, batch_size=batch_size)
+    gen.ensure_categories()
+
+    # 유저 한 명을 한 트랜잭션으로 (중간에 실패하면 그 유저는 만들지 않은 상태로 남는다)
+    with transaction.atomic():
+        # 집계·데이터 버전은 끝에서 한 번에 맞추므로 행 단위 삭제 시그널 처리는 건너뛴다
+        with bulk_delete():
+            Transaction.objects.filter(user=user).delete()
+            RecurringTransaction.objects.filter(user=user).delete()
+            Account.objects.filter(user=user).delete()
+
+        first = add_months(start, 0)
+        acc_main, acc_save, acc_card = gen.create_accounts(user)
+        gen.create_recurring(user, acc_main, acc_card, start_date=first)
+        Goal.objects.update_or_create(user=user, defaults={
+            "target_saving": 500_000, "monthly_spending_limit": 2_000_000,
+        })
+
+        for i in range(months):
+            gen.gen_month(user, acc_main, acc_save, acc_card, add_months(first, i))
+            gen.flush()
+
+        # bulk_create 는 시그널을 거치지 않으므로 잔액·월별 집계·데이터 버전을 직접 맞춘다
+        Account.objects.bulk_update([acc_main, acc_save, acc_card], ["balance"])
+        rebuild_rollups([user.pk])
+        bump_data_version(user.pk)
+    return gen.tx_count
+
+
+def generate_parallel(user_ids, start, months, seed=42, batch_size=BATCH_SIZE, workers=1):
+    """유저마다 seed + 순번으로 generate_ledger() 하고 생성한 거래 수 합계를 반환한다.
+
+    workers 개 프로세스가 유저를 하나씩 받아 만든다. 동시 쓰기를 받지 못하는
+    DB(SQLite)는 현재 프로세스에서 차례로 만든다 (parallel.py).
+    """
+    LedgerGenerator().ensure_categories()
+    jobs = [(user_id, start, months, seed + i, batch_size) for i, user_id in enumerate(user_ids)]
+    return sum(parallel.run_jobs(_generate_one, jobs, workers, Transaction))
+
+
+def _generate_one(user_id, start, months, seed, batch_size):
+    user = User.objects.get(pk=user_id)
+    return generate_ledger(user, start, months, seed, batch_size)
@@ -0,0 +1,67 @@
+"""거래 내역 내보내기 (CSV / JSONL) — transaction_export 뷰와 export_transactions 커맨드에서 사용.
+
+  export_rows()  : 거래 쿼리셋 → 한 행씩 (컬럼 순서는 columns())
+  stream_lines() : 행 → CSV / JSONL 한 줄씩
+
+원장 전체를 메모리에 올리지 않도록 values_list().iterator(chunk_size) 로
+chunk_size 행씩만 가져오고, 줄도 하나씩 만들어 흘려보낸다.
+원장이 100행이든 1000만 행이든 메모리 사용량은 chunk_size 에만 비례한다.
+"""
+
+import csv
+import json
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+# (헤더, values_list 필드)
+COLUMNS = [
+    ("id", "pk"),
+    ("occurred_at", "occurred_at"),
+    ("account", "account__name"),
+    ("tx_type", "tx_type"),
+    ("amount", "amount"),
+    ("balance_after", "balance_after"),
+    ("category", "category__name"),
+    ("merchant", "merchant"),
+    ("memo", "memo"),
+]
+USER_COLUMN = ("user", "user__username")
+
+
+def columns(include_user=False):
+    return [USER_COLUMN, *COLUMNS] if include_user else list(COLUMNS)
+
+
+def export_rows(qs, include_user=False, chunk_size=CHUNK_SIZE):
+    """qs 의 거래를 최신순으로 한 행(튜플)씩 내보낸다."""
+    fields = [field for _, field in columns(include_user)]
+    rows = qs.order_by("-occurred_at", "-pk").values_list(*fields)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield tuple(value.isoformat() if hasattr(value, "isoformat") else value for value in row)
+
+
+class _Echo:
+    """csv.writer 가 쓴 줄을 버퍼에 쌓지 않고 그대로 돌려준다."""
+
+    def write(self, value):
+        return value
+
+
+def stream_lines(rows, fmt, include_user=False):
+    """행을 fmt("csv" / "jsonl") 형식의 줄로 바꿔 하나씩 내보낸다. CSV 는 헤더 포함."""
+    headers = [header for header, _ in columns(include_user)]
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(["" if value is None else value for value in row])
+    elif fmt == "jsonl":
+        for row in rows:
+            yield json.dumps(dict(zip(headers, row)), ensure_ascii=False) + "\n"
+    else:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
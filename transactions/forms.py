@@ -1,18 +1,87 @@
 """transactions 앱 폼 — 계좌·거래·영수증·정기거래 입력 폼.
 
 TransactionForm / RecurringTransactionForm 은 user 파라미터를 받아
-계좌 드롭다운을 해당 유저의 활성 계좌로만 필터링한다.
-AttachmentForm 은 파일 확장자·크기 유효성을 검사한다.
+계좌 드롭다운을 해당 유저의 활성 계좌로만 필터링한다. 카테고리 드롭다운과 검증은
+카테고리 레지스트리(categories.py)를 쓰는 CategoryChoiceField 로 DB 조회 없이 한다.
+AttachmentForm 은 파일 확장자·크기·내용 시그니처(매직 바이트)를 검사한다. 영수증 업로드
+요청에서는 uploads.ReceiptUploadHandler 가 같은 검사를 받는 중에 먼저 한다.
+StatementImportForm 은 은행 거래 내역 파일(CSV/OFX)과 가져올 계좌를 받는다.
+BatchTransactionFormSet 은 일괄 입력 API 의 거래 N 건을 한 번에 검증한다.
 """
 
 import os
 
+from copy import copy
+
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Account, Transaction, Attachment, RecurringTransaction
+from django.forms.models import ModelChoiceIterator
+
+from . import categories
+from .models import Account, Category, Transaction, Attachment, RecurringTransaction
 
 ALLOWED_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif", ".pdf"]
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+# 확장자별로 파일이 시작해야 하는 바이트 (하나라도 맞으면 통과)
+FILE_SIGNATURES = {
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".gif": (b"GIF87a", b"GIF89a"),
+    ".pdf": (b"%PDF-",),
+}
+SIGNATURE_LENGTH = max(len(sig) for sigs in FILE_SIGNATURES.values() for sig in sigs)
+STATEMENT_EXTENSIONS = [".csv", ".ofx", ".qfx"]
+
+# 영수증 검증 메시지 (폼과 업로드 핸들러가 함께 씀)
+RECEIPT_EXTENSION_ERROR = f"허용되지 않는 파일 형식입니다. ({', '.join(ALLOWED_EXTENSIONS)})"
+RECEIPT_SIZE_ERROR = "파일 크기는 5MB 이하만 업로드 가능합니다."
+RECEIPT_SIGNATURE_ERROR = "파일 내용이 확장자와 맞지 않습니다."
+
+
+def signature_matches(ext, head):
+    """head(파일 앞부분)가 확장자 ext 의 시그니처로 시작하는지."""
+    return head.startswith(FILE_SIGNATURES.get(ext, ()))
+
+
+class CategoryChoiceIterator(ModelChoiceIterator):
+    """카테고리 레지스트리에서 선택지를 만든다 (queryset 을 실행하지 않음)."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for category in categories.all_categories():
+            yield (category.pk, self.field.label_from_instance(category))
+
+    def __len__(self):
+        return len(categories.all_categories()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(categories.all_categories())
+
+
+class CategoryChoiceField(forms.ModelChoiceField):
+    """카테고리 선택 필드. 선택지와 검증 모두 레지스트리를 쓰므로 쿼리가 없다."""
+
+    iterator = CategoryChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, Category):
+            value = value.pk
+        try:
+            category = categories.get_category(int(value))
+        except (ValueError, TypeError):
+            category = None
+        if category is None:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        # 레지스트리의 인스턴스는 공유되므로 거래에는 복사본을 연결한다
+        return copy(category)
 
 
 class AccountForm(forms.ModelForm):
@@ -29,6 +98,7 @@ class TransactionForm(forms.ModelForm):
     class Meta:
         model = Transaction
         fields = ["account", "category", "tx_type", "amount", "occurred_at", "merchant", "memo"]
+        field_classes = {"category": CategoryChoiceField}
         widgets = {
             "occurred_at": forms.DateInput(attrs={"type": "date"}),
         }
@@ -42,7 +112,7 @@ class TransactionForm(forms.ModelForm):
 
 
 class AttachmentForm(forms.ModelForm):
-    """영수증 업로드 폼. 확장자(jpg/png/gif/pdf)와 크기(5MB) 제한."""
+    """영수증 업로드 폼. 확장자(jpg/png/gif/pdf)·크기(5MB)·매직 바이트 검사."""
 
     class Meta:
         model = Attachment
@@ -53,11 +123,13 @@ class AttachmentForm(forms.ModelForm):
         if f:
             ext = os.path.splitext(f.name)[1].lower()
             if ext not in ALLOWED_EXTENSIONS:
-                raise ValidationError(
-                    f"허용되지 않는 파일 형식입니다. ({', '.join(ALLOWED_EXTENSIONS)})"
-                )
+                raise ValidationError(RECEIPT_EXTENSION_ERROR)
             if f.size > MAX_FILE_SIZE:
-                raise ValidationError("파일 크기는 5MB 이하만 업로드 가능합니다.")
+                raise ValidationError(RECEIPT_SIZE_ERROR)
+            head = f.read(SIGNATURE_LENGTH)
+            f.seek(0)
+            if not signature_matches(ext, head):
+                raise ValidationError(RECEIPT_SIGNATURE_ERROR)
         return f
 
 
@@ -71,6 +143,7 @@ class RecurringTransactionForm(forms.ModelForm):
             "recurring_day", "merchant", "memo",
             "start_date", "end_date", "is_active",
         ]
+        field_classes = {"category": CategoryChoiceField}
         widgets = {
             "start_date": forms.DateInput(attrs={"type": "date"}),
             "end_date": forms.DateInput(attrs={"type": "date"}),
@@ -88,3 +161,82 @@ class RecurringTransactionForm(forms.ModelForm):
         if day is not None and not (1 <= day <= 31):
             raise ValidationError("실행일은 1~31 사이여야 합니다.")
         return day
+
+
+class StatementImportForm(forms.Form):
+    """은행 거래 내역 가져오기 폼. 계좌 드롭다운은 로그인 유저의 활성 계좌만 표시."""
+
+    ENCODING_CHOICES = [("utf-8-sig", "UTF-8"), ("cp949", "CP949 (EUC-KR)")]
+
+    account = forms.ModelChoiceField(label="계좌", queryset=Account.objects.none())
+    file = forms.FileField(label="내역 파일 (CSV / OFX)")
+    encoding = forms.ChoiceField(label="인코딩", choices=ENCODING_CHOICES)
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user:
+            self.fields["account"].queryset = Account.objects.filter(
+                user=user, is_active=True
+            )
+
+    def clean_file(self):
+        f = self.cleaned_data.get("file")
+        if f:
+            ext = os.path.splitext(f.name)[1].lower()
+            if ext not in STATEMENT_EXTENSIONS:
+                raise ValidationError(
+                    f"허용되지 않는 파일 형식입니다. ({', '.join(STATEMENT_EXTENSIONS)})"
+                )
+        return f
+
+
+class BatchTransactionForm(forms.Form):
+    """일괄 입력 API 의 거래 한 건.
+
+    계좌·카테고리는 폼셋이 미리 한 번 읽어 둔 선택지에서 고르므로
+    TransactionForm(ModelChoiceField)처럼 행마다 DB 를 조회하지 않는다.
+    """
+
+    account = forms.TypedChoiceField(label="계좌", coerce=int)
+    category = forms.TypedChoiceField(label="카테고리", coerce=int, required=False, empty_value=None)
+    tx_type = forms.ChoiceField(label="입출금 구분", choices=Transaction.TX_TYPE_CHOICES)
+    amount = forms.IntegerField(label="금액", min_value=1)
+    occurred_at = forms.DateField(label="거래일")
+    merchant = forms.CharField(label="가맹점/거래처", max_length=100, required=False)
+    memo = forms.CharField(label="메모", max_length=255, required=False)
+
+    def __init__(self, *args, account_choices=(), category_choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["account"].choices = account_choices
+        self.fields["category"].choices = [("", "---------"), *category_choices]
+
+
+MAX_BATCH_SIZE = 1000
+
+_BaseBatchFormSet = forms.formset_factory(
+    BatchTransactionForm, extra=0, max_num=MAX_BATCH_SIZE, validate_max=True,
+    absolute_max=MAX_BATCH_SIZE,
+)
+
+
+class BatchTransactionFormSet(_BaseBatchFormSet):
+    """거래 N 건 폼셋. 계좌(로그인 유저의 활성 계좌)는 쿼리 1번, 카테고리는 레지스트리에서 읽는다."""
+
+    def __init__(self, *args, user=None, **kwargs):
+        accounts = Account.objects.filter(user=user, is_active=True).values_list("pk", "name")
+        kwargs["form_kwargs"] = {
+            "account_choices": list(accounts),
+            "category_choices": [(c.pk, c.name) for c in categories.all_categories()],
+        }
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def data_from_json(rows, prefix="form"):
+        """[{"account": 1, ...}, ...] → 폼셋 POST 데이터 형식의 dict."""
+        data = {f"{prefix}-TOTAL_FORMS": len(rows), f"{prefix}-INITIAL_FORMS": 0}
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                row = {}
+            for name, value in row.items():
+                data[f"{prefix}-{index}-{name}"] = "" if value is None else value
+        return data
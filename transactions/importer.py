@@ -0,0 +1,398 @@
+"""은행 거래 내역 가져오기 (CSV / OFX) — statement_import 뷰와 import_statement 커맨드에서 사용.
+
+  parse_csv()        : CSV 줄 → StatementRow (헤더 이름으로 컬럼을 찾는다)
+  parse_ofx()        : OFX(SGML/XML) 줄 → StatementRow (<STMTTRN> 단위)
+  import_statement() : StatementRow 들을 한 계좌의 거래로 저장 → ImportResult
+
+파일은 한 줄씩 읽어 CHUNK_SIZE 행씩 처리한다. 묶음마다 한 DB 트랜잭션에서
+  1. 계좌를 잠그고 현재 잔액에서 출발해 거래일 순으로 balance_after 를 계산
+  2. executemany INSERT → 계좌 잔액 UPDATE 1회 → 월별 집계 일괄 반영
+을 하므로 파일 크기와 관계없이 메모리 사용량이 일정하다.
+
+중복 방지: (계좌, 거래일, 금액, 가맹점, 파일 안에서 몇 번째로 나온 같은 거래인지)의
+해시를 Transaction.import_hash 에 저장한다. (계좌, import_hash) 부분 유니크
+인덱스로 이미 가져온 거래를 묶음마다 한 번에 조회해 건너뛰므로, 같은 파일이나
+기간이 겹치는 파일을 다시 가져와도 거래가 두 번 생기지 않는다. 같은 날 같은 곳에서
+같은 금액을 두 번 쓴 거래는 순번이 달라 둘 다 남는다.
+중간에 실패해도 앞선 묶음은 커밋되어 있고(PartialImport 로 커밋된 건수를 알린다),
+다시 가져오면 남은 행만 추가된다.
+
+balance_after 는 묶음마다 현재 잔액 뒤에 이어 붙여 계산한다. 계좌에 이미 있는 거래나
+앞 묶음보다 이른 날짜의 거래가 들어갔다면, 같은 묶음의 트랜잭션 안에서 그 날짜 이후
+구간만 ledger.recompute_balance_after() 로 다시 계산한다. 커밋된 묶음은 언제나 원장과 맞다.
+"""
+
+import csv
+import hashlib
+import html
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple
+
+from django.db import connections, router, transaction
+from django.db.models import F, Max
+from django.utils.timezone import now
+
+from . import categories, ledger, rollups, search
+from .models import Account, Transaction
+from .versioning import bump_data_version
+
+CHUNK_SIZE = 5000
+INSERT_BATCH_SIZE = 1000
+MAX_ERRORS = 20
+
+FORMATS = ("csv", "ofx")
+
+
+class StatementRow(NamedTuple):
+    occurred_at: date
+    amount: int        # 입금 +, 출금 -
+    merchant: str
+    memo: str
+    category: str      # 카테고리명 (없으면 "")
+
+
+class InvalidRow(NamedTuple):
+    line: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    created: int = 0      # 새로 만든 거래 수
+    duplicates: int = 0   # 이미 가져온 거래라 건너뛴 행 수
+    invalid: int = 0      # 해석하지 못해 건너뛴 행 수
+    errors: list = field(default_factory=list)  # 앞쪽 MAX_ERRORS 개의 오류 메시지
+
+    def add(self, other):
+        self.created += other.created
+        self.duplicates += other.duplicates
+
+
+class PartialImport(Exception):
+    """앞선 묶음을 커밋한 뒤 가져오기가 실패했을 때. result 는 커밋된 만큼의 ImportResult."""
+
+    def __init__(self, result, error):
+        super().__init__(f"{result.created}건을 저장한 뒤 중단되었습니다: {error}")
+        self.result = result
+
+
+def detect_format(filename):
+    """파일 확장자로 형식을 고른다 (.ofx / .qfx → ofx, 그 외 csv)."""
+    return "ofx" if filename.lower().endswith((".ofx", ".qfx")) else "csv"
+
+
+# ──────────────────────────────────
+# 값 해석
+# ──────────────────────────────────
+
+_TYPE_WORDS = {
+    "IN": 1, "입금": 1, "수입": 1, "DEPOSIT": 1, "CREDIT": 1,
+    "OUT": -1, "출금": -1, "지출": -1, "WITHDRAWAL": -1, "DEBIT": -1,
+}
+
+
+def _parse_date(text):
+    """'2026-01-10', '2026.01.10', '2026/01/10', '20260110' (뒤에 시각이 붙어도 됨)."""
+    text = text.strip()
+    if text[:8].isdigit():
+        return date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+    return date.fromisoformat(text[:10].replace(".", "-").replace("/", "-"))
+
+
+def _parse_amount(text):
+    """'12,000', '-12000원', '12000.00' → 정수 (원 단위). 빈 값은 0."""
+    text = text.strip().replace(",", "").replace("원", "").replace(" ", "")
+    if not text:
+        return 0
+    return int(Decimal(text))
+
+
+# ──────────────────────────────────
+# 파서
+# ──────────────────────────────────
+
+# 컬럼 → 허용하는 헤더 이름 (대소문자 무시). export_transactions 의 헤더도 그대로 읽는다.
+CSV_COLUMNS = {
+    "date": ("occurred_at", "date", "거래일", "거래일자", "거래일시", "날짜"),
+    "type": ("tx_type", "type", "구분", "입출금", "거래구분"),
+    "amount": ("amount", "금액", "거래금액"),
+    "deposit": ("deposit", "입금", "입금액", "맡기신금액"),
+    "withdrawal": ("withdrawal", "출금", "출금액", "찾으신금액"),
+    "merchant": ("merchant", "payee", "가맹점", "거래처", "적요", "내용"),
+    "memo": ("memo", "메모", "비고"),
+    "category": ("category", "카테고리"),
+}
+
+
+def _csv_positions(header):
+    names = [name.strip().lower() for name in header]
+    positions = {}
+    for column, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                positions[column] = names.index(alias)
+                break
+    if "date" not in positions:
+        raise ValueError("CSV 헤더에 거래일 컬럼이 없습니다.")
+    if "amount" not in positions and not {"deposit", "withdrawal"} & positions.keys():
+        raise ValueError("CSV 헤더에 금액(또는 입금/출금) 컬럼이 없습니다.")
+    return positions
+
+
+def parse_csv(lines):
+    """CSV 줄(첫 줄은 헤더)을 StatementRow / InvalidRow 로 하나씩 내보낸다.
+
+    금액은 부호가 있는 amount, 또는 amount + 구분(입금/출금), 또는 입금·출금
+    두 컬럼 중 하나로 줄 수 있다. 헤더가 맞지 않으면 ValueError.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    positions = _csv_positions(header)
+    width = max(positions.values()) + 1
+
+    def cell(row, column):
+        index = positions.get(column)
+        return row[index] if index is not None else ""
+
+    for row in reader:
+        if not any(row):
+            continue
+        line = reader.line_num
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        try:
+            occurred_at = _parse_date(cell(row, "date"))
+            if "amount" in positions:
+                amount = _parse_amount(cell(row, "amount"))
+                sign = _TYPE_WORDS.get(cell(row, "type").strip().upper())
+                if sign is not None:
+                    amount = sign * abs(amount)
+            else:
+                amount = _parse_amount(cell(row, "deposit")) - _parse_amount(cell(row, "withdrawal"))
+        except (ValueError, InvalidOperation):
+            yield InvalidRow(line, f"{line}행: 날짜나 금액을 읽을 수 없습니다.")
+            continue
+        if not amount:
+            yield InvalidRow(line, f"{line}행: 금액이 0 입니다.")
+            continue
+        yield StatementRow(
+            occurred_at, amount,
+            cell(row, "merchant").strip(), cell(row, "memo").strip(), cell(row, "category").strip(),
+        )
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def parse_ofx(lines):
+    """OFX 의 <STMTTRN> 블록을 StatementRow / InvalidRow 로 하나씩 내보낸다.
+
+    닫는 태그가 없는 SGML(OFX 1.x)과 XML(OFX 2.x) 모두 읽는다.
+    DTPOSTED → 거래일, TRNAMT(부호 포함) → 금액, NAME → 가맹점, MEMO → 메모.
+    """
+    current = None
+    for line_no, line in enumerate(lines, 1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if current is not None:
+                    yield _ofx_row(current)
+                current = None if closing else {"line": line_no}
+            elif current is not None and not closing:
+                current[tag] = html.unescape(value.strip())
+    if current is not None:
+        yield _ofx_row(current)
+
+
+def _ofx_row(fields):
+    line = fields["line"]
+    try:
+        occurred_at = _parse_date(fields.get("DTPOSTED", ""))
+        amount = _parse_amount(fields.get("TRNAMT", ""))
+    except (ValueError, InvalidOperation):
+        return InvalidRow(line, f"{line}행: 날짜나 금액을 읽을 수 없습니다.")
+    if not amount:
+        return InvalidRow(line, f"{line}행: 금액이 0 입니다.")
+    return StatementRow(
+        occurred_at, amount, fields.get("NAME", ""), fields.get("MEMO", ""), "",
+    )
+
+
+def parse_statement(lines, fmt):
+    if fmt == "csv":
+        return parse_csv(lines)
+    if fmt == "ofx":
+        return parse_ofx(lines)
+    raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+
+
+# ──────────────────────────────────
+# 저장
+# ──────────────────────────────────
+
+def import_hash(account_id, occurred_at, amount, merchant, occurrence):
+    """(계좌, 거래일, 금액, 가맹점, 순번) → 중복 판별 키 (64자).
+
+    'YYYYMMDD' + SHA-256 hex 앞 56자. 거래일을 앞에 두면 날짜순 파일의 키가
+    인덱스의 가까운 페이지에 모여, 무작위 해시보다 INSERT·조회가 훨씬 빠르다.
+    """
+    payload = f"{account_id}|{occurred_at.isoformat()}|{amount}|{merchant}|{occurrence}"
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{occurred_at:%Y%m%d}{digest[:56]}"
+
+
+def _category_lookup():
+    """(카테고리명, 입출금) → category_id. 이름이 같으면 유형이 맞는 카테고리를 우선한다."""
+    by_type, by_name = {}, {}
+    for category in categories.all_categories():
+        by_type.setdefault((category.name, category.cat_type), category.pk)
+        by_name.setdefault(category.name, category.pk)
+
+    def lookup(name, tx_type):
+        if not name:
+            return None
+        return by_type.get((name, tx_type)) or by_name.get(name)
+    return lookup
+
+
+def import_statement(account, rows, chunk_size=CHUNK_SIZE):
+    """rows(parse_csv / parse_ofx 결과)를 account 의 거래로 저장하고 ImportResult 를 반환한다.
+
+    묶음을 하나 이상 커밋한 뒤 실패하면 PartialImport 를 일으킨다 (원래 예외는 __cause__).
+    """
+    result = ImportResult()
+    category_for = _category_lookup()
+    seen = Counter()  # (거래일, 금액, 가맹점) → 파일 안에서 나온 횟수
+
+    def flush(chunk):
+        result.add(_import_chunk(account, chunk, seen, category_for))
+
+    try:
+        chunk = []
+        for row in rows:
+            if isinstance(row, InvalidRow):
+                result.invalid += 1
+                if len(result.errors) < MAX_ERRORS:
+                    result.errors.append(row.message)
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+    except Exception as e:
+        if result.created:
+            raise PartialImport(result, e) from e
+        raise
+    finally:
+        if result.created:
+            # bulk_create 는 시그널을 보내지 않으므로 InMoney 캐시 무효화도 직접
+            bump_data_version(account.user_id)
+    return result
+
+
+class _NewTransaction(NamedTuple):
+    """INSERT 할 거래 한 행. 필드 순서가 곧 컬럼 순서 (rollups.apply_transactions 에도 그대로 넘긴다)."""
+    user_id: int
+    account_id: int
+    category_id: int
+    tx_type: str
+    amount: int
+    balance_after: int
+    occurred_at: date
+    merchant: str
+    memo: str
+    import_hash: str
+
+
+def _insert(new_transactions):
+    """거래 행을 executemany 한 번으로 INSERT 한다.
+
+    모델 인스턴스를 만들고 필드마다 값을 변환하는 bulk_create 의 비용이
+    수십만 행에서는 DB 쓰기보다 커서, 값이 이미 정해진 가져오기 경로만 직접 쓴다.
+    검색 색인(SQLite FTS5)도 행마다가 아니라 묶음 끝에 한 번에 만든다.
+    """
+    connection = connections[router.db_for_write(Transaction)]
+    ops = connection.ops
+    created_at = ops.adapt_datetimefield_value(now())
+    columns = [*_NewTransaction._fields, "created_at", "updated_at"]
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        ops.quote_name(Transaction._meta.db_table),
+        ", ".join(ops.quote_name(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+    params = [
+        (*tx[:6], ops.adapt_datefield_value(tx.occurred_at), *tx[7:], created_at, created_at)
+        for tx in new_transactions
+    ]
+    with search.deferred_indexing(connection), connection.cursor() as cursor:
+        for start in range(0, len(params), INSERT_BATCH_SIZE):
+            cursor.executemany(sql, params[start:start + INSERT_BATCH_SIZE])
+
+
+def _existing_hashes(account, keys):
+    """keys 중 account 에 이미 있는 import_hash 집합. DB 의 파라미터 수 한도에 맞춰 나눠 조회한다."""
+    connection = connections[router.db_for_read(Transaction)]
+    limit = connection.features.max_query_params
+    batch_size = limit - 2 if limit else len(keys)  # account_id, '' 파라미터 몫 2개
+    existing = set()
+    for start in range(0, len(keys), batch_size):
+        # exclude(import_hash="") 는 부분 유니크 인덱스의 조건과 같아야 인덱스를 탄다
+        existing.update(
+            Transaction.objects.filter(
+                account_id=account.pk, import_hash__in=keys[start:start + batch_size],
+            ).exclude(import_hash="").order_by().values_list("import_hash", flat=True)
+        )
+    return existing
+
+
+def _import_chunk(account, rows, seen, category_for):
+    """묶음 하나를 한 트랜잭션에서 저장하고 ImportResult 를 반환한다."""
+    result = ImportResult()
+    keyed = []
+    for row in rows:
+        merchant = row.merchant[:100]
+        key = (row.occurred_at, row.amount, merchant)
+        seen[key] += 1
+        keyed.append((row, import_hash(account.pk, *key, seen[key])))
+
+    with transaction.atomic():
+        balance = ledger.lock_accounts([account.pk])[account.pk]
+        existing = _existing_hashes(account, [key for _, key in keyed])
+        fresh = [(row, key) for row, key in keyed if key not in existing]
+        result.duplicates = len(keyed) - len(fresh)
+        if not fresh:
+            return result
+        latest = (
+            Transaction.objects.filter(account_id=account.pk)
+            .aggregate(last=Max("occurred_at"))["last"]
+        )
+
+        # 거래일 순으로 잔액을 굴려 balance_after 를 채운다 (같은 날은 파일 순서)
+        fresh.sort(key=lambda item: item[0].occurred_at)
+        start_balance = balance
+        new_transactions = []
+        for row, key in fresh:
+            balance += row.amount
+            tx_type = Transaction.IN if row.amount > 0 else Transaction.OUT
+            new_transactions.append(_NewTransaction(
+                account.user_id, account.pk, category_for(row.category, tx_type), tx_type,
+                abs(row.amount), balance, row.occurred_at, row.merchant[:100], row.memo[:255], key,
+            ))
+        _insert(new_transactions)
+        Account.objects.filter(pk=account.pk).update(balance=F("balance") + (balance - start_balance))
+        # 시그널을 거치지 않으므로 월별 집계는 직접 반영
+        rollups.apply_transactions(new_transactions)
+        first = new_transactions[0].occurred_at
+        if latest and first < latest:
+            # 이미 있는 거래보다 앞선 날짜로 들어갔으면 그 뒤 구간의 balance_after 를 다시 계산
+            ledger.recompute_balance_after(account.pk, balance, first)
+    result.created = len(new_transactions)
+    return result
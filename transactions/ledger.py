@@ -0,0 +1,240 @@
+"""계좌 잔액 원장 — 거래 저장과 잔액·balance_after 갱신을 한 곳에서.
+
+거래를 쓰는 모든 경로는 transaction.atomic() 안에서 계좌 행을 SELECT ... FOR UPDATE 로
+잠근 뒤 잔액을 바꾼다. 같은 계좌에 동시에 들어온 요청은 잠금 순서대로 처리되므로
+잔액과 balance_after 스냅샷이 어긋나지 않는다. 여러 계좌는 항상 pk 순서로 잠가
+두 요청이 서로를 기다리는 교착을 막는다.
+
+balance_after 는 계좌의 거래를 (occurred_at, id) 순으로 줄 세웠을 때 그 거래 직후의
+잔액이다. 과거 날짜로 거래를 넣거나, 수정·삭제하면 그 뒤 거래들의 스냅샷이 모두
+바뀌므로 영향받는 구간(suffix)만 윈도 함수 UPDATE 한 번으로 다시 계산한다.
+
+  balance_after = A - SUM(d) OVER () + SUM(d) OVER (ORDER BY occurred_at, id)
+
+A 는 잠근 계좌의 (변경 후) 현재 잔액, d 는 구간 안 거래의 증감(입금 +, 출금 -)이다.
+구간 밖의 거래와 계좌 전체를 다시 계산하지 않는다.
+
+  record()  : 거래 생성 (transaction_create)
+  revise()  : 거래 수정 — 이전 계좌·금액을 되돌리고 새 값 적용 (transaction_update)
+  remove()  : 거래 삭제 (transaction_delete)
+  save_account() : 계좌 수정 — 잔액을 직접 고치면 개설 잔액과 balance_after 도 함께 옮김
+  lock_accounts() / apply_deltas() / stale_suffixes() / recompute_balance_after()
+            : 여러 건을 한 번에 쓰는 경로(batch, recurring, importer)에서 사용
+"""
+
+from typing import NamedTuple
+
+from django.db import connections, router, transaction
+from django.db.models import Case, F, IntegerField, Max, Value, When
+
+from .models import Account, Transaction
+
+
+class Position(NamedTuple):
+    """거래의 원장상 위치와 값 — 수정 전 상태를 기억해 두는 데 쓴다."""
+    account_id: int
+    tx_type: str
+    amount: int
+    occurred_at: object
+    pk: int
+
+
+def position(tx):
+    return Position(tx.account_id, tx.tx_type, tx.amount, tx.occurred_at, tx.pk)
+
+
+def signed_amount(tx_type, amount):
+    """잔액 증감: 입금 +, 출금 -"""
+    return amount if tx_type == Transaction.IN else -amount
+
+
+def lock_accounts(account_ids):
+    """계좌들을 pk 순서로 잠그고 {pk: 현재 잔액} 을 반환한다."""
+    return dict(
+        Account.objects.select_for_update()
+        .filter(pk__in=set(account_ids))
+        .order_by("pk")
+        .values_list("pk", "balance")
+    )
+
+
+def apply_deltas(deltas):
+    """{계좌 pk: 증감} 을 UPDATE 한 번으로 반영한다 (F() + CASE)."""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    Account.objects.filter(pk__in=deltas).update(balance=F("balance") + Case(
+        *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+
+
+def stale_suffixes(first_dates):
+    """새 거래를 넣기 전에 호출한다. first_dates 는 {계좌 pk: 새 거래 중 가장 이른 거래일}.
+
+    그 날짜보다 뒤에 기존 거래가 있는 계좌만 {계좌 pk: 다시 계산할 시작일} 로 돌려준다.
+    같은 날짜의 기존 거래는 id 가 작아 새 거래보다 앞서므로 영향이 없다.
+    """
+    if not first_dates:
+        return {}
+    last_dates = dict(
+        Transaction.objects.filter(account_id__in=first_dates)
+        .order_by()
+        .values("account_id")
+        .annotate(last=Max("occurred_at"))
+        .values_list("account_id", "last")
+    )
+    return {
+        pk: first for pk, first in first_dates.items()
+        if pk in last_dates and first < last_dates[pk]
+    }
+
+
+def recompute_balance_after(account_id, balance, occurred_at, tx_id=0):
+    """account_id 의 (occurred_at, tx_id) 이후 거래의 balance_after 를 다시 계산한다.
+
+    balance 는 잠근 계좌의 현재 잔액. 갱신한 행 수를 반환한다.
+    """
+    connection = connections[router.db_for_write(Transaction)]
+    qn = connection.ops.quote_name
+    table = qn(Transaction._meta.db_table)
+    suffix = (
+        f"SELECT id, occurred_at, "
+        f"CASE WHEN tx_type = %s THEN amount ELSE -amount END AS delta "
+        f"FROM {table} WHERE account_id = %s "
+        f"AND (occurred_at > %s OR (occurred_at = %s AND id >= %s))"
+    )
+    running = (
+        f"SELECT id, %s - SUM(delta) OVER () + SUM(delta) OVER ("
+        f"ORDER BY occurred_at, id ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW"
+        f") AS balance_after FROM ({suffix}) AS suffix"
+    )
+    day = connection.ops.adapt_datefield_value(occurred_at)
+    params = [balance, Transaction.IN, account_id, day, day, tx_id]
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite" and connection.Database.sqlite_version_info < (3, 33):
+            # UPDATE ... FROM 이 없는 SQLite → 계산 결과를 읽어 CASE UPDATE 한 번
+            cursor.execute(running, params)
+            values = dict(cursor.fetchall())
+            if not values:
+                return 0
+            return Transaction.objects.filter(pk__in=values).update(balance_after=Case(
+                *[When(pk=pk, then=Value(value)) for pk, value in values.items()],
+                output_field=IntegerField(),
+            ))
+        cursor.execute(
+            f"UPDATE {table} SET {qn('balance_after')} = running.balance_after "
+            f"FROM ({running}) AS running WHERE {table}.id = running.id",
+            params,
+        )
+        return cursor.rowcount
+
+
+# ──────────────────────────────────
+# 거래 1건 쓰기 (views)
+# ──────────────────────────────────
+
+def record(tx):
+    """새 거래 tx 를 저장하고 계좌 잔액·balance_after 를 반영한다."""
+    with transaction.atomic():
+        balance = lock_accounts([tx.account_id])[tx.account_id]
+        balance += signed_amount(tx.tx_type, tx.amount)
+        Account.objects.filter(pk=tx.account_id).update(balance=balance)
+        tx.save()
+        recompute_balance_after(tx.account_id, balance, tx.occurred_at, tx.pk)
+        tx.balance_after = Transaction.objects.values_list("balance_after", flat=True).get(pk=tx.pk)
+    return tx
+
+
+def _locked_position(pk):
+    """계좌를 잠근 뒤 거래 행을 잠그고 다시 읽은 현재 Position (없으면 None)."""
+    row = (
+        Transaction.objects.select_for_update()
+        .filter(pk=pk)
+        .values_list("account_id", "tx_type", "amount", "occurred_at", "pk")
+        .first()
+    )
+    return Position(*row) if row else None
+
+
+def revise(tx, before):
+    """수정된 tx 를 저장한다. before 는 호출한 쪽이 읽어 둔 수정 전 position(tx).
+
+    before 는 잠글 계좌를 고르는 데만 쓰고, 되돌릴 이전 값은 계좌를 잠근 뒤 거래 행을
+    다시 읽어 정한다. 같은 거래를 동시에 수정해도 둘 다 같은 이전 금액을 되돌리지 않는다.
+    """
+    account_ids = {before.account_id, tx.account_id}
+    while True:
+        with transaction.atomic():
+            balances = lock_accounts(account_ids)
+            before = _locked_position(tx.pk)
+            if before is None:
+                raise Transaction.DoesNotExist("수정하는 동안 거래가 삭제되었습니다.")
+            if before.account_id in balances:
+                return _revise_locked(tx, before, balances)
+        # 읽은 뒤 다른 요청이 거래를 다른 계좌로 옮겼다. 잠금을 더 얹으면 pk 순서가 깨져
+        # record() 와 교착될 수 있으므로, 트랜잭션을 끝내 잠금을 풀고 처음부터 다시 잠근다
+        account_ids = {before.account_id, tx.account_id}
+
+
+def _revise_locked(tx, before, balances):
+    balances[before.account_id] -= signed_amount(before.tx_type, before.amount)
+    balances[tx.account_id] += signed_amount(tx.tx_type, tx.amount)
+    for pk, balance in balances.items():
+        Account.objects.filter(pk=pk).update(balance=balance)
+    tx.save()
+
+    # 계좌별로 이전·새 위치 중 앞선 곳부터 다시 계산
+    starts = {}
+    for account_id, occurred_at, pk in [
+        (before.account_id, before.occurred_at, before.pk),
+        (tx.account_id, tx.occurred_at, tx.pk),
+    ]:
+        start = (occurred_at, pk)
+        starts[account_id] = min(starts.get(account_id, start), start)
+    for account_id, (occurred_at, pk) in starts.items():
+        recompute_balance_after(account_id, balances[account_id], occurred_at, pk)
+    tx.balance_after = Transaction.objects.values_list("balance_after", flat=True).get(pk=tx.pk)
+    return tx
+
+
+def remove(tx):
+    """거래 tx 를 삭제하고 잔액을 되돌린 뒤 그 뒤 거래들의 balance_after 를 다시 계산한다.
+
+    revise() 와 같이 되돌릴 값은 계좌를 잠근 뒤 다시 읽은 행에서 가져온다.
+    """
+    account_id = tx.account_id
+    while True:
+        with transaction.atomic():
+            balances = lock_accounts([account_id])
+            current = _locked_position(tx.pk)
+            if current is None:
+                return  # 다른 요청이 이미 삭제
+            if current.account_id in balances:
+                balance = balances[current.account_id] - signed_amount(current.tx_type, current.amount)
+                Account.objects.filter(pk=current.account_id).update(balance=balance)
+                tx.delete()
+                recompute_balance_after(current.account_id, balance, current.occurred_at, current.pk)
+                return
+        # revise() 와 같이 옮겨 간 계좌를 잠그고 다시 시도
+        account_id = current.account_id
+
+
+def save_account(account):
+    """계좌 정보를 저장한다 (account_update).
+
+    사용자가 잔액을 직접 고쳤다면 그 차이만큼 개설 잔액(opening_balance)과
+    모든 거래의 balance_after 를 옮겨, 원장과 잔액이 계속 맞도록 한다.
+    """
+    with transaction.atomic():
+        diff = account.balance - lock_accounts([account.pk])[account.pk]
+        account.save()
+        if diff:
+            Account.objects.filter(pk=account.pk).update(
+                opening_balance=F("opening_balance") + diff,
+            )
+            Transaction.objects.filter(account_id=account.pk).update(
+                balance_after=F("balance_after") + diff,
+            )
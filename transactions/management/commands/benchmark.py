@@ -0,0 +1,96 @@
+"""성능 벤치마크 커맨드.
+
+사용법:
+  python manage.py benchmark                               # 기본 크기 5x1, 20x2 (유저 x 년)
+  python manage.py benchmark --sizes 10x1,100x2,100x5 -o bench.json
+  python manage.py benchmark --compare baseline.json -o bench.json
+
+크기마다 빈 벤치마크 전용 DB(테스트 DB 와 같은 방식으로 만들고 끝나면 삭제)에
+N 유저 × M 년치 더미 가계부를 만든 뒤, 거래 목록·대시보드·InMoney 화면과
+process_recurring 의 p50/p95 응답 시간, 쿼리 수, 최대 메모리를 잰다 (transactions/benchmark.py).
+결과는 JSON 파일로 남기고, --compare 로 이전 결과와 비교할 수 있다.
+"""
+
+import json
+import platform
+from datetime import datetime
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from transactions import benchmark
+
+
+def _parse_sizes(value):
+    """'10x1,100x2' → [(10, 1), (100, 2)]"""
+    sizes = []
+    for part in value.split(","):
+        try:
+            users, years = (int(n) for n in part.lower().split("x"))
+        except ValueError:
+            raise CommandError(f"--sizes 는 '유저x년' 목록이어야 합니다. (예: 10x1,100x2): {part}")
+        if users < 1 or years < 1:
+            raise CommandError("--sizes 의 유저 수와 년 수는 1 이상이어야 합니다.")
+        sizes.append((users, years))
+    return sizes
+
+
+class Command(BaseCommand):
+    help = "N 유저 x M 년 더미 데이터로 주요 화면과 정기 거래 처리 성능을 잽니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="5x1,20x2", help="유저x년 목록 (기본: 5x1,20x2)")
+        parser.add_argument("--requests", type=int, default=20, help="대상마다 반복 횟수 (기본: 20)")
+        parser.add_argument("--seed", type=int, default=42, help="난수 seed (기본: 42)")
+        parser.add_argument("-o", "--output", default="benchmark.json", help="결과 JSON 경로")
+        parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+
+    def handle(self, *args, **options):
+        sizes = _parse_sizes(options["sizes"])
+        if options["requests"] < 1:
+            raise CommandError("--requests 는 1 이상이어야 합니다.")
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"비교할 결과를 읽을 수 없습니다: {e}")
+
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "seed": options["seed"],
+            "requests": options["requests"],
+            "runs": [],
+        }
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            for users, years in sizes:
+                self.stdout.write(self.style.NOTICE(f"── {users}명 x {years}년 ──"))
+                call_command("flush", interactive=False, verbosity=0)
+                run = benchmark.run_size(users, years, options["requests"], options["seed"])
+                report["runs"].append(run)
+                self.stdout.write(f"  거래 {run['transactions']:,}건 생성 ({run['generate_s']}초)")
+                for name, m in run["results"].items():
+                    self.stdout.write(
+                        f"  {name:<18} p50 {m['p50_ms']:>8.1f}ms  p95 {m['p95_ms']:>8.1f}ms  "
+                        f"쿼리 {m['queries']:>4}  메모리 {m['peak_kb']:>9,.0f}KB"
+                    )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"완료: 결과 → {options['output']}"))
+
+        if baseline:
+            self.stdout.write(self.style.NOTICE(f"── {options['compare']} 대비 ──"))
+            for size, name, key, before, after, change in benchmark.compare(baseline, report):
+                if change is not None:
+                    self.stdout.write(f"  {size:<8} {name:<18} {key:<8} {before} → {after} ({change:+.1f}%)")
@@ -0,0 +1,76 @@
+"""거래 내역 내보내기 커맨드 (CSV / JSONL).
+
+사용법:
+  python manage.py export_transactions --user fkc256 > fkc256.csv
+  python manage.py export_transactions --user fkc256 --format jsonl -o fkc256.jsonl
+  python manage.py export_transactions --all --date-from 2026-01-01 -o 2026.csv
+
+거래 목록 화면과 같은 필터(--account, --category, --tx-type, --date-from,
+--date-to, --q)를 적용할 수 있다. --all 이면 모든 유저의 거래를 user 컬럼과 함께 내보낸다.
+행은 --chunk-size 개씩 읽어 바로 쓰므로 원장 크기와 관계없이 메모리 사용량이 일정하다.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions import export
+from transactions.models import Transaction
+from transactions.querysets import filter_transactions
+
+User = get_user_model()
+
+FILTERS = ("account", "category", "tx_type", "date_from", "date_to", "q")
+
+
+class Command(BaseCommand):
+    help = "거래 내역을 CSV 또는 JSONL 로 내보냅니다."
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--user", help="내보낼 유저의 username")
+        target.add_argument("--all", action="store_true", help="모든 유저의 거래를 내보냄")
+        parser.add_argument("--format", choices=sorted(export.FORMATS), default="csv")
+        parser.add_argument("-o", "--output", help="저장할 파일 경로 (생략 시 표준 출력)")
+        parser.add_argument(
+            "--chunk-size", type=int, default=export.CHUNK_SIZE,
+            help=f"DB 에서 한 번에 읽을 행 수 (기본: {export.CHUNK_SIZE})",
+        )
+        parser.add_argument("--account", help="계좌 id")
+        parser.add_argument("--category", help="카테고리 id")
+        parser.add_argument("--tx-type", choices=["IN", "OUT"])
+        parser.add_argument("--date-from", help="시작일 (YYYY-MM-DD)")
+        parser.add_argument("--date-to", help="종료일 (YYYY-MM-DD)")
+        parser.add_argument("--q", help="메모/가맹점 검색어")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size 는 1 이상이어야 합니다.")
+
+        qs = Transaction.objects.all()
+        if options["user"]:
+            try:
+                qs = qs.filter(user=User.objects.get(username=options["user"]))
+            except User.DoesNotExist:
+                raise CommandError(f"username '{options['user']}' 유저가 존재하지 않습니다.")
+        params = {name: options[name] for name in FILTERS if options[name]}
+        qs = filter_transactions(qs, params)
+
+        include_user = options["all"]
+        self.count = 0
+        rows = self._counted(
+            export.export_rows(qs, include_user, chunk_size=options["chunk_size"])
+        )
+        lines = export.stream_lines(rows, options["format"], include_user)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as f:
+                f.writelines(lines)
+            self.stderr.write(self.style.SUCCESS(f"완료: {self.count}건 → {options['output']}"))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
+
+    def _counted(self, rows):
+        for row in rows:
+            self.count += 1
+            yield row
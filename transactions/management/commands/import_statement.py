@@ -0,0 +1,61 @@
+"""은행 거래 내역 가져오기 커맨드 (CSV / OFX).
+
+사용법:
+  python manage.py import_statement 국민_2020-2025.csv --account 3
+  python manage.py import_statement statement.ofx --account 3
+  python manage.py import_statement old.csv --account 3 --encoding cp949 --chunk-size 10000
+
+파일을 한 줄씩 읽어 --chunk-size 행마다 bulk_create 하고 계좌 잔액을 한 번 갱신한다.
+이미 가져온 거래(같은 계좌·거래일·금액·가맹점)는 건너뛰므로 여러 번 실행해도 안전하다.
+형식은 확장자로 고르며(.ofx/.qfx → OFX, 그 외 CSV) --format 으로 지정할 수도 있다.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions import importer
+from transactions.models import Account
+
+
+class Command(BaseCommand):
+    help = "은행 거래 내역 파일(CSV/OFX)을 계좌의 거래로 가져옵니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="가져올 파일 경로")
+        parser.add_argument("--account", type=int, required=True, help="거래를 넣을 계좌 id")
+        parser.add_argument("--format", choices=importer.FORMATS, help="파일 형식 (기본: 확장자로 판단)")
+        parser.add_argument("--encoding", default="utf-8-sig", help="파일 인코딩 (기본: utf-8-sig)")
+        parser.add_argument(
+            "--chunk-size", type=int, default=importer.CHUNK_SIZE,
+            help=f"한 트랜잭션에서 저장할 행 수 (기본: {importer.CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size 는 1 이상이어야 합니다.")
+        try:
+            account = Account.objects.get(pk=options["account"])
+        except Account.DoesNotExist:
+            raise CommandError(f"id {options['account']} 계좌가 존재하지 않습니다.")
+
+        path = options["path"]
+        fmt = options["format"] or importer.detect_format(path)
+        try:
+            with open(path, encoding=options["encoding"], newline="") as f:
+                result = importer.import_statement(
+                    account, importer.parse_statement(f, fmt), chunk_size=options["chunk_size"],
+                )
+        except importer.PartialImport as e:
+            raise CommandError(str(e))
+        except OSError as e:
+            raise CommandError(f"파일을 열 수 없습니다: {e}")
+        except ValueError as e:  # 헤더 오류, 인코딩 오류(UnicodeDecodeError)
+            raise CommandError(str(e))
+
+        for message in result.errors:
+            self.stderr.write(message)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"완료: {result.created}건 추가, {result.duplicates}건 중복"
+                + (f", {result.invalid}건 오류" if result.invalid else "")
+            )
+        )
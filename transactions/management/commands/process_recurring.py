@@ -1,83 +1,83 @@
 """정기 거래 자동 실행 커맨드.
 
-매일 cron 등으로 실행하면 오늘 날짜와 recurring_day 가 일치하는
-정기 거래를 찾아 실제 Transaction 을 생성하고 계좌 잔액을 갱신한다.
+매일 cron 등으로 실행하면 실행일이 지난 정기 거래를 찾아
+실제 Transaction 을 생성하고 계좌 잔액을 갱신한다.
 
-사용법: python manage.py process_recurring
+사용법:
+  python manage.py process_recurring [--chunk-size 500]
+  python manage.py process_recurring --workers 4    # 유저를 4개 샤드로 나눠 4개 프로세스로 실행
+  python manage.py process_recurring --shard 0/4    # 4개 중 0번 샤드만 (여러 서버/cron 에 분산)
 
-처리 로직:
-  1. 종료일이 지난 정기 거래 → is_active = False 로 비활성화
+처리 로직 (transactions/recurring.py):
+  1. 마지막 실행 이후 밀린 달마다 recurring_day 에 1건씩 생성
+     (여러 달 밀렸어도 한 번에 따라잡음, 말일 보정)
   2. 이번 달 이미 실행된 정기 거래 → 스킵
-  3. 그 외 → Transaction 생성 + 잔액 갱신 + last_executed 갱신
+  3. 종료일이 지난 정기 거래 → 종료일까지의 거래 생성 후 is_active = False
+  4. 템플릿 chunk-size 개 단위로 bulk_create + 계좌별 잔액 합산 UPDATE 후 커밋
+
+템플릿은 SELECT ... FOR UPDATE SKIP LOCKED 로 잠그고 처리하므로(PostgreSQL 등)
+cron 이 겹쳐 실행되거나 샤드를 잘못 나눠도 같은 템플릿이 두 번 실행되지 않는다.
 """
 
 from datetime import date
 
-from django.core.management.base import BaseCommand
-from django.db.models import F
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.recurring import (
+    CHUNK_SIZE, process_recurring, process_recurring_parallel,
+)
+
 
-from transactions.models import RecurringTransaction, Transaction, Account
+def _parse_shard(value):
+    """'i/N' 형식의 샤드 지정을 (i, N) 으로 해석한다."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise CommandError("--shard 는 'i/N' 형식이어야 합니다. (예: 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise CommandError("--shard i/N 은 0 <= i < N 이어야 합니다.")
+    return index, count
 
 
 class Command(BaseCommand):
-    help = "오늘 날짜와 일치하는 정기 거래를 실행하여 Transaction을 자동 생성합니다."
+    help = "실행일이 지난 정기 거래를 실행하여 Transaction을 자동 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=CHUNK_SIZE,
+            help=f"한 트랜잭션에서 처리할 정기 거래 템플릿 수 (기본: {CHUNK_SIZE})",
+        )
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--workers", type=int, default=1,
+            help="유저를 N 개 샤드로 나눠 N 개 프로세스로 동시에 실행 (기본: 1)",
+        )
+        group.add_argument(
+            "--shard", type=str,
+            help="'i/N' — user_id %% N == i 인 유저의 정기 거래만 실행",
+        )
 
     def handle(self, *args, **options):
-        today = date.today()
-        day = today.day
-
-        recurring_qs = RecurringTransaction.objects.filter(
-            is_active=True,
-            recurring_day__lte=day,  # 오늘 이전 날짜도 포함 (놓친 정기거래 처리)
-            start_date__lte=today,
-        ).select_related("account", "user")
-
-        created = 0
-        skipped = 0
-
-        for rec in recurring_qs:
-            # 종료일 체크
-            if rec.end_date and rec.end_date < today:
-                rec.is_active = False
-                rec.save(update_fields=["is_active"])
-                skipped += 1
-                continue
-
-            # 이번 달 이미 실행했는지 체크
-            if rec.last_executed and (
-                rec.last_executed.year == today.year
-                and rec.last_executed.month == today.month
-            ):
-                skipped += 1
-                continue
-
-            # Transaction 생성
-            Transaction.objects.create(
-                user=rec.user,
-                account=rec.account,
-                category=rec.category,
-                tx_type=rec.tx_type,
-                amount=rec.amount,
-                occurred_at=today,
-                merchant=rec.merchant,
-                memo=f"[정기] {rec.memo}" if rec.memo else "[정기 거래]",
-            )
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size 는 1 이상이어야 합니다.")
 
-            # 잔액 업데이트
-            if rec.tx_type == "IN":
-                Account.objects.filter(pk=rec.account_id).update(
-                    balance=F("balance") + rec.amount
-                )
-            else:
-                Account.objects.filter(pk=rec.account_id).update(
-                    balance=F("balance") - rec.amount
-                )
-
-            # 마지막 실행일 갱신
-            rec.last_executed = today
-            rec.save(update_fields=["last_executed"])
-            created += 1
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers 는 1 이상이어야 합니다.")
+
+        today = date.today()
+        if options["shard"]:
+            shard = _parse_shard(options["shard"])
+            result = process_recurring(today=today, chunk_size=chunk_size, shard=shard)
+        elif workers > 1:
+            result = process_recurring_parallel(workers, today=today, chunk_size=chunk_size)
+        else:
+            result = process_recurring(today=today, chunk_size=chunk_size)
 
         self.stdout.write(
-            self.style.SUCCESS(f"완료: {created}건 생성, {skipped}건 스킵")
+            self.style.SUCCESS(
+                f"완료: {result.created}건 생성, {result.skipped}건 스킵"
+                + (f", {result.deactivated}건 종료" if result.deactivated else "")
+            )
         )
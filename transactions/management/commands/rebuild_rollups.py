@@ -0,0 +1,34 @@
+"""MonthlyRollup 집계 테이블 재계산 커맨드.
+
+사용법:
+  python manage.py rebuild_rollups               # 전체 유저
+  python manage.py rebuild_rollups --user fkc256 # 특정 유저만
+
+평소에는 거래 저장 시그널이 집계를 갱신하므로 필요 없지만,
+bulk_create 로 대량 적재했거나 집계가 어긋났을 때 원장 기준으로 다시 맞춘다.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.rollups import rebuild_rollups
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Transaction 원장으로부터 월별 집계(MonthlyRollup)를 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="재계산할 유저의 username (생략 시 전체)")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["user"]:
+            try:
+                user_ids = [User.objects.get(username=options["user"]).pk]
+            except User.DoesNotExist:
+                raise CommandError(f"username '{options['user']}' 유저가 존재하지 않습니다.")
+
+        created = rebuild_rollups(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"완료: 집계 {created}행 생성"))
@@ -0,0 +1,67 @@
+"""계좌 잔액 대조·복구 커맨드.
+
+사용법:
+  python manage.py reconcile_balances                # 어긋난 계좌만 보고
+  python manage.py reconcile_balances --fix          # 보고 후 원장 기준으로 고침
+  python manage.py reconcile_balances --workers 4    # 계좌를 4개 샤드로 나눠 4개 프로세스로 실행
+  python manage.py reconcile_balances --shard 0/4    # 4개 중 0번 샤드만 (여러 서버/cron 에 분산)
+  python manage.py reconcile_balances --account 3 --fix
+
+계좌 잔액(Account.balance)과 거래별 balance_after 를 원장(개설 잔액 + 거래 증감)으로
+다시 계산해 비교한다. 관리자 화면에서 잔액을 고쳤거나 bulk 적재가 잔액 갱신을
+빠뜨린 경우 등을 찾는다. 계산은 샤드마다 윈도 함수 쿼리 한 번으로 DB 에서 하고
+어긋난 계좌만 읽어 오므로 거래 수와 관계없이 메모리 사용량이 작다
+(transactions/reconcile.py).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.management.commands.process_recurring import _parse_shard
+from transactions.reconcile import reconcile, reconcile_parallel
+
+MAX_REPORT = 50
+
+
+class Command(BaseCommand):
+    help = "계좌 잔액과 거래 후 잔액(balance_after)을 원장과 대조하고, --fix 면 고칩니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="어긋난 계좌를 원장 기준으로 고침")
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--workers", type=int, default=1,
+            help="계좌를 N 개 샤드로 나눠 N 개 프로세스로 동시에 실행 (기본: 1)",
+        )
+        group.add_argument(
+            "--shard", type=str,
+            help="'i/N' — account_id %% N == i 인 계좌만 대조",
+        )
+        group.add_argument("--account", type=int, action="append", help="대조할 계좌 id (여러 번 지정 가능)")
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers 는 1 이상이어야 합니다.")
+
+        fix = options["fix"]
+        if options["shard"]:
+            result = reconcile(shard=_parse_shard(options["shard"]), fix=fix)
+        elif options["account"]:
+            result = reconcile(fix=fix, account_ids=options["account"])
+        elif workers > 1:
+            result = reconcile_parallel(workers, fix=fix)
+        else:
+            result = reconcile(fix=fix)
+
+        for drift in result.drifts[:MAX_REPORT]:
+            line = f"계좌 {drift.account_id}: 잔액 {drift.balance:,}원 → 원장 {drift.expected:,}원"
+            if drift.stale_rows:
+                line += f", balance_after {drift.stale_rows}건 불일치 ({drift.first_stale} 부터)"
+            self.stdout.write(line)
+        if len(result.drifts) > MAX_REPORT:
+            self.stdout.write(f"... 외 {len(result.drifts) - MAX_REPORT}개 계좌")
+
+        summary = f"완료: {result.checked}개 계좌 중 {len(result.drifts)}개 불일치"
+        if fix:
+            summary += f", {result.repaired}개 복구"
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_add_satisfaction_categories'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='월 (1일 기준)')),
+                ('tx_type', models.CharField(choices=[('IN', '입금'), ('OUT', '출금')], max_length=3, verbose_name='입출금 구분')),
+                ('total', models.BigIntegerField(default=0, verbose_name='합계')),
+                ('count', models.IntegerField(default=0, verbose_name='건수')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='monthly_rollups', to='transactions.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'month', 'category', 'tx_type'), name='uniq_monthly_rollup')],
+            },
+        ),
+    ]
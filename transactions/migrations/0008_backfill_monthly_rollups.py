@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:05
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_monthly_rollups(apps, schema_editor):
+    Transaction = apps.get_model("transactions", "Transaction")
+    MonthlyRollup = apps.get_model("transactions", "MonthlyRollup")
+    rows = (
+        Transaction.objects.annotate(month=TruncMonth("occurred_at"))
+        .values("user_id", "month", "category_id", "tx_type")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    MonthlyRollup.objects.bulk_create(
+        [MonthlyRollup(**row) for row in rows], batch_size=1000,
+    )
+
+
+def clear_monthly_rollups(apps, schema_editor):
+    MonthlyRollup = apps.get_model("transactions", "MonthlyRollup")
+    MonthlyRollup.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0007_monthlyrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_monthly_rollups,
+            clear_monthly_rollups,
+        ),
+    ]
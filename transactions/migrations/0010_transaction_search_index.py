@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:20
+
+from django.db import migrations
+
+from transactions.search import install_search_index, remove_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def remove(apps, schema_editor):
+    remove_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0009_transaction_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
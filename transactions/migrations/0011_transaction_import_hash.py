@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0010_transaction_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='import_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='가져오기 중복 키'),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('import_hash', ''), _negated=True), fields=('account', 'import_hash'), name='uniq_tx_import_hash'),
+        ),
+    ]
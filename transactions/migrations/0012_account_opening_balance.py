@@ -0,0 +1,60 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:16
+
+from django.db import migrations, models
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def backfill_opening_balance(apps, schema_editor):
+    """개설 잔액 = 첫 거래의 balance_after - 그 거래의 증감.
+
+    거래가 없거나 첫 거래의 balance_after 가 비어 있으면 지금 잔액에서 거래 증감 합계를 뺀다.
+    이미 어긋나 있던 잔액을 개설 잔액에 흡수하지 않으므로, 그런 계좌는 여기서 개수를
+    알리고 reconcile_balances 가 불일치로 보고한다.
+    """
+    Account = apps.get_model("transactions", "Account")
+    Transaction = apps.get_model("transactions", "Transaction")
+    signed = Case(
+        When(tx_type="IN", then=F("amount")),
+        default=-F("amount"),
+        output_field=IntegerField(),
+    )
+    net = (
+        Transaction.objects.filter(account_id=OuterRef("pk"))
+        .order_by()
+        .values("account_id")
+        .annotate(net=Sum(signed))
+        .values("net")
+    )
+    first_opening = (
+        Transaction.objects.filter(account_id=OuterRef("pk"))
+        .order_by("occurred_at", "id")
+        .annotate(opening=F("balance_after") - signed)
+        .values("opening")[:1]
+    )
+    net_total = Coalesce(Subquery(net), Value(0))
+    Account.objects.update(
+        opening_balance=Coalesce(Subquery(first_opening), F("balance") - net_total),
+    )
+    drifted = Account.objects.exclude(balance=F("opening_balance") + net_total).count()
+    if drifted:
+        print(
+            f"\n  계좌 {drifted}개의 잔액이 거래 내역과 맞지 않습니다 — "
+            "manage.py reconcile_balances 로 확인하세요."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0011_transaction_import_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='opening_balance',
+            field=models.IntegerField(default=0, editable=False, verbose_name='개설 잔액'),
+        ),
+        migrations.RunPython(backfill_opening_balance, migrations.RunPython.noop),
+    ]
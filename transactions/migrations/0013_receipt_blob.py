@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-10-17 05:03
+
+import django.db.models.deletion
+import transactions.storage
+from django.db import migrations, models
+
+
+def move_to_content_addressed(apps, schema_editor):
+    """receipts/YYYY/MM/ 의 기존 영수증을 receipts/ab/cd/<sha256> 로 옮기고 blob 을 연결한다.
+
+    파일이 없는 행은 그대로 둔다 (blob 없는 이전 방식으로 남음).
+    """
+    Attachment = apps.get_model("transactions", "Attachment")
+    ReceiptBlob = apps.get_model("transactions", "ReceiptBlob")
+    storage = transactions.storage.receipt_storage()
+    for attachment in Attachment.objects.filter(blob__isnull=True).iterator():
+        old_name = attachment.file.name
+        if not old_name or not storage.exists(old_name):
+            continue
+        with storage.open(old_name) as f:
+            staged = storage.stage(f)
+        blob, _ = ReceiptBlob.objects.get_or_create(
+            sha256=staged.sha256, defaults={"size": staged.size},
+        )
+        attachment.file.name = storage.place(staged)
+        attachment.blob = blob
+        attachment.save(update_fields=["file", "blob"])
+        storage.delete(old_name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0012_account_opening_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='크기(바이트)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(storage=transactions.storage.receipt_storage, upload_to='', verbose_name='영수증 파일'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='transactions.receiptblob'),
+        ),
+        # 되돌릴 때는 파일을 옮기지 않는다 (새 이름 그대로 blob 없는 영수증이 된다)
+        migrations.RunPython(move_to_content_addressed, migrations.RunPython.noop),
+    ]
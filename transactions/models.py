@@ -5,19 +5,25 @@
 - Category           : 거래 카테고리 (수입/지출/공통, 만족 소비 여부 플래그)
 - Transaction        : 개별 거래 (입금/출금, 거래 후 잔액 스냅샷 보관)
 - Attachment         : 거래에 1:1 매핑되는 영수증 첨부파일
+- ReceiptBlob        : 영수증 파일 내용 (SHA-256) — 같은 내용은 Attachment 끼리 공유
 - Goal               : 유저별 월 목표 저축·소비 한도 (1:1)
 - RecurringTransaction : 매월 자동 실행되는 정기 거래 템플릿
+- MonthlyRollup      : 유저·월·카테고리·입출금 단위 거래 합계 (집계 테이블)
 """
 
 from django.conf import settings
 from django.db import models
 
+from .storage import receipt_storage
+
 
 class Account(models.Model):
     """은행/금융기관 계좌.
 
-    잔액(balance)은 거래 생성·수정·삭제 시 views.py 의
-    _apply_balance / _reverse_balance 헬퍼로 원자적으로 갱신된다.
+    잔액(balance)은 거래 생성·수정·삭제 시 ledger.py 가 계좌 행을 잠근
+    트랜잭션 안에서 갱신한다. 원장 기준으로는 항상
+    balance == opening_balance + (입금 합계 - 출금 합계) 이며,
+    reconcile_balances 커맨드가 이를 검사한다.
     """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -28,10 +34,17 @@ class Account(models.Model):
     bank_name = models.CharField("은행/기관명", max_length=50)
     account_number = models.CharField("계좌번호", max_length=30)
     balance = models.IntegerField("잔액", default=0)
+    opening_balance = models.IntegerField("개설 잔액", default=0, editable=False)
     is_active = models.BooleanField("활성 여부", default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        # 새 계좌는 입력한 잔액이 곧 거래가 없을 때의 잔액
+        if self._state.adding and not self.opening_balance:
+            self.opening_balance = self.balance
+        super().save(*args, **kwargs)
+
     def masked_account_number(self):
         """계좌번호를 '110-****-9012' 형식으로 마스킹하여 반환."""
         num = self.account_number
@@ -80,7 +93,8 @@ class Transaction(models.Model):
     """개별 입출금 거래.
 
     balance_after 는 거래 생성 시점의 계좌 잔액 스냅샷이다.
-    occurred_at 기준 내림차순으로 정렬되며, 인덱스가 설정되어 있다.
+    occurred_at 기준 내림차순으로 정렬되며, 실제 조회 형태(유저·계좌·입출금·
+    카테고리 + 기간)에 맞춘 복합 인덱스가 설정되어 있다.
     """
 
     IN = "IN"
@@ -115,6 +129,10 @@ class Transaction(models.Model):
     occurred_at = models.DateField("거래일")
     merchant = models.CharField("가맹점/거래처", max_length=100, blank=True)
     memo = models.CharField("메모", max_length=255, blank=True)
+    # 은행 내역 가져오기로 만든 거래의 중복 판별 키 (transactions/importer.py)
+    import_hash = models.CharField(
+        "가져오기 중복 키", max_length=64, blank=True, default="", editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -123,16 +141,67 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ["-occurred_at", "-created_at"]
+        # 모든 조회는 user(또는 account)로 먼저 좁힌 뒤 기간을 건다.
         indexes = [
             models.Index(fields=["-occurred_at"]),
+            # 거래 목록 기본 정렬 + 기간 필터 + 키셋 페이지네이션
+            models.Index(
+                fields=["user", "-occurred_at", "-id"], name="tx_user_date_idx"
+            ),
+            # 계좌 상세 / 계좌 필터
+            models.Index(
+                fields=["account", "-occurred_at", "-id"], name="tx_account_date_idx"
+            ),
+            # 카테고리 필터
+            models.Index(
+                fields=["user", "category", "occurred_at"], name="tx_user_category_date_idx"
+            ),
+            # InMoney 소액 지출 분석 (출금 중 금액 이하 조건) — 부분 인덱스
+            models.Index(
+                fields=["user", "amount"],
+                condition=models.Q(tx_type="OUT"),
+                name="tx_user_out_amount_idx",
+            ),
+            # InMoney 집계 / 입출금 필터 — PostgreSQL 에서는 금액·계좌·카테고리를 INCLUDE 해
+            # 테이블 접근 없이(Index Only Scan) 처리한다. INCLUDE 를 지원하지 않는 DB(SQLite)는
+            # 같은 키의 일반 인덱스가 된다 (settings 의 models.W040 무시 참고).
+            models.Index(
+                fields=["user", "tx_type", "occurred_at"],
+                include=["amount", "account", "category"],
+                name="tx_user_type_date_idx",
+            ),
         ]
+        constraints = [
+            # 같은 내역 파일을 다시 가져와도 거래가 두 번 생기지 않도록 — 부분 유니크 인덱스
+            models.UniqueConstraint(
+                fields=["account", "import_hash"],
+                condition=~models.Q(import_hash=""),
+                name="uniq_tx_import_hash",
+            ),
+        ]
+
+
+class ReceiptBlob(models.Model):
+    """영수증 파일 내용 하나 (SHA-256).
+
+    같은 내용의 영수증은 Attachment 여러 개가 이 행 하나를 가리킨다. 가리키는
+    Attachment 가 없어지면 행과 파일을 함께 지운다 (receipts.release).
+    """
+
+    sha256 = models.CharField("SHA-256", max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField("크기(바이트)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
 
 
 class Attachment(models.Model):
     """거래에 첨부된 영수증 파일 (1:1 관계).
 
-    파일은 'receipts/YYYY/MM/' 경로에 저장된다.
-    original_name 에 업로드 시 원본 파일명을 보관한다.
+    파일은 내용의 SHA-256 으로 'receipts/ab/cd/<sha256>' 에 저장되고(storage.py),
+    같은 내용은 blob(ReceiptBlob) 하나를 함께 쓴다. blob 이 없는 행은 이 방식 이전에
+    올린 파일이다. original_name 에 업로드 시 원본 파일명을 보관한다.
     """
 
     user = models.ForeignKey(
@@ -145,7 +214,14 @@ class Attachment(models.Model):
         on_delete=models.CASCADE,
         related_name="attachment",
     )
-    file = models.FileField("영수증 파일", upload_to="receipts/%Y/%m/")
+    file = models.FileField("영수증 파일", storage=receipt_storage)
+    blob = models.ForeignKey(
+        ReceiptBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="attachments",
+    )
     original_name = models.CharField("원본 파일명", max_length=255, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -218,3 +294,43 @@ class RecurringTransaction(models.Model):
 
     class Meta:
         ordering = ["recurring_day"]
+
+
+class MonthlyRollup(models.Model):
+    """유저·월·카테고리·입출금 단위 거래 합계/건수 집계 테이블.
+
+    거래 생성·수정·삭제 시 signals.py 의 핸들러가 같은 DB 트랜잭션 안에서
+    증감분을 반영한다. bulk_create 처럼 시그널을 거치지 않는 경로는
+    rollups.rebuild_rollups() 로 다시 계산한다.
+    대시보드는 Transaction 대신 이 테이블을 읽어 O(개월 수)로 집계한다.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="monthly_rollups",
+    )
+    month = models.DateField("월 (1일 기준)")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="monthly_rollups",
+    )
+    tx_type = models.CharField(
+        "입출금 구분", max_length=3, choices=Transaction.TX_TYPE_CHOICES
+    )
+    total = models.BigIntegerField("합계", default=0)
+    count = models.IntegerField("건수", default=0)
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.get_tx_type_display()} {self.total:,}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month", "category", "tx_type"],
+                name="uniq_monthly_rollup",
+            ),
+        ]
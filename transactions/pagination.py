@@ -0,0 +1,86 @@
+"""거래 목록용 키셋(커서) 페이지네이션.
+
+OFFSET 방식은 깊은 페이지일수록 앞 행을 모두 건너뛰어야 하므로,
+정렬 키 (occurred_at, pk) 의 마지막 값을 커서로 넘겨
+"그 다음 행부터 N건" 을 조회한다. 몇 번째 페이지든 비용이 같다.
+
+커서 형식: 'YYYY-MM-DD_<pk>'  (예: 2026-01-15_123)
+  ?after=<커서>   → 커서보다 오래된 거래 (다음 페이지)
+  ?before=<커서>  → 커서보다 최신 거래 (이전 페이지)
+"""
+
+from datetime import date
+
+from django.db.models import Q
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(tx):
+    """거래의 정렬 키를 커서 문자열로 만든다."""
+    return f"{tx.occurred_at:%Y-%m-%d}_{tx.pk}"
+
+
+def decode_cursor(value):
+    """커서 문자열을 (date, pk) 로 해석한다. 형식이 틀리면 None."""
+    if not value:
+        return None
+    try:
+        day, pk = value.split("_", 1)
+        return date.fromisoformat(day), int(pk)
+    except ValueError:
+        return None
+
+
+class KeysetPage:
+    """한 페이지 분량의 거래와 이전/다음 페이지 쿼리스트링."""
+
+    def __init__(self, items, params, has_next, has_prev):
+        self.items = items
+        self.has_next = has_next and bool(items)
+        self.has_prev = has_prev and bool(items)
+        base = params.copy()
+        base.pop("after", None)
+        base.pop("before", None)
+        self.next_query = self._query(base, "after", items[-1]) if self.has_next else ""
+        self.prev_query = self._query(base, "before", items[0]) if self.has_prev else ""
+        self.first_query = base.urlencode()
+
+    @staticmethod
+    def _query(base, key, tx):
+        params = base.copy()
+        params[key] = encode_cursor(tx)
+        return params.urlencode()
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_paginate(qs, params, page_size=PAGE_SIZE):
+    """qs 를 (occurred_at, pk) 내림차순으로 page_size 건 잘라 KeysetPage 로 반환한다.
+
+    params 는 request.GET (QueryDict). after/before 커서 외의 파라미터(필터)는
+    이전/다음 링크에 그대로 유지된다.
+    """
+    before = decode_cursor(params.get("before"))
+    after = decode_cursor(params.get("after"))
+
+    if before:
+        day, pk = before
+        rows = list(
+            qs.filter(Q(occurred_at__gt=day) | Q(occurred_at=day, pk__gt=pk))
+            .order_by("occurred_at", "pk")[:page_size + 1]
+        )
+        has_prev = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        return KeysetPage(items, params, has_next=True, has_prev=has_prev)
+
+    if after:
+        day, pk = after
+        qs = qs.filter(Q(occurred_at__lt=day) | Q(occurred_at=day, pk__lt=pk))
+    rows = list(qs.order_by("-occurred_at", "-pk")[:page_size + 1])
+    has_next = len(rows) > page_size
+    return KeysetPage(rows[:page_size], params, has_next=has_next, has_prev=after is not None)
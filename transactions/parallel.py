@@ -0,0 +1,40 @@
+"""작업을 여러 프로세스로 나눠 실행한다 — 정기 거래 처리·잔액 대조·더미 데이터 생성에서 사용.
+
+run_jobs(func, jobs, workers, model) : func(*job) 을 jobs 마다 실행해 결과 목록(jobs 순서)을 반환
+concurrent_writes(model)             : model 을 저장하는 DB 가 여러 연결의 동시 쓰기를 받는지
+
+동시 쓰기 판단은 행 잠금(connection.features.has_select_for_update) 하나로 한다.
+행 잠금을 지원하는 DB(PostgreSQL 등)는 다른 행을 쓰는 연결끼리 서로 기다리지 않는다.
+SQLite 는 쓰기 때 DB 파일 전체를 잠그므로 프로세스를 늘려도 차례로 기다리기만 하고
+'database is locked' 로 실패할 수 있어, 같은 작업을 현재 프로세스에서 차례로 실행한다.
+
+func 는 자식 프로세스로 넘길 수 있도록 모듈 최상위 함수여야 한다.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections, router
+
+
+def concurrent_writes(model):
+    return connections[router.db_for_write(model)].features.has_select_for_update
+
+
+def run_jobs(func, jobs, workers, model):
+    jobs = list(jobs)
+    if workers <= 1 or not concurrent_writes(model):
+        return [func(*job) for job in jobs]
+
+    # 자식 프로세스가 부모의 DB 연결을 물려받아 함께 쓰지 않도록 먼저 닫는다
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        futures = [pool.submit(_run, func, job) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def _run(func, job):
+    try:
+        return func(*job)
+    finally:
+        connections.close_all()
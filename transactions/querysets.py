@@ -0,0 +1,38 @@
+"""거래 목록 필터 — 거래 목록·내보내기 뷰와 export_transactions 커맨드가 함께 쓴다.
+
+filter_transactions(qs, params) : 계좌·카테고리·입출금·기간·키워드(메모+가맹점) 조건 적용
+
+params 는 request.GET 같은 dict 형태 (account, category, tx_type, date_from, date_to, q).
+"""
+
+from .dates import date_range_q
+from .search import search_transactions
+
+
+def filter_transactions(qs, params):
+    """거래 목록 필터 — 계좌·카테고리·입출금·기간·키워드(메모+가맹점)."""
+    # 계좌 필터
+    account_id = params.get("account")
+    if account_id:
+        qs = qs.filter(account_id=account_id)
+
+    # 카테고리 필터
+    category_id = params.get("category")
+    if category_id:
+        qs = qs.filter(category_id=category_id)
+
+    # 입출금 필터
+    tx_type = params.get("tx_type")
+    if tx_type in ("IN", "OUT"):
+        qs = qs.filter(tx_type=tx_type)
+
+    # 기간 필터
+    date_from = params.get("date_from")
+    date_to = params.get("date_to")
+    qs = qs.filter(date_range_q(date_from, date_to))
+
+    # 키워드 검색 (메모 + 가맹점)
+    q = params.get("q", "").strip()
+    if q:
+        qs = search_transactions(qs, q)
+    return qs
@@ -0,0 +1,81 @@
+"""영수증 첨부·해제 — 내용 주소 저장소(storage.py)의 blob 참조 관리.
+
+store(tx, upload)    : 업로드를 한 번 읽으며 해시해 저장하고 Attachment 를 만든다
+                       (업로드 핸들러가 이미 해시한 StagedUploadedFile 이면 다시 읽지 않음)
+release(attachment)  : Attachment 가 지워진 뒤(signals.py) 그 blob 을 가리키는
+                       Attachment 가 더 없으면 ReceiptBlob 행을, 커밋 뒤 파일을 지운다
+
+blob 의 참조 수는 따로 세지 않고 blob 을 가리키는 Attachment 행으로 판단한다.
+store 와 release 는 ReceiptBlob 행을 select_for_update 로 잠근 채 blob 을 만들거나 지운다.
+같은 내용이 동시에 올라오면 둘 다 행이 없다고 보고 INSERT 해 기본 키(digest)가 부딪칠 수
+있으므로, store 는 충돌을 무시하는 INSERT 뒤에 잠근 행을 다시 읽는다 (_lock_blob).
+파일은 삭제가 커밋된 뒤에(on_commit) 지우므로 삭제가 롤백되어 되살아난 행이 사라진 파일을
+가리키는 일은 없다. 커밋과 파일 삭제 사이에 같은 내용이 다시 올라와 그 이름을 쓰는
+Attachment 가 생겼으면 파일을 지우지 않는다.
+"""
+
+from django.db import transaction
+
+from .models import Attachment, ReceiptBlob
+
+
+def _storage():
+    return Attachment._meta.get_field("file").storage
+
+
+def store(tx, upload):
+    """upload 를 tx 의 영수증으로 저장하고 Attachment 를 반환한다."""
+    storage = _storage()
+    # 해시·복사는 오래 걸릴 수 있으므로 DB 트랜잭션 밖에서
+    staged = getattr(upload, "staged", None) or storage.stage(upload)
+    try:
+        with transaction.atomic():
+            blob = _lock_blob(staged)
+            name = storage.place(staged)
+            return Attachment.objects.create(
+                user=tx.user, transaction=tx, blob=blob, file=name,
+                original_name=upload.name,
+            )
+    finally:
+        staged.discard()
+
+
+def _lock_blob(staged):
+    """staged 내용의 ReceiptBlob 을 (없으면 만들어) 잠가 반환한다.
+
+    INSERT 는 이미 있거나 다른 요청이 방금 넣은 행과 부딪쳐도 오류 없이 넘어간다.
+    그 사이 release() 가 마지막 참조를 지우며 행을 삭제했으면 다시 넣는다.
+    """
+    while True:
+        ReceiptBlob.objects.bulk_create(
+            [ReceiptBlob(sha256=staged.sha256, size=staged.size)], ignore_conflicts=True,
+        )
+        blob = ReceiptBlob.objects.select_for_update().filter(sha256=staged.sha256).first()
+        if blob is not None:
+            return blob
+
+
+def release(attachment):
+    """삭제된 attachment 가 마지막 참조였다면 blob 을 지우고 커밋 뒤 파일을 지운다."""
+    if attachment.blob_id is None:
+        # 내용 주소 저장 이전에 올린 파일 — blob 이 없으므로 파일만 지운다
+        if attachment.file:
+            _delete_file_on_commit(attachment.file.name)
+        return
+
+    with transaction.atomic():
+        blob = ReceiptBlob.objects.select_for_update().filter(pk=attachment.blob_id).first()
+        if blob is None or blob.attachments.exists():
+            return
+        blob.delete()
+        _delete_file_on_commit(attachment.file.name)
+
+
+def _delete_file_on_commit(name):
+    def delete():
+        # 커밋 사이에 같은 내용이 다시 올라왔으면 지우지 않는다
+        if Attachment.objects.filter(file=name).exists():
+            return
+        _storage().delete(name)
+
+    transaction.on_commit(delete)
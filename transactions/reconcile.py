@@ -0,0 +1,174 @@
+"""계좌 잔액 대조·복구 (reconcile_balances 커맨드에서 사용).
+
+원장 기준 올바른 값:
+  - 잔액          = opening_balance + (입금 합계 - 출금 합계)
+  - balance_after = opening_balance + (occurred_at, id) 순 누적 증감
+
+find_drift() 는 샤드 하나(account_id % N == i)를 윈도 함수 쿼리 한 번으로 훑어,
+어긋난 계좌만 (현재 잔액, 올바른 잔액, 어긋난 balance_after 행 수, 처음 어긋난 거래일)
+로 돌려준다. 행 단위 비교와 계좌별 집계는 DB 에서 끝나고 결과는 fetchmany 로
+나눠 읽으므로, 거래가 수백만 건이어도 메모리에는 어긋난 계좌 목록만 남는다.
+
+repair() 는 어긋난 계좌를 묶음마다 잠근 트랜잭션에서 잔액을 CASE UPDATE 한 번으로 고치고,
+계좌별로 처음 어긋난 거래일부터 balance_after 를 ledger.recompute_balance_after() 의
+윈도 UPDATE 한 번으로 다시 쓴다. 시그널을 거치지 않으므로 고친 유저의 데이터 버전
+스탬프(versioning.py)를 직접 바꿔 InMoney 지표 캐시를 무효화한다.
+
+병렬 실행: reconcile_parallel() 은 N 개 샤드를 프로세스 풀에서 동시에 돌린다.
+계좌 단위로 나누므로 한 계좌는 항상 한 샤드만 다룬다.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import connections, router, transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Coalesce, Mod
+
+from . import ledger, parallel
+from .models import Account, Transaction
+from .versioning import bump_data_version
+
+FETCH_SIZE = 2000
+REPAIR_BATCH_SIZE = 100
+
+
+@dataclass
+class Drift:
+    account_id: int
+    balance: int           # 현재 잔액
+    expected: int          # 원장 기준 잔액
+    stale_rows: int        # balance_after 가 틀린 거래 수
+    first_stale: date | None  # 처음 틀린 거래의 거래일
+
+
+@dataclass
+class ReconcileResult:
+    checked: int = 0       # 검사한 계좌 수
+    drifts: list = field(default_factory=list)
+    repaired: int = 0      # 고친 계좌 수
+
+    def add(self, other):
+        self.checked += other.checked
+        self.drifts.extend(other.drifts)
+        self.repaired += other.repaired
+
+
+def _drift_sql(connection, shard, account_ids):
+    """(SQL, params) — 샤드의 계좌별 잔액·balance_after 불일치를 한 번에 집계한다."""
+    qn = connection.ops.quote_name
+    accounts = qn(Account._meta.db_table)
+    transactions = qn(Transaction._meta.db_table)
+    where, params = ["1 = 1"], []
+    if shard:
+        where.append("a.id %% %s = %s")
+        params += [shard[1], shard[0]]
+    if account_ids:
+        where.append(f"a.id IN ({', '.join(['%s'] * len(account_ids))})")
+        params += list(account_ids)
+    where = " AND ".join(where)
+
+    running = (
+        "SELECT account_id, occurred_at, balance_after, delta, SUM(delta) OVER ("
+        "PARTITION BY account_id ORDER BY occurred_at, id "
+        "ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS running "
+        "FROM (SELECT t.account_id, t.id, t.occurred_at, t.balance_after, "
+        "CASE WHEN t.tx_type = %s THEN t.amount ELSE -t.amount END AS delta "
+        f"FROM {transactions} t JOIN {accounts} a ON a.id = t.account_id WHERE {where}) AS d"
+    )
+    # balance_after 가 NULL 인 행(예전 정기 거래 처리분)도 틀린 행으로 센다.
+    # 거래가 없는 계좌는 LEFT JOIN 으로 w 가 모두 NULL 이므로 w.account_id 로 거른다.
+    stale = (
+        "w.account_id IS NOT NULL AND (w.balance_after IS NULL "
+        "OR w.balance_after <> a.opening_balance + w.running)"
+    )
+    expected = "a.opening_balance + COALESCE(SUM(w.delta), 0)"
+    stale_count = f"COUNT(CASE WHEN {stale} THEN 1 END)"
+    sql = (
+        f"SELECT a.id, a.balance, {expected}, {stale_count}, "
+        f"MIN(CASE WHEN {stale} THEN w.occurred_at END) "
+        f"FROM {accounts} a LEFT JOIN ({running}) AS w ON w.account_id = a.id "
+        f"WHERE {where} "
+        f"GROUP BY a.id, a.balance, a.opening_balance "
+        f"HAVING a.balance <> {expected} OR {stale_count} > 0 "
+        f"ORDER BY a.id"
+    )
+    return sql, [Transaction.IN, *params, *params]
+
+
+def find_drift(shard=None, account_ids=None):
+    """원장과 어긋난 계좌를 찾아 ReconcileResult 를 반환한다 (고치지 않음)."""
+    connection = connections[router.db_for_read(Account)]
+    accounts = Account.objects.all()
+    if shard:
+        index, count = shard
+        accounts = accounts.alias(shard_key=Mod("id", Value(count))).filter(shard_key=index)
+    if account_ids:
+        accounts = accounts.filter(pk__in=account_ids)
+
+    result = ReconcileResult(checked=accounts.count())
+    sql, params = _drift_sql(connection, shard, account_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(FETCH_SIZE):
+            for account_id, balance, expected, stale_rows, first_stale in rows:
+                if isinstance(first_stale, str):  # SQLite 는 날짜를 문자열로 돌려준다
+                    first_stale = date.fromisoformat(first_stale)
+                result.drifts.append(Drift(account_id, balance, expected, stale_rows, first_stale))
+    return result
+
+
+def repair(drifts):
+    """어긋난 계좌의 잔액과 balance_after 를 원장 기준으로 고치고, 고친 계좌 수를 반환한다.
+
+    REPAIR_BATCH_SIZE 개 계좌마다 한 트랜잭션 — 잠금은 짧게, 커밋 수는 적게.
+    """
+    net = Coalesce(Sum(Case(
+        When(transactions__tx_type=Transaction.IN, then=F("transactions__amount")),
+        default=-F("transactions__amount"),
+        output_field=IntegerField(),
+    )), 0)
+    for start in range(0, len(drifts), REPAIR_BATCH_SIZE):
+        batch = drifts[start:start + REPAIR_BATCH_SIZE]
+        with transaction.atomic():
+            ids = [drift.account_id for drift in batch]
+            ledger.lock_accounts(ids)
+            # 대조 뒤에 들어온 거래가 있을 수 있으므로 잠근 상태에서 다시 계산
+            expected = dict(
+                Account.objects.filter(pk__in=ids)
+                .annotate(expected=F("opening_balance") + net)
+                .values_list("pk", "expected")
+            )
+            Account.objects.filter(pk__in=expected).update(balance=Case(
+                *[When(pk=pk, then=Value(value)) for pk, value in expected.items()],
+                output_field=IntegerField(),
+            ))
+            for drift in batch:
+                if drift.first_stale:
+                    ledger.recompute_balance_after(
+                        drift.account_id, expected[drift.account_id], drift.first_stale,
+                    )
+            # QuerySet.update() 는 시그널을 보내지 않으므로 InMoney 캐시 무효화도 직접
+            bump_data_version(*Account.objects.filter(pk__in=ids).values_list("user_id", flat=True))
+    return len(drifts)
+
+
+def reconcile(shard=None, fix=False, account_ids=None):
+    """샤드 하나를 대조하고, fix 면 어긋난 계좌를 고친다."""
+    result = find_drift(shard, account_ids)
+    if fix:
+        result.repaired = repair(result.drifts)
+    return result
+
+
+def reconcile_parallel(workers, fix=False):
+    """workers 개 프로세스가 샤드 0..workers-1 을 하나씩 맡아 동시에 대조한다.
+
+    동시 쓰기를 받지 못하는 DB(SQLite)는 같은 샤드들을 차례로 실행한다 (parallel.py).
+    """
+    jobs = [((index, workers), fix) for index in range(workers)]
+    result = ReconcileResult()
+    for shard_result in parallel.run_jobs(reconcile, jobs, workers, Account):
+        result.add(shard_result)
+    result.drifts.sort(key=lambda drift: drift.account_id)
+    return result
@@ -0,0 +1,195 @@
+"""정기 거래 일괄 실행 엔진 (process_recurring 커맨드에서 사용).
+
+템플릿 한 건마다 create / 잔액 update / save 를 반복하는 대신,
+템플릿을 chunk_size 개씩 읽어 한 DB 트랜잭션 안에서 처리한다.
+
+  1. 각 템플릿의 밀린 실행일을 모두 계산한다 (여러 달 밀린 경우 포함).
+     - 마지막 실행 이후 첫 달부터 이번 달까지, 매달 recurring_day 에 1회
+       (그 달에 없는 날짜면 말일)
+     - 시작일 이전·종료일 이후·오늘 이후 날짜는 제외
+     - 한 번도 실행되지 않은 템플릿은 등록한 달부터 시작한다
+       (과거 시작일로 등록해도 지난 달들을 소급 생성하지 않음)
+  2. 계좌를 잠그고 현재 잔액에서 출발해 거래일 순으로 balance_after 를 계산한 뒤
+     Transaction 을 bulk_create 한다.
+  3. 계좌별 증감 합계를 UPDATE 한 번으로 반영한다. 밀린 실행일 뒤에 이미 다른 거래가
+     있는 계좌는 그 날짜 이후 balance_after 를 다시 계산한다 (ledger.py).
+  4. 템플릿의 last_executed / is_active 를 bulk_update 하고 월별 집계·데이터 버전을 반영한다.
+
+병렬 실행: shard=(i, N) 이면 user_id % N == i 인 유저의 템플릿만 처리한다.
+유저 단위로 나누므로 한 계좌의 잔액은 항상 한 샤드만 갱신한다.
+process_recurring_parallel() 은 N 개 샤드를 프로세스 풀에서 동시에 돌린다.
+템플릿은 SELECT ... FOR UPDATE SKIP LOCKED 로 가져오므로(지원하는 DB 한정)
+겹쳐 실행된 cron 이나 다른 워커가 같은 템플릿을 두 번 실행하지 않는다.
+"""
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import connections, router, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Mod
+from django.utils.timezone import localdate
+
+from . import ledger, parallel, rollups
+from .dates import add_months, month_range
+from .models import RecurringTransaction, Transaction
+from .versioning import bump_data_version
+
+CHUNK_SIZE = 500
+INSERT_BATCH_SIZE = 1000
+
+
+@dataclass
+class RecurringResult:
+    created: int = 0      # 생성된 거래 수
+    executed: int = 0     # 거래를 1건 이상 만든 템플릿 수
+    skipped: int = 0      # 실행할 날짜가 없던 템플릿 수
+    deactivated: int = 0  # 종료일이 지나 비활성화된 템플릿 수
+
+    def add(self, other):
+        self.created += other.created
+        self.executed += other.executed
+        self.skipped += other.skipped
+        self.deactivated += other.deactivated
+
+
+def due_dates(rec, today):
+    """rec 의 오늘까지 밀린 실행일 목록 (오래된 순)."""
+    if rec.last_executed:
+        first_month = add_months(rec.last_executed, 1)
+    else:
+        registered = localdate(rec.created_at) if rec.created_at else today
+        first_month = max(rec.start_date, registered).replace(day=1)
+
+    last = today
+    if rec.end_date and rec.end_date < last:
+        last = rec.end_date
+
+    dates = []
+    month = first_month
+    while month <= last:
+        day = min(rec.recurring_day, monthrange(month.year, month.month)[1])
+        occurred_at = month.replace(day=day)
+        if rec.start_date <= occurred_at <= last:
+            dates.append(occurred_at)
+        month = add_months(month, 1)
+    return dates
+
+
+def pending_recurring(today, shard=None):
+    """실행하거나 비활성화할 것이 있을 수 있는 템플릿.
+
+    이번 달에 이미 실행됐고 종료일도 남은 템플릿은 DB 에서 걸러낸다.
+    shard=(i, N) 이면 user_id % N == i 인 템플릿만 남긴다.
+    """
+    this_month, _ = month_range(today.year, today.month)
+    qs = RecurringTransaction.objects.filter(
+        Q(last_executed__isnull=True)
+        | Q(last_executed__lt=this_month)
+        | Q(end_date__lt=today),
+        is_active=True,
+        start_date__lte=today,
+    )
+    if shard:
+        index, count = shard
+        qs = qs.alias(shard_key=Mod("user_id", Value(count))).filter(shard_key=index)
+    return qs
+
+
+def process_recurring(today=None, chunk_size=CHUNK_SIZE, shard=None):
+    """밀린 정기 거래를 모두 실행하고 RecurringResult 를 반환한다.
+
+    chunk_size 개 템플릿마다 커밋하므로 중간에 실패해도 앞선 묶음은 유지되고,
+    다시 실행하면 last_executed 기준으로 남은 것만 처리한다.
+    다른 프로세스가 잠근 템플릿은 건너뛴다 (그 프로세스가 처리한다).
+    """
+    today = today or date.today()
+    qs = pending_recurring(today, shard)
+    connection = connections[router.db_for_write(RecurringTransaction)]
+    if connection.features.has_select_for_update_skip_locked:
+        qs = qs.select_for_update(skip_locked=True)
+    result = RecurringResult()
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(qs.filter(pk__gt=last_pk).order_by("pk")[:chunk_size])
+            if not chunk:
+                break
+            result.add(_process_chunk(chunk, today))
+        last_pk = chunk[-1].pk
+    return result
+
+
+def process_recurring_parallel(workers, today=None, chunk_size=CHUNK_SIZE):
+    """workers 개 프로세스가 샤드 0..workers-1 을 하나씩 맡아 동시에 실행한다.
+
+    동시 쓰기를 받지 못하는 DB(SQLite)는 같은 샤드들을 차례로 실행한다 (parallel.py).
+    """
+    today = today or date.today()
+    jobs = [(today, chunk_size, (index, workers)) for index in range(workers)]
+    result = RecurringResult()
+    for shard_result in parallel.run_jobs(process_recurring, jobs, workers, RecurringTransaction):
+        result.add(shard_result)
+    return result
+
+
+def _process_chunk(templates, today):
+    result = RecurringResult()
+    occurrences = []  # (거래일, 템플릿)
+    changed = []
+    for rec in templates:
+        dates = due_dates(rec, today)
+        occurrences.extend((d, rec) for d in dates)
+        if dates:
+            rec.last_executed = dates[-1]
+            result.executed += 1
+        else:
+            result.skipped += 1
+        if rec.end_date and rec.end_date < today:
+            rec.is_active = False
+            result.deactivated += 1
+        if dates or not rec.is_active:
+            changed.append(rec)
+
+    if occurrences:
+        balances = ledger.lock_accounts(rec.account_id for _, rec in occurrences)
+        start_balances = dict(balances)
+
+        # 계좌별로 거래일 순서대로 잔액을 굴려 balance_after 를 채운다
+        occurrences.sort(key=lambda item: (item[0], item[1].pk))
+        new_transactions = []
+        first_dates = {}
+        for occurred_at, rec in occurrences:
+            balances[rec.account_id] += ledger.signed_amount(rec.tx_type, rec.amount)
+            first_dates.setdefault(rec.account_id, occurred_at)
+            new_transactions.append(Transaction(
+                user_id=rec.user_id,
+                account_id=rec.account_id,
+                category_id=rec.category_id,
+                tx_type=rec.tx_type,
+                amount=rec.amount,
+                balance_after=balances[rec.account_id],
+                occurred_at=occurred_at,
+                merchant=rec.merchant,
+                memo=f"[정기] {rec.memo}" if rec.memo else "[정기 거래]",
+            ))
+        stale = ledger.stale_suffixes(first_dates)
+        Transaction.objects.bulk_create(new_transactions, batch_size=INSERT_BATCH_SIZE)
+        result.created = len(new_transactions)
+
+        # 계좌 잔액: 계좌별 증감 합계를 UPDATE 한 번으로
+        ledger.apply_deltas({pk: balances[pk] - start_balances[pk] for pk in balances})
+        # 밀린 실행일 뒤에 이미 다른 거래가 있으면 그 구간의 balance_after 를 다시 계산
+        for account_id, since in stale.items():
+            ledger.recompute_balance_after(account_id, balances[account_id], since)
+
+        # bulk_create 는 시그널을 보내지 않으므로 월별 집계는 직접 반영
+        rollups.apply_transactions(new_transactions)
+
+    RecurringTransaction.objects.bulk_update(
+        changed, ["last_executed", "is_active"], batch_size=INSERT_BATCH_SIZE,
+    )
+    # 시그널을 거치지 않았으므로 InMoney 캐시 무효화도 직접
+    bump_data_version(*{rec.user_id for rec in changed})
+    return result
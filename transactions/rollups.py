@@ -0,0 +1,138 @@
+"""MonthlyRollup 집계 테이블 유지 헬퍼.
+
+apply_rollup()     : 거래 1건(또는 묶음)의 증감분을 해당 월 집계 행에 반영
+apply_transactions(): bulk_create 한 거래 묶음을 집계 행 단위로 모아 한 번에 반영
+rebuild_rollups()  : Transaction 원장으로부터 집계 행을 다시 계산
+
+증감 반영은 호출한 쪽의 DB 트랜잭션 안에서 실행되므로,
+거래 저장과 집계 갱신은 함께 커밋되거나 함께 롤백된다.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import MonthlyRollup, Transaction
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def _as_date(value):
+    """문자열로 들어온 거래일(ORM create 에 'YYYY-MM-DD' 전달 등)을 date 로 변환."""
+    return Transaction._meta.get_field("occurred_at").to_python(value)
+
+
+def apply_rollup(user_id, occurred_at, category_id, tx_type, amount, count=1):
+    """집계 행에 (amount, count) 증감분을 더한다. 음수면 차감.
+
+    차감으로 건수가 0 이 된 행은 삭제하고, 차감할 행이 없으면 아무것도 하지 않는다
+    (유저 삭제 CASCADE 중에 이미 지워진 집계 행을 되살리지 않기 위함).
+    """
+    month = _as_date(occurred_at).replace(day=1)
+    rows = MonthlyRollup.objects.filter(
+        user_id=user_id, month=month, category_id=category_id, tx_type=tx_type,
+    )
+    updated = rows.update(total=F("total") + int(amount), count=F("count") + count)
+    if count < 0:
+        if updated:
+            rows.filter(count__lte=0).delete()
+        return
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            MonthlyRollup.objects.create(
+                user_id=user_id, month=month, category_id=category_id,
+                tx_type=tx_type, total=int(amount), count=count,
+            )
+    except IntegrityError:
+        # 동시에 같은 행이 생성된 경우 → 생성된 행에 더한다
+        rows.update(total=F("total") + int(amount), count=F("count") + count)
+
+
+def apply_transaction(tx, sign=1):
+    """Transaction 인스턴스 1건을 집계에 반영(sign=1) 또는 차감(sign=-1)한다."""
+    apply_rollup(
+        tx.user_id, tx.occurred_at, tx.category_id, tx.tx_type,
+        sign * int(tx.amount), count=sign,
+    )
+
+
+def apply_transactions(transactions):
+    """bulk_create 등 시그널을 거치지 않은 거래 묶음을 집계에 더한다.
+
+    (유저, 월, 카테고리, 입출금) 단위로 먼저 합친 뒤, 기존 집계 행은 잠근 상태로
+    한 번에 bulk_update 하고 없는 행은 bulk_create 한다.
+    쿼리 수는 거래 수가 아니라 묶음 수(보통 1~3회)에 비례한다.
+    """
+    deltas = {}
+    for tx in transactions:
+        key = (tx.user_id, _as_date(tx.occurred_at).replace(day=1), tx.category_id, tx.tx_type)
+        total, count = deltas.get(key, (0, 0))
+        deltas[key] = (total + int(tx.amount), count + 1)
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        existing = MonthlyRollup.objects.select_for_update().filter(
+            user_id__in={key[0] for key in deltas},
+            month__in={key[1] for key in deltas},
+        )
+        to_update = []
+        for row in existing:
+            key = (row.user_id, row.month, row.category_id, row.tx_type)
+            if key in deltas:
+                total, count = deltas.pop(key)
+                row.total += total
+                row.count += count
+                to_update.append(row)
+        MonthlyRollup.objects.bulk_update(to_update, ["total", "count"], batch_size=REBUILD_BATCH_SIZE)
+
+        new_rows = [
+            MonthlyRollup(user_id=user_id, month=month, category_id=category_id,
+                          tx_type=tx_type, total=total, count=count)
+            for (user_id, month, category_id, tx_type), (total, count) in deltas.items()
+        ]
+        try:
+            with transaction.atomic():
+                MonthlyRollup.objects.bulk_create(new_rows, batch_size=REBUILD_BATCH_SIZE)
+        except IntegrityError:
+            # 그 사이 다른 트랜잭션이 같은 행을 만든 경우 → 행 단위로 더한다
+            for row in new_rows:
+                apply_rollup(row.user_id, row.month, row.category_id, row.tx_type,
+                             row.total, count=row.count)
+
+
+def rebuild_rollups(user_ids=None):
+    """Transaction 원장으로부터 집계 행을 다시 계산한다.
+
+    user_ids 가 주어지면 해당 유저만, 없으면 전체를 재계산한다.
+    반환값은 생성된 집계 행 수.
+    """
+    tx_qs = Transaction.objects.all()
+    rollup_qs = MonthlyRollup.objects.all()
+    if user_ids is not None:
+        tx_qs = tx_qs.filter(user_id__in=user_ids)
+        rollup_qs = rollup_qs.filter(user_id__in=user_ids)
+
+    rows = (
+        tx_qs.annotate(month=TruncMonth("occurred_at"))
+        .values("user_id", "month", "category_id", "tx_type")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+
+    created = 0
+    with transaction.atomic():
+        rollup_qs.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch.append(MonthlyRollup(**row))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                MonthlyRollup.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            MonthlyRollup.objects.bulk_create(batch)
+            created += len(batch)
+    return created
@@ -0,0 +1,216 @@
+"""거래 메모·가맹점 키워드 검색.
+
+memo__icontains OR merchant__icontains 는 '%키워드%' 패턴이라 B-tree 인덱스를
+쓸 수 없어 매번 거래 테이블 전체를 훑는다. DB 별로 부분 문자열 검색용 인덱스를 두고
+search_transactions() 하나로 감싼다.
+
+  PostgreSQL : pg_trgm 확장 + UPPER(memo / merchant) GIN 트라이그램 인덱스.
+               Django 의 icontains 가 만드는 UPPER(...) LIKE 조건이 그대로 인덱스를 탄다.
+               순위(ranked=True)는 word_similarity() 의 큰 값.
+  SQLite     : FTS5 trigram 토크나이저를 쓰는 외부 콘텐츠(shadow) 테이블.
+               거래 테이블의 INSERT/UPDATE/DELETE 트리거로 동기화되므로
+               bulk_create·update() 처럼 시그널을 거치지 않는 경로도 반영된다.
+               순위(ranked=True)는 -bm25(). 대량 INSERT 는 deferred_indexing() 으로 감싸면
+               행 단위 트리거 대신 끝날 때 한 번에 색인한다.
+
+트라이그램은 3글자 이상부터 인덱스로 찾을 수 있으므로 더 짧은 검색어나
+인덱스를 만들 수 없는 환경(확장 권한 없음, FTS5/trigram 미지원 SQLite)에서는
+기존 icontains 조건으로 동작한다. 결과는 어느 경우든 같다.
+"점심", "커피" 같은 2글자 한글 검색어가 여기에 해당한다 — FTS5 trigram 은 3글자 미만을
+색인으로 찾지 못하고, pg_trgm 도 2글자 패턴에서는 트라이그램을 뽑지 못해 인덱스 전체를
+읽는다. 대신 거래 목록·내보내기는 항상 유저 조건이 먼저 붙으므로 (user, occurred_at)
+인덱스로 그 유저의 거래만 훑는다 — 테이블 전체가 아니라 유저 한 명의 원장 크기에 비례한다.
+"""
+
+from contextlib import contextmanager
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TABLE = "transactions_transaction"
+FTS_TABLE = "transactions_transaction_fts"
+MIN_INDEXED_LENGTH = 3
+
+# 연결 별칭 → "fts5" / "trigram" / None
+_backends = {}
+
+_SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, memo, merchant)
+            VALUES (new.id, new.memo, new.merchant);
+        END""",
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, memo, merchant)
+            VALUES ('delete', old.id, old.memo, old.merchant);
+        END""",
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF memo, merchant ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, memo, merchant)
+            VALUES ('delete', old.id, old.memo, old.merchant);
+            INSERT INTO {FTS_TABLE}(rowid, memo, merchant)
+            VALUES (new.id, new.memo, new.merchant);
+        END""",
+}
+
+_PG_INDEXES = {
+    "tx_memo_trgm_idx": f"CREATE INDEX IF NOT EXISTS tx_memo_trgm_idx ON {TABLE} "
+                        "USING gin (UPPER(memo) gin_trgm_ops)",
+    "tx_merchant_trgm_idx": f"CREATE INDEX IF NOT EXISTS tx_merchant_trgm_idx ON {TABLE} "
+                            "USING gin (UPPER(merchant) gin_trgm_ops)",
+}
+
+
+# ──────────────────────────────────
+# 인덱스 설치 / 제거 (마이그레이션 0010 + post_migrate)
+# ──────────────────────────────────
+
+def install_search_index(connection):
+    """현재 DB 에 검색 인덱스를 만든다. 이미 있으면 아무것도 하지 않는다.
+
+    SQLite 는 테이블 재생성(AlterField 등) 때 트리거가 사라지므로 post_migrate 에서도
+    호출해 빠진 트리거를 다시 만들고 shadow 테이블을 재구성한다.
+    """
+    _backends.pop(connection.alias, None)
+    if connection.vendor == "sqlite":
+        _install_sqlite(connection)
+    elif connection.vendor == "postgresql":
+        _install_postgresql(connection)
+
+
+def remove_search_index(connection):
+    _backends.pop(connection.alias, None)
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for name in _SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif connection.vendor == "postgresql":
+            for name in _PG_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def _install_sqlite(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+            list(_SQLITE_TRIGGERS),
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if len(existing) == len(_SQLITE_TRIGGERS):
+            return
+        try:
+            with transaction.atomic(using=connection.alias):
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    f"memo, merchant, content='{TABLE}', content_rowid='id', "
+                    "tokenize='trigram')"
+                )
+        except DatabaseError:
+            # FTS5 또는 trigram 토크나이저(SQLite 3.34+)가 없는 빌드 → icontains 로 동작
+            return
+        for sql in _SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _install_postgresql(connection):
+    with connection.cursor() as cursor:
+        try:
+            with transaction.atomic(using=connection.alias):
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError:
+            # 확장을 만들 권한이 없으면 icontains 로 동작
+            return
+        for sql in _PG_INDEXES.values():
+            cursor.execute(sql)
+
+
+@contextmanager
+def deferred_indexing(connection):
+    """대량 INSERT 동안 행 단위 색인 트리거를 끄고, 끝나면 새 행을 한 번에 색인한다.
+
+    SQLite FTS5 는 트리거로 한 행씩 넣는 것보다 INSERT ... SELECT 한 번이 수십 배 빠르다.
+    SQLite 의 DDL 은 트랜잭션에 포함되고 트리거를 지운 순간부터 커밋까지 쓰기 잠금을
+    쥐므로 그 사이 다른 연결이 넣은 행이 색인에서 빠지지 않으며, 실패하면 트리거 삭제도
+    함께 롤백된다. FTS5 를 쓰지 않는 DB 에서는 아무것도 하지 않는다.
+    """
+    if _backend(connection) != "fts5":
+        yield
+        return
+    trigger = f"{FTS_TABLE}_ai"
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {TABLE}")
+        last_id = cursor.fetchone()[0]
+        yield
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, memo, merchant) "
+            f"SELECT id, memo, merchant FROM {TABLE} WHERE id > %s",
+            [last_id],
+        )
+        cursor.execute(_SQLITE_TRIGGERS[trigger])
+
+
+def _backend(connection):
+    """이 연결에서 쓸 수 있는 검색 인덱스 종류. 프로세스당 한 번만 확인한다."""
+    if connection.alias not in _backends:
+        backend = None
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                    [FTS_TABLE],
+                )
+                backend = "fts5" if cursor.fetchone() else None
+            elif connection.vendor == "postgresql":
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                backend = "trigram" if cursor.fetchone() else None
+        _backends[connection.alias] = backend
+    return _backends[connection.alias]
+
+
+# ──────────────────────────────────
+# 검색 API
+# ──────────────────────────────────
+
+def search_transactions(qs, query, ranked=False):
+    """qs 중 메모나 가맹점에 query 가 (대소문자 무시) 포함된 거래만 남긴다.
+
+    ranked=True 면 search_rank(float, 클수록 관련도 높음)를 붙여 관련도순으로 정렬한다.
+    FTS5 에서는 순위 계산에 MATCH 가 한 번 더 들어가므로 정렬이 필요할 때만 켠다.
+    인덱스를 쓸 수 없는 경우 search_rank 는 0 이다.
+    """
+    query = query.strip()
+    if not query:
+        return qs
+    connection = connections[qs.db]
+    backend = _backend(connection) if len(query) >= MIN_INDEXED_LENGTH else None
+
+    if backend == "fts5":
+        match = '"' + query.replace('"', '""') + '"'
+        qs = qs.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        )
+        rank = RawSQL(
+            f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{TABLE}"."id"',
+            [match],
+            output_field=FloatField(),
+        )
+    else:
+        qs = qs.filter(Q(memo__icontains=query) | Q(merchant__icontains=query))
+        if backend == "trigram":
+            rank = RawSQL(
+                f'GREATEST(word_similarity(%s, "{TABLE}"."memo"), '
+                f'word_similarity(%s, "{TABLE}"."merchant"))',
+                [query, query],
+                output_field=FloatField(),
+            )
+        else:
+            rank = Value(0.0, output_field=FloatField())
+    if not ranked:
+        return qs
+    return qs.annotate(search_rank=rank).order_by("-search_rank", "-occurred_at", "-pk")
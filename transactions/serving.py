@@ -0,0 +1,148 @@
+"""영수증 파일 전송 — 권한 검사를 마친 뒤 조건부 요청·Range 를 처리해 보낸다.
+
+serve_receipt(request, attachment) : attachment 의 파일 응답 (200 / 206 / 304 / 412 / 416)
+parse_range(header, size)          : Range 헤더 → (start, end), 무시할 헤더면 None
+
+  - ETag: 내용의 SHA-256 (강한 검증자). 내용 주소 저장 이전 파일은 수정 시각·크기로 만든다.
+  - Last-Modified: 파일 수정 시각. If-None-Match / If-Modified-Since 면 304,
+    If-Match / If-Unmodified-Since 가 어긋나면 412 (django.utils.cache.get_conditional_response).
+  - Range: 한 구간(bytes=a-b, a-, -n)만 206 으로 보낸다. 여러 구간이나 형식이 틀린 헤더,
+    If-Range 가 현재 파일과 맞지 않으면 전체를 보낸다. 파일 밖의 구간이면 416.
+  - Cache-Control: private, no-cache — 브라우저만 저장하고 쓸 때마다 ETag 로 재검증한다
+    (권한이 바뀌면 바로 반영되도록).
+
+RECEIPT_SENDFILE 을 설정하면 파일 바이트는 앞단 서버가 보내고(Range 처리 포함) Django 는
+헤더만 만든다. 큰 PDF 를 보내는 동안 Python 워커가 묶이지 않는다.
+  - "x-sendfile"       : X-Sendfile: <파일 절대 경로> (Apache mod_xsendfile, lighttpd 등)
+  - "x-accel-redirect" : X-Accel-Redirect: RECEIPT_ACCEL_PREFIX + <저장 이름> (nginx —
+                         prefix 는 MEDIA_ROOT 를 가리키는 internal location)
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+SENDFILE_MODES = ("", "x-sendfile", "x-accel-redirect")
+RANGE_RE = re.compile(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", re.IGNORECASE)  # 한 구간만
+
+
+def parse_range(header, size):
+    """'bytes=0-99' 같은 Range 헤더 → (start, end) (end 포함, 파일 크기에 맞춰 자름).
+
+    헤더가 없거나 형식이 틀리거나 구간이 여러 개면 None (전체를 보냄).
+    구간이 파일 밖이면 (size, size) — start >= size 로 416 을 판단한다.
+    """
+    match = RANGE_RE.fullmatch(header or "")
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # 끝에서 n 바이트
+        length = int(last)
+        if length == 0:
+            return size, size
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return size, size
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _if_range_matches(request, etag, last_modified):
+    """If-Range 가 없거나 현재 파일을 가리키면 True (Range 를 적용해도 됨)."""
+    value = request.META.get("HTTP_IF_RANGE")
+    if not value:
+        return True
+    if value.startswith(('"', "W/")):
+        # 강한 비교 — 약한 ETag 는 맞지 않는 것으로 본다
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _etag(attachment, stat):
+    if attachment.blob_id:
+        return f'"{attachment.blob_id}"'
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _offload(mode, attachment, path):
+    response = HttpResponse()
+    if mode == "x-sendfile":
+        response.headers["X-Sendfile"] = path
+    else:
+        response.headers["X-Accel-Redirect"] = (
+            settings.RECEIPT_ACCEL_PREFIX.rstrip("/") + "/" + quote(attachment.file.name)
+        )
+    return response
+
+
+def _send(request, path, size, etag, last_modified):
+    """Django 가 직접 보낼 때: Range 가 맞으면 206, 파일 밖이면 416, 아니면 200."""
+    byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+    if byte_range is not None and _if_range_matches(request, etag, last_modified):
+        start, end = byte_range
+        if start >= size:
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+        response = StreamingHttpResponse(_read_range(path, start, end - start + 1), status=206)
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response.headers["Content-Length"] = end - start + 1
+        return response
+    return FileResponse(open(path, "rb"))
+
+
+def serve_receipt(request, attachment):
+    """attachment 의 파일을 보낸다 (소유자 확인은 호출하는 뷰에서)."""
+    mode = settings.RECEIPT_SENDFILE
+    if mode not in SENDFILE_MODES:
+        raise ImproperlyConfigured(
+            f"RECEIPT_SENDFILE 은 {', '.join(repr(m) for m in SENDFILE_MODES)} 중 하나여야 합니다: {mode!r}"
+        )
+    path = attachment.file.path
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404("영수증 파일이 없습니다.")
+    etag = _etag(attachment, stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if mode:
+            response = _offload(mode, attachment, path)
+        else:
+            response = _send(request, path, stat.st_size, etag, last_modified)
+        if response.status_code != 416:
+            content_type, _ = mimetypes.guess_type(attachment.original_name)
+            response.headers["Content-Type"] = content_type or "application/octet-stream"
+            response.headers["Content-Disposition"] = content_disposition_header(
+                False, attachment.original_name,
+            )
+            response.headers["Accept-Ranges"] = "bytes"
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
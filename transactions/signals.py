@@ -0,0 +1,165 @@
+"""transactions 앱 시그널.
+
+- 거래 변경을 MonthlyRollup 집계에 반영한다.
+- 거래·계좌·정기 거래·목표·카테고리 변경 시 데이터 버전 스탬프를 바꿔
+  InMoney 지표 캐시를 무효화한다 (versioning.py).
+- 카테고리 변경 시 카테고리 레지스트리를 다시 읽게 한다 (categories.py).
+- 영수증(Attachment)이 지워지면 더 이상 쓰지 않는 파일을 지운다 (receipts.py).
+  거래·계좌·유저 삭제에 딸린 CASCADE 삭제도 포함된다.
+
+뷰·관리자 페이지·ORM 직접 호출 등 save()/delete() 를 거치는 모든 경로가
+대상이다. bulk_create / QuerySet.update() 는 시그널을 보내지 않으므로
+해당 경로에서는 rollups / versioning 모듈을 직접 호출한다.
+
+대량 삭제: 계좌·유저 삭제에 딸린 CASCADE 삭제는 거래마다 집계 UPDATE·캐시 쓰기·on_commit
+훅을 하나씩 만들므로 행 단위 처리를 건너뛰고, 계좌·유저 post_delete 에서 유저 집계를
+한 번 다시 계산하고 버전을 한 번 바꾼다. 직접 대량으로 지우는 코드(dummy.generate_ledger)는
+bulk_delete() 안에서 지우고 끝난 뒤 같은 일을 직접 한다.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import categories, receipts, rollups
+from .models import (
+    Account, Attachment, Category, Goal, MonthlyRollup, RecurringTransaction, Transaction,
+)
+from .versioning import bump_data_version, bump_global_version
+
+User = get_user_model()
+
+ROLLUP_FIELDS = ("user_id", "occurred_at", "category_id", "tx_type", "amount")
+
+_bulk_deleting = ContextVar("bulk_deleting", default=False)
+
+
+@contextmanager
+def bulk_delete():
+    """이 안의 삭제는 행 단위 집계·버전 갱신을 건너뛴다.
+
+    끝난 뒤 호출한 쪽이 rollups.rebuild_rollups() 와 bump_data_version() 을 부른다.
+    """
+    token = _bulk_deleting.set(True)
+    try:
+        yield
+    finally:
+        _bulk_deleting.reset(token)
+
+
+def _cascade_root(origin):
+    """삭제를 시작한 것이 계좌나 유저면 그 모델, 아니면 None."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    for root in (Account, User):
+        if issubclass(model, root):
+            return root
+    return None
+
+
+def _skip_row(origin):
+    return _bulk_deleting.get() or _cascade_root(origin) is not None
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    """수정 전 값을 기억해 두었다가 post_save 에서 차감한다."""
+    instance._rollup_previous = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._rollup_previous = (
+        Transaction.objects.filter(pk=instance.pk).values(*ROLLUP_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_rollup_previous", None)
+    if previous:
+        current = {
+            "user_id": instance.user_id,
+            "occurred_at": rollups._as_date(instance.occurred_at),
+            "category_id": instance.category_id,
+            "tx_type": instance.tx_type,
+            "amount": int(instance.amount),
+        }
+        if previous == current:
+            return
+        rollups.apply_rollup(
+            previous["user_id"], previous["occurred_at"], previous["category_id"],
+            previous["tx_type"], -previous["amount"], count=-1,
+        )
+    rollups.apply_transaction(instance)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    if _skip_row(origin):
+        return
+    rollups.apply_transaction(instance, sign=-1)
+
+
+@receiver(post_delete, sender=Account)
+def rebuild_after_account_delete(sender, instance, origin=None, **kwargs):
+    """계좌 삭제(거래 CASCADE)가 끝나면 유저 집계를 한 번 다시 계산하고 버전을 바꾼다."""
+    if _bulk_deleting.get() or _cascade_root(origin) is not Account:
+        return  # 유저 삭제면 집계도 함께 지워진다
+    rollups.rebuild_rollups([instance.user_id])
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_delete, sender=User)
+def bump_version_on_user_delete(sender, instance, **kwargs):
+    bump_data_version(instance.pk)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_users(sender, instance, **kwargs):
+    """카테고리 삭제 시 거래는 SET_NULL 로 '미분류'가 되므로 영향 유저를 기억한다."""
+    instance._rollup_user_ids = list(
+        MonthlyRollup.objects.filter(category=instance)
+        .values_list("user_id", flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Category)
+def rebuild_rollups_on_category_delete(sender, instance, **kwargs):
+    user_ids = getattr(instance, "_rollup_user_ids", None)
+    if user_ids:
+        rollups.rebuild_rollups(user_ids)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=RecurringTransaction)
+@receiver(post_delete, sender=RecurringTransaction)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def bump_version_on_user_data_change(sender, instance, signal, origin=None, **kwargs):
+    if signal is post_delete and _skip_row(origin):
+        return  # 대량 삭제 — 계좌·유저 post_delete 나 bulk_delete() 쓴 쪽에서 한 번
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_version_on_category_change(sender, instance, **kwargs):
+    bump_global_version()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_category_registry(sender, instance, **kwargs):
+    categories.invalidate()
+
+
+@receiver(post_delete, sender=Attachment)
+def release_receipt_file(sender, instance, **kwargs):
+    receipts.release(instance)
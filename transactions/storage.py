@@ -0,0 +1,118 @@
+"""내용 주소(content-addressed) 영수증 저장소.
+
+파일 이름은 업로드 내용의 SHA-256 이다.
+
+    receipts/ab/cd/abcd1234...  (해시 앞 2글자 / 다음 2글자 / 해시 전체)
+
+  - 같은 내용의 영수증은 유저·거래가 달라도 한 번만 저장된다 (ReceiptBlob 한 행).
+  - 두 단계 fan-out 으로 디렉터리 하나에 파일이 몰리지 않는다 (256 x 256 개로 분산).
+  - 이름이 곧 내용이므로 백업·동기화 도구가 바뀐 파일만 골라내기 쉽다.
+
+ContentAddressedStorage
+  open_blob()    : 청크를 받는 대로 임시 파일에 쓰면서 해시하는 BlobWriter (업로드 핸들러용)
+  stage(content) : 업로드를 청크 단위로 임시 파일에 쓰면서 해시 → StagedBlob (한 번만 읽음)
+  place(staged)  : 임시 파일을 최종 이름으로 옮긴다. 이미 있으면 임시 파일만 지운다
+  _save()        : stage + place — Storage.save() 를 거치는 경로용
+
+참조 수 관리(같은 blob 을 가리키는 Attachment 가 없어지면 파일 삭제)는 receipts.py.
+"""
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+
+from django.core.files.storage import FileSystemStorage
+
+RECEIPT_PREFIX = "receipts"
+
+
+def blob_name(sha256, prefix=RECEIPT_PREFIX):
+    """SHA-256 hex → 'receipts/ab/cd/<sha256>'"""
+    return f"{prefix}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+@dataclass
+class StagedBlob:
+    sha256: str
+    size: int
+    temp_path: str
+
+    @property
+    def name(self):
+        return blob_name(self.sha256)
+
+    def discard(self):
+        """place() 하지 않은 임시 파일을 지운다 (이미 옮겼으면 아무것도 안 함)."""
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class BlobWriter:
+    """청크를 임시 파일에 쓰면서 SHA-256 과 크기를 잰다. finish() → StagedBlob"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        # 최종 위치와 같은 파일 시스템이어야 place() 의 os.replace 가 원자적이다
+        fd, self.temp_path = tempfile.mkstemp(prefix=".upload-", dir=directory)
+        self.file = os.fdopen(fd, "wb")
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk):
+        self.digest.update(chunk)
+        self.size += len(chunk)
+        self.file.write(chunk)
+
+    def finish(self):
+        self.file.close()
+        return StagedBlob(self.digest.hexdigest(), self.size, self.temp_path)
+
+    def abort(self):
+        """쓰던 임시 파일을 닫고 지운다."""
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """MEDIA_ROOT 아래 receipts/ab/cd/<sha256> 로 저장하는 파일 저장소."""
+
+    def open_blob(self):
+        return BlobWriter(self.path(RECEIPT_PREFIX))
+
+    def stage(self, content):
+        """content 를 임시 파일로 복사하면서 SHA-256 과 크기를 잰다."""
+        writer = self.open_blob()
+        try:
+            for chunk in content.chunks():
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.finish()
+
+    def place(self, staged):
+        """staged 를 최종 이름으로 옮기고 이름을 반환한다."""
+        path = self.path(staged.name)
+        if os.path.exists(path):
+            staged.discard()
+            return staged.name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(staged.temp_path, self.file_permissions_mode)
+        os.replace(staged.temp_path, path)
+        return staged.name
+
+    def _save(self, name, content):
+        # 넘겨받은 name(upload_to 결과)은 쓰지 않고 내용으로 이름을 정한다
+        return self.place(self.stage(content))
+
+
+def receipt_storage():
+    """Attachment.file 의 저장소 (FileField storage 인자용 callable)."""
+    return ContentAddressedStorage()
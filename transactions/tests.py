@@ -1,3 +1,5 @@
+from io import StringIO
+
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from .models import Account, Category, Transaction, RecurringTransaction
@@ -19,6 +21,41 @@ class AccountCRUDTest(TestCase):
         self.assertEqual(res.status_code, 200)
         self.assertContains(res, "생활비")
 
+    def test_account_list_activity_stats(self):
+        from datetime import timedelta
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.utils.timezone import localdate
+        today = localdate()
+        last_month = today.replace(day=1) - timedelta(days=1)
+        for tx_type, amount, day in (("IN", 5000, today), ("OUT", 2000, today), ("OUT", 700, last_month)):
+            Transaction.objects.create(
+                user=self.user, account=self.account, tx_type=tx_type, amount=amount, occurred_at=day,
+            )
+        Transaction.objects.create(
+            user=self.other, account=Account.objects.create(
+                user=self.other, name="남의 계좌", bank_name="신한", account_number="999",
+            ), tx_type="IN", amount=9000, occurred_at=today,
+        )
+
+        with CaptureQueriesContext(connection) as one:
+            res = self.client.get("/transactions/accounts/")
+        stats = {a.name: a for a in res.context["accounts"]}
+        account = stats["생활비"]
+        self.assertEqual(
+            (account.tx_count, account.last_tx_date, account.month_income, account.month_expense),
+            (3, today, 5000, 2000),
+        )
+
+        # 빈 계좌는 0 / 없음, 계좌가 늘어도 쿼리 수는 그대로
+        for i in range(3):
+            Account.objects.create(user=self.user, name=f"빈 계좌{i}", bank_name="국민", account_number=f"{i}")
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get("/transactions/accounts/")
+        empty = next(a for a in res.context["accounts"] if a.name == "빈 계좌0")
+        self.assertEqual((empty.tx_count, empty.last_tx_date, empty.month_income), (0, None, 0))
+        self.assertEqual(len(one.captured_queries), len(many.captured_queries))
+
     def test_account_create(self):
         res = self.client.post("/transactions/accounts/new/", {
             "name": "적금", "bank_name": "신한",
@@ -171,6 +208,45 @@ class TransactionFilterTest(TestCase):
         self.assertContains(res, "10,000")
         self.assertNotContains(res, "50,000")
 
+    def test_date_to_is_inclusive(self):
+        res = self.client.get("/transactions/?date_from=2026-01-10&date_to=2026-01-10")
+        self.assertContains(res, "10,000")
+        self.assertNotContains(res, "50,000")
+
+    def test_invalid_date_is_ignored(self):
+        res = self.client.get("/transactions/?date_from=2026-13-01")
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "10,000")
+        self.assertContains(res, "50,000")
+
+
+class DateRangeHelperTest(TestCase):
+    def test_month_range_is_half_open(self):
+        from datetime import date
+        from .dates import month_range
+        self.assertEqual(month_range(2025, 12), (date(2025, 12, 1), date(2026, 1, 1)))
+        with self.assertRaises(ValueError):
+            month_range(2026, 13)
+
+    def test_recent_months_crosses_year(self):
+        from datetime import date
+        from .dates import recent_months
+        self.assertEqual(
+            recent_months(date(2026, 2, 15), 3), [(2025, 12), (2026, 1), (2026, 2)]
+        )
+
+    def test_range_predicates_do_not_wrap_column(self):
+        from .dates import date_range_q
+        sql = str(Transaction.objects.filter(date_range_q("2026-01-01", "2026-01-31")).query)
+        self.assertIn('"occurred_at" >= 2026-01-01', sql)
+        self.assertIn('"occurred_at" < 2026-02-01', sql)
+        self.assertNotIn("django_date_extract", sql)
+        # 9999-12-31 의 다음 날은 없다 — 500 대신 그 날 이하로 비교
+        sql = str(Transaction.objects.filter(date_range_q(None, "9999-12-31")).query)
+        self.assertIn('"occurred_at" <= 9999-12-31', sql)
+        self.client.force_login(User.objects.create_user(username="u1", password="pass1234!"))
+        self.assertEqual(self.client.get("/transactions/?date_to=9999-12-31").status_code, 200)
+
 
 class RecurringTransactionTest(TestCase):
     def setUp(self):
@@ -269,6 +345,112 @@ class RecurringTransactionTest(TestCase):
         self.assertEqual(Transaction.objects.filter(user=self.user).count(), 0)
 
 
+class RecurringEngineTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=1000000,
+        )
+        self.cat = Category.objects.create(name="구독", cat_type="OUT")
+
+    def _rec(self, **kwargs):
+        from datetime import date
+        fields = dict(
+            user=self.user, account=self.account, category=self.cat,
+            tx_type="OUT", amount=10000, recurring_day=10,
+            start_date=date(2026, 1, 1), last_executed=date(2026, 1, 10),
+        )
+        fields.update(kwargs)
+        return RecurringTransaction.objects.create(**fields)
+
+    def test_catches_up_missed_months_with_running_balance(self):
+        from datetime import date
+        from .models import MonthlyRollup
+        from .recurring import process_recurring
+        rec = self._rec()
+        self._rec(tx_type="IN", amount=300000, recurring_day=31, memo="월급")
+
+        result = process_recurring(today=date(2026, 4, 15))
+
+        # 지출: 2/10, 3/10, 4/10 / 수입: 2/28, 3/31 (말일 보정, 4/30 은 아직)
+        self.assertEqual(result.created, 5)
+        rows = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by("occurred_at", "pk")
+            .values_list("occurred_at", "amount", "balance_after")
+        )
+        self.assertEqual(rows, [
+            (date(2026, 2, 10), 10000, 990000),
+            (date(2026, 2, 28), 300000, 1290000),
+            (date(2026, 3, 10), 10000, 1280000),
+            (date(2026, 3, 31), 300000, 1580000),
+            (date(2026, 4, 10), 10000, 1570000),
+        ])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 1570000)
+        rec.refresh_from_db()
+        self.assertEqual(rec.last_executed, date(2026, 4, 10))
+        self.assertEqual(
+            MonthlyRollup.objects.get(user=self.user, month=date(2026, 3, 1), tx_type="OUT").total,
+            10000,
+        )
+
+        # 같은 날 다시 실행해도 중복 생성되지 않음
+        self.assertEqual(process_recurring(today=date(2026, 4, 15)).created, 0)
+
+    def test_end_date_stops_and_deactivates(self):
+        from datetime import date
+        from .recurring import process_recurring
+        rec = self._rec(end_date=date(2026, 3, 20))
+        result = process_recurring(today=date(2026, 5, 1))
+        self.assertEqual(result.created, 2)  # 2/10, 3/10
+        self.assertEqual(result.deactivated, 1)
+        rec.refresh_from_db()
+        self.assertFalse(rec.is_active)
+        self.assertEqual(rec.last_executed, date(2026, 3, 10))
+
+    def test_query_count_does_not_grow_with_templates(self):
+        from datetime import date
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .recurring import process_recurring
+        for i in range(30):
+            self._rec(amount=1000 + i)
+        with CaptureQueriesContext(connection) as ctx:
+            result = process_recurring(today=date(2026, 3, 15), chunk_size=100)
+        self.assertEqual(result.created, 60)
+        self.assertLessEqual(len(ctx.captured_queries), 20)
+
+
+    def test_shards_partition_templates_by_user(self):
+        from datetime import date
+        from .recurring import process_recurring
+        other = User.objects.create_user(username="u2", password="pass1234!")
+        other_account = Account.objects.create(
+            user=other, name="생활비", bank_name="신한", account_number="9876543210",
+        )
+        self._rec()
+        self._rec(user=other, account=other_account)
+        results = [
+            process_recurring(today=date(2026, 2, 15), shard=(i, 2)) for i in range(2)
+        ]
+        self.assertEqual([r.created for r in results], [1, 1])
+        self.assertEqual(process_recurring(today=date(2026, 2, 15)).created, 0)
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_shard_option_validation(self):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        with self.assertRaises(CommandError):
+            call_command("process_recurring", shard="2/2", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("process_recurring", shard="abc", stdout=StringIO())
+        out = StringIO()
+        call_command("process_recurring", shard="0/1", stdout=out)
+        self.assertIn("완료", out.getvalue())
+
+
 class BalanceAutoUpdateTest(TestCase):
     def setUp(self):
         self.client = Client()
@@ -373,3 +555,1267 @@ class BalanceAutoUpdateTest(TestCase):
         self.assertEqual(res.status_code, 302)
         self.account.refresh_from_db()
         self.assertEqual(self.account.balance, 1000000 - 9999999)
+
+
+class BalanceLedgerTest(TestCase):
+    """과거 날짜 거래의 생성·수정·삭제 → 뒤쪽 거래의 balance_after 재계산 (ledger.py)"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=100000,
+        )
+        for day, amount in (("2026-01-10", 10000), ("2026-01-20", 20000), ("2026-01-30", 30000)):
+            self._post("/transactions/new/", amount=amount, occurred_at=day)
+
+    def _post(self, url, **fields):
+        data = {"account": self.account.pk, "tx_type": "OUT", "amount": 1000, "occurred_at": "2026-01-15"}
+        data.update(fields)
+        return self.client.post(url, data)
+
+    def _snapshots(self):
+        return list(
+            Transaction.objects.filter(account=self.account)
+            .order_by("occurred_at", "id").values_list("amount", "balance_after")
+        )
+
+    def test_backdated_create_restamps_later_rows(self):
+        self.assertEqual(self._snapshots(), [(10000, 90000), (20000, 70000), (30000, 40000)])
+        self._post("/transactions/new/", amount=5000, occurred_at="2026-01-15")
+        self.assertEqual(
+            self._snapshots(), [(10000, 90000), (5000, 85000), (20000, 65000), (30000, 35000)],
+        )
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 35000)
+
+    def test_update_moving_date_restamps_both_positions(self):
+        tx = Transaction.objects.get(amount=30000)
+        self._post(f"/transactions/{tx.pk}/edit/", amount=1000, occurred_at="2026-01-05")
+        self.assertEqual(self._snapshots(), [(1000, 99000), (10000, 89000), (20000, 69000)])
+
+    def test_update_moving_account_restamps_both_accounts(self):
+        card = Account.objects.create(
+            user=self.user, name="카드", bank_name="신한", account_number="2222", balance=0,
+        )
+        tx = Transaction.objects.get(amount=10000)
+        self._post(
+            f"/transactions/{tx.pk}/edit/",
+            account=card.pk, amount=10000, occurred_at="2026-01-10", confirm="1",
+        )
+        self.assertEqual(self._snapshots(), [(20000, 80000), (30000, 50000)])
+        self.assertEqual(Transaction.objects.get(pk=tx.pk).balance_after, -10000)
+
+    def test_revise_reverses_current_row_not_stale_snapshot(self):
+        from transactions import ledger
+        # 두 요청이 같은 거래(10,000원)를 읽은 뒤 차례로 저장
+        first = Transaction.objects.get(amount=10000)
+        second = Transaction.objects.get(amount=10000)
+        first_before, second_before = ledger.position(first), ledger.position(second)
+        first.amount = 15000
+        ledger.revise(first, first_before)
+        second.amount = 12000
+        ledger.revise(second, second_before)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 100000 - 12000 - 20000 - 30000)
+        self.assertEqual(self._snapshots(), [(12000, 88000), (20000, 68000), (30000, 38000)])
+
+    def test_revise_relocks_in_pk_order_when_row_moved_account(self):
+        from unittest import mock
+        from transactions import ledger
+        card = Account.objects.create(
+            user=self.user, name="카드", bank_name="신한", account_number="2222", balance=0,
+        )
+        stale = Transaction.objects.get(amount=10000)
+        stale_before = ledger.position(stale)
+        # 그 사이 다른 요청이 같은 거래를 카드로 옮겼다
+        moved = Transaction.objects.get(pk=stale.pk)
+        moved_before = ledger.position(moved)
+        moved.account = card
+        ledger.revise(moved, moved_before)
+
+        stale.amount = 15000
+        with mock.patch.object(ledger, "lock_accounts", wraps=ledger.lock_accounts) as lock:
+            ledger.revise(stale, stale_before)
+        # 잠금을 덧붙이지 않고 두 계좌를 한 번에 다시 잠근다
+        self.assertEqual(
+            [set(call.args[0]) for call in lock.call_args_list],
+            [{self.account.pk}, {self.account.pk, card.pk}],
+        )
+        self.account.refresh_from_db()
+        card.refresh_from_db()
+        self.assertEqual((self.account.balance, card.balance), (35000, 0))
+        self.assertEqual(self._snapshots(), [(15000, 85000), (20000, 65000), (30000, 35000)])
+
+    def test_delete_restamps_later_rows(self):
+        tx = Transaction.objects.get(amount=10000)
+        self.client.post(f"/transactions/{tx.pk}/delete/")
+        self.assertEqual(self._snapshots(), [(20000, 80000), (30000, 50000)])
+
+    def test_recompute_touches_only_suffix_in_one_update(self):
+        from datetime import date
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from transactions import ledger
+        first = Transaction.objects.get(amount=10000)
+        Transaction.objects.filter(pk=first.pk).update(balance_after=-1)
+        with CaptureQueriesContext(connection) as ctx:
+            updated = ledger.recompute_balance_after(self.account.pk, 40000, date(2026, 1, 20))
+        self.assertEqual((updated, len(ctx.captured_queries)), (2, 1))
+        # 구간 밖 거래는 건드리지 않는다
+        self.assertEqual(self._snapshots(), [(10000, -1), (20000, 70000), (30000, 40000)])
+
+    def test_backdated_batch_restamps_existing_rows(self):
+        import json
+        res = self.client.post(
+            "/transactions/batch/",
+            data=json.dumps({"transactions": [
+                {"account": self.account.pk, "tx_type": "IN", "amount": 7000, "occurred_at": "2026-01-25"},
+                {"account": self.account.pk, "tx_type": "OUT", "amount": 2000, "occurred_at": "2026-02-01"},
+            ]}),
+            content_type="application/json",
+        )
+        self.assertEqual([t["balance_after"] for t in res.json()["transactions"]], [77000, 45000])
+        self.assertEqual(
+            self._snapshots(),
+            [(10000, 90000), (20000, 70000), (7000, 77000), (30000, 47000), (2000, 45000)],
+        )
+
+
+class BalanceReconcileTest(TestCase):
+    """reconcile_balances — 원장(개설 잔액 + 거래 증감)과 잔액·balance_after 대조·복구"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=100000,
+        )
+        self.card = Account.objects.create(
+            user=self.user, name="카드", bank_name="신한", account_number="2222", balance=0,
+        )
+        for account, day, amount in (
+            (self.account, "2026-01-10", 10000), (self.account, "2026-01-20", 20000),
+            (self.card, "2026-01-15", 5000),
+        ):
+            self.client.post("/transactions/new/", {
+                "account": account.pk, "tx_type": "OUT", "amount": amount,
+                "occurred_at": day, "confirm": "1",
+            })
+
+    def _run(self, *args):
+        from django.core.management import call_command
+        out = StringIO()
+        call_command("reconcile_balances", *args, stdout=out)
+        return out.getvalue()
+
+    def test_clean_ledger_reports_no_drift(self):
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.opening_balance, 100000)
+        self.assertIn("2개 계좌 중 0개 불일치", self._run())
+
+    def test_reports_drift_without_fixing(self):
+        Account.objects.filter(pk=self.account.pk).update(balance=1)
+        Transaction.objects.filter(amount=10000).update(balance_after=0)
+        out = self._run()
+        self.assertIn("계좌 {}: 잔액 1원 → 원장 70,000원, balance_after 1건 불일치 (2026-01-10 부터)".format(
+            self.account.pk), out)
+        self.assertIn("1개 불일치", out)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 1)
+
+    def test_fix_repairs_balance_and_balance_after(self):
+        Account.objects.filter(pk=self.account.pk).update(balance=1)
+        Transaction.objects.filter(amount=10000).update(balance_after=0)
+        Account.objects.filter(pk=self.card.pk).update(balance=999)
+        out = self._run("--fix", "--workers", "2")
+        self.assertIn("2개 불일치, 2개 복구", out)
+        self.account.refresh_from_db()
+        self.card.refresh_from_db()
+        self.assertEqual((self.account.balance, self.card.balance), (70000, -5000))
+        self.assertEqual(
+            list(Transaction.objects.filter(account=self.account)
+                 .order_by("occurred_at").values_list("balance_after", flat=True)),
+            [90000, 70000],
+        )
+        self.assertIn("0개 불일치", self._run())
+
+    def test_null_balance_after_is_reported_and_repaired(self):
+        # 거래가 없는 계좌는 불일치가 아니다
+        Account.objects.create(user=self.user, name="빈 계좌", bank_name="하나", account_number="3333")
+        Transaction.objects.filter(amount=20000).update(balance_after=None)
+        self.assertIn("3개 계좌 중 1개 불일치", self._run())
+        self.assertIn("1개 복구", self._run("--fix"))
+        self.assertEqual(Transaction.objects.get(amount=20000).balance_after, 70000)
+
+    def test_fix_invalidates_inmoney_cache(self):
+        from .versioning import current_versions
+        Account.objects.filter(pk=self.account.pk).update(balance=1)
+        before = current_versions(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._run("--fix")
+        self.assertNotEqual(current_versions(self.user.pk)[0], before[0])
+
+    def test_editing_balance_moves_ledger_instead_of_drifting(self):
+        self.client.post(f"/transactions/accounts/{self.account.pk}/edit/", {
+            "name": "생활비", "bank_name": "국민", "account_number": "1234567890",
+            "balance": 75000, "is_active": "on",
+        })
+        self.account.refresh_from_db()
+        self.assertEqual((self.account.balance, self.account.opening_balance), (75000, 105000))
+        self.assertEqual(Transaction.objects.get(amount=20000).balance_after, 75000)
+        self.assertIn("0개 불일치", self._run("--account", str(self.account.pk)))
+
+    def test_admin_balance_edit_goes_through_ledger(self):
+        User.objects.create_superuser(username="admin", password="pass1234!")
+        admin = Client()
+        admin.login(username="admin", password="pass1234!")
+        res = admin.post(f"/admin/transactions/account/{self.account.pk}/change/", {
+            "user": self.user.pk, "name": "생활비", "bank_name": "국민",
+            "account_number": "1234567890", "balance": 75000, "is_active": "on",
+        })
+        self.assertEqual(res.status_code, 302)
+        self.account.refresh_from_db()
+        self.assertEqual((self.account.balance, self.account.opening_balance), (75000, 105000))
+        self.assertIn("0개 불일치", self._run("--fix"))
+
+    def test_opening_balance_backfill_keeps_existing_drift(self):
+        # 0012 는 첫 거래의 balance_after 로 개설 잔액을 정한다 — 어긋난 잔액을 흡수하지 않음
+        import importlib
+        from unittest import mock
+        from django.apps import apps
+        migration = importlib.import_module("transactions.migrations.0012_account_opening_balance")
+        Account.objects.filter(pk=self.account.pk).update(balance=1, opening_balance=0)
+        Account.objects.filter(pk=self.card.pk).update(opening_balance=123)
+        with mock.patch("builtins.print") as printed:
+            migration.backfill_opening_balance(apps, None)
+        printed.assert_called_once()
+        self.account.refresh_from_db()
+        self.card.refresh_from_db()
+        self.assertEqual((self.account.opening_balance, self.card.opening_balance), (100000, 0))
+        self.assertIn("1개 불일치", self._run())
+
+
+class MonthlyRollupTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=1000000,
+        )
+        self.cat = Category.objects.create(name="식비", cat_type="OUT")
+
+    def _rollups(self):
+        from .models import MonthlyRollup
+        return sorted(
+            MonthlyRollup.objects.filter(user=self.user).values_list(
+                "month", "category_id", "tx_type", "total", "count"
+            )
+        )
+
+    def test_views_keep_rollup_in_sync(self):
+        from datetime import date
+        self.client.post("/transactions/new/", {
+            "account": self.account.pk, "category": self.cat.pk,
+            "tx_type": "OUT", "amount": 30000, "occurred_at": "2026-01-20",
+        })
+        self.client.post("/transactions/new/", {
+            "account": self.account.pk, "category": self.cat.pk,
+            "tx_type": "OUT", "amount": 20000, "occurred_at": "2026-01-05",
+        })
+        self.assertEqual(self._rollups(), [
+            (date(2026, 1, 1), self.cat.pk, "OUT", 50000, 2),
+        ])
+
+        # 수정: 다른 달·미분류로 이동
+        tx = Transaction.objects.get(amount=20000)
+        self.client.post(f"/transactions/{tx.pk}/edit/", {
+            "account": self.account.pk, "tx_type": "OUT",
+            "amount": 25000, "occurred_at": "2026-02-03",
+        })
+        self.assertEqual(self._rollups(), [
+            (date(2026, 1, 1), self.cat.pk, "OUT", 30000, 1),
+            (date(2026, 2, 1), None, "OUT", 25000, 1),
+        ])
+
+        # 삭제: 건수가 0 이 된 집계 행은 사라진다
+        self.client.post(f"/transactions/{tx.pk}/delete/")
+        self.assertEqual(self._rollups(), [
+            (date(2026, 1, 1), self.cat.pk, "OUT", 30000, 1),
+        ])
+
+    def test_rebuild_rollups_command(self):
+        from .models import MonthlyRollup
+        from django.core.management import call_command
+        for day, amount in [(3, 1000), (10, 2000), (28, 3000)]:
+            Transaction.objects.create(
+                user=self.user, account=self.account, category=self.cat,
+                tx_type="OUT", amount=amount, occurred_at=f"2026-01-{day:02d}",
+            )
+        incremental = self._rollups()
+
+        MonthlyRollup.objects.filter(user=self.user).update(total=0)
+        call_command("rebuild_rollups", user="u1", stdout=StringIO())
+        self.assertEqual(self._rollups(), incremental)
+
+    def test_category_delete_moves_to_uncategorized(self):
+        from datetime import date
+        Transaction.objects.create(
+            user=self.user, account=self.account, category=self.cat,
+            tx_type="OUT", amount=5000, occurred_at="2026-01-10",
+        )
+        self.cat.delete()
+        self.assertEqual(self._rollups(), [(date(2026, 1, 1), None, "OUT", 5000, 1)])
+
+    def test_account_delete_rebuilds_once_instead_of_per_row(self):
+        from datetime import date
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        card = Account.objects.create(
+            user=self.user, name="카드", bank_name="신한", account_number="2222",
+        )
+        for account in (self.account, card):
+            for day in range(1, 11):
+                Transaction.objects.create(
+                    user=self.user, account=account, category=self.cat,
+                    tx_type="OUT", amount=1000, occurred_at=f"2026-01-{day:02d}",
+                )
+
+        with self.captureOnCommitCallbacks() as callbacks, \
+                CaptureQueriesContext(connection) as ctx:
+            self.client.post(f"/transactions/accounts/{card.pk}/delete/")
+        self.assertEqual(self._rollups(), [(date(2026, 1, 1), self.cat.pk, "OUT", 10000, 10)])
+        # 거래 10건이어도 집계 UPDATE 없이 재계산 한 번, 버전 갱신 한 번
+        rollup_updates = [
+            q for q in ctx.captured_queries
+            if q["sql"].startswith("UPDATE") and "monthlyrollup" in q["sql"]
+        ]
+        self.assertEqual(rollup_updates, [])
+        self.assertEqual(len(callbacks), 1)
+
+        from .models import MonthlyRollup
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.delete()
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(MonthlyRollup.objects.exists())
+
+
+class TransactionPaginationTest(TestCase):
+    def setUp(self):
+        from datetime import date, timedelta
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890",
+        )
+        # 같은 날짜에 여러 건이 있어도 pk 로 순서가 결정되는지 함께 확인
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, account=self.account, tx_type="OUT",
+                amount=1000 + i, occurred_at=date(2026, 1, 1) + timedelta(days=i // 3),
+            )
+            for i in range(120)
+        ])
+
+    def _amounts(self, res):
+        return [tx.amount for tx in res.context["transactions"]]
+
+    def test_pages_cover_all_rows_in_order(self):
+        from transactions.pagination import PAGE_SIZE
+        seen = []
+        res = self.client.get("/transactions/")
+        while True:
+            seen += self._amounts(res)
+            page = res.context["page"]
+            if not page.has_next:
+                break
+            res = self.client.get(f"/transactions/?{page.next_query}")
+        self.assertEqual(len(self._amounts(self.client.get("/transactions/"))), PAGE_SIZE)
+        self.assertEqual(seen, sorted(range(1000, 1120), reverse=True))
+
+    def test_prev_page_returns_same_rows(self):
+        first = self.client.get("/transactions/")
+        second = self.client.get(f"/transactions/?{first.context['page'].next_query}")
+        back = self.client.get(f"/transactions/?{second.context['page'].prev_query}")
+        self.assertEqual(self._amounts(back), self._amounts(first))
+        self.assertFalse(back.context["page"].has_prev)
+
+    def test_filters_kept_across_pages(self):
+        Transaction.objects.create(
+            user=self.user, account=self.account, tx_type="IN",
+            amount=7, occurred_at="2025-12-01",
+        )
+        res = self.client.get("/transactions/?tx_type=OUT&date_to=2026-02-28")
+        next_query = res.context["page"].next_query
+        self.assertIn("tx_type=OUT", next_query)
+        self.assertIn("date_to=2026-02-28", next_query)
+        res = self.client.get(f"/transactions/?{next_query}")
+        self.assertNotIn(7, self._amounts(res))
+
+    def test_account_detail_paginated(self):
+        from transactions.pagination import PAGE_SIZE
+        res = self.client.get(f"/transactions/accounts/{self.account.pk}/")
+        self.assertEqual(len(self._amounts(res)), PAGE_SIZE)
+        self.assertTrue(res.context["page"].has_next)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        res = self.client.get("/transactions/?after=garbage")
+        self.assertEqual(self._amounts(res)[0], 1119)
+
+
+class TransactionIndexPlanTest(TestCase):
+    """실제 조회 형태가 복합 인덱스를 타는지 EXPLAIN 으로 확인한다."""
+
+    def setUp(self):
+        from datetime import date
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890",
+        )
+        self.cat = Category.objects.create(name="식비", cat_type="OUT")
+        Transaction.objects.create(
+            user=self.user, account=self.account, category=self.cat,
+            tx_type="OUT", amount=5000, occurred_at=date(2026, 1, 10),
+        )
+
+    def _plan(self, qs):
+        from django.db import connection
+        if connection.vendor == "postgresql":
+            # 행 수가 적으면 PostgreSQL 은 순차 스캔을 고르므로 비용만 비교하게 한다.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return qs.explain()
+
+    def _list_qs(self, **params):
+        from django.http import QueryDict
+        from .querysets import filter_transactions
+        query = QueryDict(mutable=True)
+        query.update(params)
+        qs = Transaction.objects.filter(user=self.user)
+        return filter_transactions(qs, query).order_by("-occurred_at", "-pk")
+
+    def test_transaction_list_uses_user_date_index(self):
+        self.assertIn("tx_user_date_idx", self._plan(self._list_qs()))
+        plan = self._plan(self._list_qs(date_from="2026-01-01", date_to="2026-01-31"))
+        self.assertIn("tx_user_date_idx", plan)
+
+    def test_account_detail_uses_account_date_index(self):
+        qs = Transaction.objects.filter(account=self.account, user=self.user)
+        plan = self._plan(qs.order_by("-occurred_at", "-pk"))
+        self.assertIn("tx_account_date_idx", plan)
+
+    def test_category_filter_uses_category_index(self):
+        plan = self._plan(self._list_qs(category=str(self.cat.pk), date_from="2026-01-01"))
+        self.assertIn("tx_user_category_date_idx", plan)
+
+    def test_type_filter_uses_type_date_index(self):
+        plan = self._plan(self._list_qs(tx_type="OUT", date_from="2026-01-01"))
+        self.assertIn("tx_user_type_date_idx", plan)
+
+    def test_account_list_stats_use_account_index(self):
+        from datetime import date
+        from .views import _with_activity
+        plan = self._plan(_with_activity(Account.objects.filter(user=self.user), date(2026, 1, 20)))
+        # 마지막 거래일·이번 달 합계 서브쿼리가 계좌별 인덱스 범위만 읽는다
+        self.assertIn("tx_account_date_idx", plan)
+        self.assertNotIn("SCAN transactions_transaction", plan)
+
+    def test_small_spending_uses_partial_index(self):
+        qs = Transaction.objects.filter(user=self.user, tx_type="OUT", amount__lte=1000)
+        self.assertIn("tx_user_out_amount_idx", self._plan(qs))
+
+
+class TransactionSearchTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890",
+        )
+
+    def _create(self, amount, memo="", merchant=""):
+        return Transaction.objects.create(
+            user=self.user, account=self.account, tx_type="OUT",
+            amount=amount, occurred_at="2026-01-10", memo=memo, merchant=merchant,
+        )
+
+    def _search(self, q, **kwargs):
+        from .search import search_transactions
+        return search_transactions(Transaction.objects.filter(user=self.user), q, **kwargs)
+
+    def test_matches_memo_or_merchant_case_insensitive(self):
+        self._create(1000, merchant="Starbucks 강남점")
+        self._create(2000, memo="팀 회식 starbucks")
+        self._create(3000, merchant="이디야")
+        amounts = sorted(tx.amount for tx in self._search("STARBUCKS"))
+        self.assertEqual(amounts, [1000, 2000])
+
+    def test_index_follows_update_delete_and_bulk_create(self):
+        tx = self._create(1000, merchant="스타벅스 강남")
+        tx.merchant = "이디야 역삼"
+        tx.save()
+        self.assertFalse(self._search("스타벅스").exists())
+        self.assertTrue(self._search("이디야 역").exists())
+        tx.delete()
+        self.assertFalse(self._search("이디야 역").exists())
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, account=self.account, tx_type="OUT",
+                        amount=500, occurred_at="2026-01-11", merchant="편의점 GS25"),
+        ])
+        self.assertEqual([t.amount for t in self._search("GS25")], [500])
+
+    def test_ranked_results(self):
+        from django.db import connection
+        self._create(1000, memo="커피 커피 커피", merchant="커피빈")
+        self._create(2000, memo="점심 후 커피빈 들름")
+        ranked = list(self._search("커피빈", ranked=True))
+        self.assertEqual(len(ranked), 2)
+        if connection.vendor in ("sqlite", "postgresql"):
+            self.assertGreater(ranked[0].search_rank, 0)
+        self.assertGreaterEqual(ranked[0].search_rank, ranked[1].search_rank)
+
+    def test_short_query_and_list_view(self):
+        from django.db import connection
+        self._create(1000, memo="점심")
+        self._create(2000, memo="저녁")
+        self.assertEqual([t.amount for t in self._search("점심")], [1000])
+        # 2글자는 트라이그램 색인 대상이 아니다 — icontains 로 찾되 유저 인덱스로 범위를 좁힌다
+        sql = str(self._search("점심").query)
+        self.assertIn("LIKE", sql)
+        if connection.vendor == "sqlite":
+            plan = self._search("점심").explain()
+            self.assertIn("SEARCH transactions_transaction USING", plan)
+            self.assertNotIn("SCAN transactions_transaction", plan)
+        res = self.client.get("/transactions/?q=저녁 ")
+        self.assertContains(res, "2,000")
+        self.assertNotContains(res, "1,000")
+
+    def test_uses_fts_table_on_sqlite(self):
+        from django.db import connection
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite FTS5 전용")
+        from .search import FTS_TABLE
+        sql = str(self._search("스타벅스").query)
+        self.assertIn(FTS_TABLE, sql)
+        self.assertNotIn("LIKE", sql)
+        # 순위가 필요 없으면 MATCH 는 한 번만
+        self.assertEqual(sql.count("MATCH"), 1)
+        self.assertEqual(str(self._search("스타벅스", ranked=True).query).count("MATCH"), 2)
+
+
+class TransactionExportTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.other = User.objects.create_user(username="u2", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민", account_number="1234567890",
+        )
+        other_account = Account.objects.create(
+            user=self.other, name="월급통장", bank_name="신한", account_number="999",
+        )
+        self.cat = Category.objects.create(name="식비", cat_type="OUT")
+        Transaction.objects.create(
+            user=self.user, account=self.account, category=self.cat,
+            tx_type="OUT", amount=10000, occurred_at="2026-01-10", merchant="김밥, 천국",
+        )
+        Transaction.objects.create(
+            user=self.user, account=self.account,
+            tx_type="IN", amount=50000, occurred_at="2026-01-20", memo="용돈",
+        )
+        Transaction.objects.create(
+            user=self.other, account=other_account,
+            tx_type="IN", amount=70000, occurred_at="2026-01-15",
+        )
+
+    def _body(self, res):
+        return b"".join(res.streaming_content).decode("utf-8-sig")
+
+    def test_csv_export_streams_filtered_rows(self):
+        import csv
+        res = self.client.get("/transactions/export/?format=csv&tx_type=OUT")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        self.assertIn("attachment;", res["Content-Disposition"])
+        rows = list(csv.reader(self._body(res).splitlines()))
+        self.assertEqual(rows[0][:5], ["id", "occurred_at", "account", "tx_type", "amount"])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][1:8], [
+            "2026-01-10", "생활비", "OUT", "10000", "", "식비", "김밥, 천국",
+        ])
+
+    def test_jsonl_export_only_includes_own_transactions(self):
+        import json
+        res = self.client.get("/transactions/export/?format=jsonl")
+        records = [json.loads(line) for line in self._body(res).splitlines()]
+        self.assertEqual([r["amount"] for r in records], [50000, 10000])
+        self.assertEqual(records[0]["memo"], "용돈")
+        self.assertIsNone(records[0]["category"])
+
+    def test_unknown_format_is_rejected(self):
+        res = self.client.get("/transactions/export/?format=xlsx")
+        self.assertEqual(res.status_code, 400)
+
+    def test_export_command_user_and_all_modes(self):
+        import json
+        from django.core.management import call_command
+        out = StringIO()
+        call_command("export_transactions", "--user", "u1", "--format", "jsonl",
+                     "--date-from", "2026-01-15", "--chunk-size", "1", stdout=out)
+        self.assertEqual([json.loads(l)["amount"] for l in out.getvalue().splitlines()], [50000])
+
+        out = StringIO()
+        call_command("export_transactions", "--all", stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("user,id,"))
+        self.assertEqual([l.split(",")[0] for l in lines[1:]], ["u1", "u2", "u1"])
+
+
+class StatementImportTest(TestCase):
+    CSV = (
+        "거래일,구분,금액,가맹점,메모,카테고리\n"
+        "2026-01-05,입금,\"1,000,000\",회사,월급,\n"
+        "2026-01-03,출금,12000,김밥천국,점심,식비\n"
+        "2026.01.10,출금,4500,스타벅스,,식비\n"
+        "2026.01.10,출금,4500,스타벅스,,식비\n"
+        "20260111,출금,abc,오류,,\n"
+    )
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=100000,
+        )
+        self.cat = Category.objects.create(name="식비", cat_type="OUT")
+
+    def _import(self, text, fmt="csv", **kwargs):
+        from .importer import import_statement, parse_statement
+        return import_statement(self.account, parse_statement(StringIO(text), fmt), **kwargs)
+
+    def test_csv_import_keeps_running_balance(self):
+        from datetime import date
+        from .models import MonthlyRollup
+        result = self._import(self.CSV, chunk_size=2)
+        self.assertEqual((result.created, result.duplicates, result.invalid), (4, 0, 1))
+        self.assertIn("6행", result.errors[0])
+        rows = list(
+            Transaction.objects.filter(account=self.account)
+            .order_by("occurred_at", "pk")
+            .values_list("occurred_at", "tx_type", "amount", "balance_after", "category_id")
+        )
+        # 묶음(2행) 안에서는 거래일 순, 묶음 사이에서는 파일 순으로 잔액이 이어진다
+        self.assertEqual(rows, [
+            (date(2026, 1, 3), "OUT", 12000, 88000, self.cat.pk),
+            (date(2026, 1, 5), "IN", 1000000, 1088000, None),
+            (date(2026, 1, 10), "OUT", 4500, 1083500, self.cat.pk),
+            (date(2026, 1, 10), "OUT", 4500, 1079000, self.cat.pk),
+        ])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 1079000)
+        out_total = MonthlyRollup.objects.get(user=self.user, tx_type="OUT").total
+        self.assertEqual(out_total, 21000)
+
+    def test_reimport_skips_duplicates(self):
+        self._import(self.CSV)
+        # 기간이 겹치는 파일: 같은 날 같은 스타벅스 결제가 세 번째로 나온 행만 새 거래
+        result = self._import(self.CSV + "2026-01-10,출금,4500,스타벅스,,식비\n")
+        self.assertEqual((result.created, result.duplicates), (1, 4))
+        self.assertEqual(Transaction.objects.filter(merchant="스타벅스").count(), 3)
+
+    def test_ofx_import_and_constant_queries_per_chunk(self):
+        ofx = "OFXHEADER:100\n<OFX><BANKTRANLIST>\n" + "".join(
+            f"<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>202601{day:02d}120000"
+            f"<TRNAMT>-{day}000.00<NAME>가게 &amp; 카페<MEMO>메모{day}</STMTTRN>\n"
+            for day in range(1, 21)
+        ) + "</BANKTRANLIST></OFX>\n"
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            result = self._import(ofx, fmt="ofx", chunk_size=10)
+        self.assertEqual(result.created, 20)
+        # 행 수가 아니라 묶음 수(2)에 비례 — 묶음마다 잠금·중복 조회·INSERT·UPDATE·집계
+        inserts = [q for q in queries if 'INSERT INTO "transactions_transaction" (' in q["sql"]]
+        self.assertEqual(len(inserts), 2)
+        self.assertLessEqual(len(queries), 40)
+        tx = Transaction.objects.get(occurred_at="2026-01-02")
+        self.assertEqual((tx.tx_type, tx.amount, tx.merchant, tx.memo), ("OUT", 2000, "가게 & 카페", "메모2"))
+
+    def test_failure_after_backdated_chunk_leaves_committed_ledger_consistent(self):
+        from .importer import PartialImport, import_statement, parse_statement
+        from .reconcile import find_drift
+        text = (
+            "date,amount,merchant\n2026-02-01,-3000,가\n2026-02-02,-2000,나\n"
+            "2026-01-15,-1000,다\n2026-01-16,-500,라\n"
+        )
+
+        def rows():
+            yield from parse_statement(StringIO(text), "csv")
+            raise ValueError("파일이 잘렸습니다")
+
+        with self.assertRaises(PartialImport) as ctx:
+            import_statement(self.account, rows(), chunk_size=2)
+        self.assertEqual(ctx.exception.result.created, 4)
+        self.assertIn("4건을 저장한 뒤 중단되었습니다: 파일이 잘렸습니다", str(ctx.exception))
+        # 앞선 날짜로 들어간 두 번째 묶음이 커밋될 때 뒤쪽 balance_after 도 함께 고쳐졌다
+        self.assertEqual(
+            list(Transaction.objects.filter(account=self.account)
+                 .order_by("occurred_at").values_list("balance_after", flat=True)),
+            [99000, 98500, 95500, 93500],
+        )
+        self.assertEqual(find_drift(account_ids=[self.account.pk]).drifts, [])
+
+    def test_upload_view(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile("bank.csv", self.CSV.encode("cp949"))
+        res = self.client.post("/transactions/import/", {
+            "account": self.account.pk, "file": upload, "encoding": "cp949",
+        })
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "4건을 가져왔습니다")
+        self.assertContains(res, "읽을 수 없는 행 1건")
+
+        other = User.objects.create_user(username="u2", password="pass1234!")
+        other_account = Account.objects.create(
+            user=other, name="남의 계좌", bank_name="신한", account_number="999",
+        )
+        upload = SimpleUploadedFile("bank.csv", self.CSV.encode("utf-8"))
+        res = self.client.post("/transactions/import/", {
+            "account": other_account.pk, "file": upload, "encoding": "utf-8-sig",
+        })
+        self.assertFalse(Transaction.objects.filter(account=other_account).exists())
+
+    def test_import_command(self):
+        import os
+        import tempfile
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("date,amount,merchant\n2026-02-01,-3000,편의점\n2026-02-02,5000,환불\n")
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command("import_statement", f.name, account=self.account.pk, stdout=out)
+        self.assertIn("2건 추가, 0건 중복", out.getvalue())
+        call_command("import_statement", f.name, account=self.account.pk, stdout=out)
+        self.assertIn("0건 추가, 2건 중복", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("import_statement", f.name, account=self.account.pk, format="ofx",
+                         encoding="ascii", stdout=StringIO())
+
+
+class TransactionBatchCreateTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=100000,
+        )
+        self.card = Account.objects.create(
+            user=self.user, name="카드", bank_name="신한", account_number="111", balance=0,
+        )
+        self.cat = Category.objects.create(name="식비", cat_type="OUT")
+
+    def _post(self, rows):
+        import json
+        return self.client.post(
+            "/transactions/batch/", json.dumps({"transactions": rows}),
+            content_type="application/json",
+        )
+
+    def _rows(self, n, month=1):
+        return [
+            {"account": self.account.pk if i % 2 else self.card.pk, "category": self.cat.pk,
+             "tx_type": "OUT", "amount": 1000 * (i + 1), "occurred_at": f"2026-{month:02d}-{20 - i:02d}",
+             "merchant": f"가게{i}", "memo": ""}
+            for i in range(n)
+        ]
+
+    def test_json_batch_computes_balance_after_by_date(self):
+        res = self._post([
+            {"account": self.account.pk, "tx_type": "OUT", "amount": 3000, "occurred_at": "2026-01-20"},
+            {"account": self.account.pk, "tx_type": "IN", "amount": 50000, "occurred_at": "2026-01-05"},
+            {"account": self.card.pk, "category": self.cat.pk, "tx_type": "OUT",
+             "amount": 7000, "occurred_at": "2026-01-10", "merchant": "김밥천국"},
+        ])
+        self.assertEqual(res.status_code, 201)
+        data = res.json()
+        self.assertEqual(data["created"], 3)
+        # 입력 순서대로 응답, balance_after 는 계좌별 거래일 순
+        self.assertEqual([t["balance_after"] for t in data["transactions"]], [147000, 150000, -7000])
+        self.account.refresh_from_db()
+        self.card.refresh_from_db()
+        self.assertEqual((self.account.balance, self.card.balance), (147000, -7000))
+        self.assertEqual(Transaction.objects.get(merchant="김밥천국").category, self.cat)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from transactions.categories import all_categories
+        all_categories()  # 카테고리 레지스트리는 프로세스에 한 번 읽어 둔다
+        counts = []
+        # 두 번째 묶음은 다음 달 — 과거 날짜 재계산 없이 행 수만 다르게
+        for month, n in ((1, 2), (2, 20)):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self._post(self._rows(n, month)).status_code, 201)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_invalid_row_rejects_whole_batch(self):
+        other = User.objects.create_user(username="u2", password="pass1234!")
+        other_account = Account.objects.create(
+            user=other, name="남의 계좌", bank_name="신한", account_number="999",
+        )
+        rows = self._rows(2) + [
+            {"account": other_account.pk, "tx_type": "OUT", "amount": 1000, "occurred_at": "2026-01-01"},
+            {"account": self.account.pk, "tx_type": "OUT", "amount": 0, "occurred_at": "2026-13-01"},
+        ]
+        res = self._post(rows)
+        self.assertEqual(res.status_code, 400)
+        errors = res.json()["errors"]
+        self.assertEqual(errors[:2], [{}, {}])
+        self.assertIn("account", errors[2])
+        self.assertEqual(set(errors[3]), {"amount", "occurred_at"})
+        self.assertFalse(Transaction.objects.exists())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 100000)
+
+    def test_formset_post_and_method(self):
+        res = self.client.post("/transactions/batch/", {
+            "form-TOTAL_FORMS": "1", "form-INITIAL_FORMS": "0",
+            "form-0-account": self.account.pk, "form-0-tx_type": "IN",
+            "form-0-amount": "2500", "form-0-occurred_at": "2026-01-03",
+        })
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json()["transactions"][0]["balance_after"], 102500)
+        self.assertEqual(self.client.get("/transactions/batch/").status_code, 405)
+
+
+class BenchmarkTest(TestCase):
+    def test_run_size_and_compare(self):
+        from transactions import benchmark
+
+        run = benchmark.run_size(2, 1, repeat=2)
+        self.assertEqual(User.objects.filter(username__startswith="bench").count(), 2)
+        self.assertEqual(run["transactions"], run["created"])
+        self.assertEqual(
+            set(run["results"]), {"transaction_list", "dashboard", "inmoney", "process_recurring"},
+        )
+        for metrics in run["results"].values():
+            self.assertLessEqual(metrics["p50_ms"], metrics["p95_ms"])
+            self.assertGreater(metrics["queries"], 0)
+        # 같은 결과끼리 비교하면 변화율은 모두 0
+        rows = benchmark.compare({"runs": [run]}, {"runs": [run]})
+        self.assertEqual({change for *_, change in rows if change is not None}, {0.0})
+        self.assertEqual(benchmark.percentile([5, 1, 4, 2, 3], 50), 3)
+
+
+class GenerateDummyDataTest(TestCase):
+    def _generate(self, **options):
+        from django.core.management import call_command
+        out = StringIO()
+        call_command("generate_dummy_data", stdout=out, **options)
+        return out.getvalue()
+
+    def test_multi_user_ledger_is_consistent_and_reproducible(self):
+        from transactions.models import MonthlyRollup
+        from transactions.reconcile import find_drift
+
+        out = self._generate(users=2, start="2025-11", months=3, seed=7, batch_size=50)
+        self.assertEqual(User.objects.filter(username__startswith="dummy").count(), 2)
+        self.assertEqual(Account.objects.count(), 6)
+        self.assertIn(f"총 {Transaction.objects.count():,}건", out)
+        # balance_after 는 거래일 순으로 매겨져 원장과 맞는다
+        self.assertEqual(find_drift().drifts, [])
+        # 합계는 월별 집계와 같다 (이체 제외)
+        income = sum(
+            r.total for r in MonthlyRollup.objects.filter(tx_type="IN").exclude(category__name="이체")
+        )
+        self.assertIn(f"총 수입 (이체 제외): {income:,}원", out)
+
+        first = list(Transaction.objects.order_by("user_id", "occurred_at", "id")
+                     .values_list("occurred_at", "amount", "balance_after"))
+        # 같은 seed 로 다시 만들면 기존 데이터를 지우고 같은 거래를 만든다
+        self._generate(users=2, start="2025-11", months=3, seed=7)
+        again = list(Transaction.objects.order_by("user_id", "occurred_at", "id")
+                     .values_list("occurred_at", "amount", "balance_after"))
+        self.assertEqual(first, again)
+        self.assertEqual(Account.objects.count(), 6)
+
+    def test_default_user_required(self):
+        from django.core.management import call_command
+        err = StringIO()
+        call_command("generate_dummy_data", stdout=StringIO(), stderr=err)
+        self.assertIn("fkc256", err.getvalue())
+
+
+
+class ParallelJobsTest(TestCase):
+    def test_runs_in_process_without_concurrent_writes(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest import mock
+        from . import parallel
+
+        jobs = [(7, 2), (9, 4), (5, 5)]
+        with mock.patch.object(parallel, "concurrent_writes", return_value=False), \
+                mock.patch.object(parallel, "ProcessPoolExecutor") as pool:
+            self.assertEqual(parallel.run_jobs(divmod, jobs, 3, Transaction), [(3, 1), (2, 1), (1, 0)])
+        pool.assert_not_called()
+
+        # 동시 쓰기를 받는 DB 면 풀에 넘기고, 결과는 jobs 순서 그대로
+        with mock.patch.object(parallel, "concurrent_writes", return_value=True), \
+                mock.patch.object(parallel, "ProcessPoolExecutor", ThreadPoolExecutor), \
+                mock.patch.object(parallel, "connections") as connections:
+            self.assertEqual(parallel.run_jobs(divmod, jobs, 3, Transaction), [(3, 1), (2, 1), (1, 0)])
+        # 부모는 풀을 만들기 전에, 작업마다 끝난 뒤에 연결을 닫는다
+        self.assertEqual(connections.close_all.call_count, 1 + len(jobs))
+
+class CategoryRegistryTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        self.account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=100000,
+        )
+        self.food = Category.objects.create(name="식비", cat_type="OUT", is_satisfaction=True)
+        self.salary = Category.objects.create(name="월급", cat_type="IN")
+
+    def test_forms_read_categories_without_queries(self):
+        from transactions.categories import all_categories
+        from transactions.forms import RecurringTransactionForm, TransactionForm
+
+        self.assertEqual(
+            [c.pk for c in all_categories()], list(Category.objects.order_by("pk").values_list("pk", flat=True)),
+        )
+        with self.assertNumQueries(0):
+            html = str(TransactionForm()["category"]) + str(RecurringTransactionForm()["category"])
+            cleaned = TransactionForm().fields["category"].clean(str(self.food.pk))
+        self.assertIn("식비 (지출)", html)
+        self.assertEqual(cleaned, self.food)
+        self.assertIn("category", TransactionForm(data={"category": 999}).errors)
+
+        res = self.client.post("/transactions/new/", {
+            "account": self.account.pk, "category": self.salary.pk, "tx_type": "IN",
+            "amount": 5000, "occurred_at": "2026-01-05",
+        })
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(Transaction.objects.get().category, self.salary)
+        # 목록은 카테고리를 JOIN 하지 않고 레지스트리로 채운다
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get("/transactions/")
+        self.assertContains(res, "월급 (수입)")
+        self.assertFalse(any("transactions_category" in q["sql"] for q in ctx.captured_queries))
+
+    def test_signals_and_version_stamp_refresh_registry(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from transactions import categories
+
+        self.assertIn(self.food.pk, categories.satisfaction_ids())
+        self.assertNotIn(self.salary.pk, categories.satisfaction_ids())
+        self.salary.is_satisfaction = True
+        self.salary.save()
+        self.assertIn(self.salary.pk, categories.satisfaction_ids())
+        self.food.delete()
+        self.assertIsNone(categories.get_category(self.food.pk))
+
+        # 다른 프로세스의 변경: 시그널은 오지 않고 공유 캐시의 스탬프만 바뀐다
+        Category.objects.filter(pk=self.salary.pk).update(name="급여")
+        self.assertEqual(categories.get_category(self.salary.pk).name, "월급")
+        cache.set(categories.CATEGORY_VERSION_KEY, "other-process")
+        with mock.patch.object(categories, "VERSION_CHECK_INTERVAL", 0):
+            self.assertEqual(categories.get_category(self.salary.pk).name, "급여")
+
+    def test_rolled_back_category_never_reaches_registry(self):
+        from django.db import transaction
+        from transactions import categories
+        from transactions.forms import TransactionForm
+
+        class Rollback(Exception):
+            pass
+
+        with self.assertRaises(Rollback), transaction.atomic():
+            temp = Category.objects.create(name="임시", cat_type="OUT")
+            # 같은 트랜잭션 안에서는 보인다
+            self.assertEqual(categories.get_category(temp.pk).name, "임시")
+            raise Rollback
+        self.assertIsNone(categories.get_category(temp.pk))
+        self.assertIn("category", TransactionForm(data={"category": temp.pk}).errors)
+
+        kept = Category.objects.create(name="교통", cat_type="OUT")
+        self.assertEqual(categories.get_category(kept.pk).name, "교통")
+
+
+class ReceiptStorageTest(TestCase):
+    RECEIPT = b"\xff\xd8\xff\xe0receipt-bytes"
+    OTHER = b"\xff\xd8\xff\xe0other-bytes"
+
+    def setUp(self):
+        import shutil
+        import tempfile
+        from django.test import override_settings
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=100000,
+        )
+        self.txs = [
+            Transaction.objects.create(
+                user=self.user, account=account, tx_type="OUT", amount=1000, occurred_at="2026-01-05",
+            )
+            for _ in range(3)
+        ]
+
+    def _upload(self, tx, content, name="receipt.jpg"):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .models import Attachment
+        res = self.client.post(f"/transactions/{tx.pk}/attachment/upload/", {
+            "file": SimpleUploadedFile(name, content, content_type="image/jpeg"),
+        })
+        self.assertEqual(res.status_code, 302)
+        return Attachment.objects.get(transaction=tx)
+
+    def test_identical_uploads_share_one_sharded_blob(self):
+        import hashlib
+        from .models import ReceiptBlob
+        first = self._upload(self.txs[0], self.RECEIPT, "a.jpg")
+        second = self._upload(self.txs[1], self.RECEIPT, "b.jpg")
+        other = self._upload(self.txs[2], self.OTHER)
+
+        digest = hashlib.sha256(self.RECEIPT).hexdigest()
+        self.assertEqual(first.file.name, f"receipts/{digest[:2]}/{digest[2:4]}/{digest}")
+        self.assertEqual((first.file.name, first.blob_id), (second.file.name, second.blob_id))
+        self.assertEqual((first.original_name, second.original_name), ("a.jpg", "b.jpg"))
+        self.assertNotEqual(first.blob_id, other.blob_id)
+        self.assertEqual(ReceiptBlob.objects.get(pk=digest).size, len(self.RECEIPT))
+        with first.file.open("rb") as f:
+            self.assertEqual(f.read(), self.RECEIPT)
+
+    def test_blob_insert_tolerates_concurrent_upload_and_release(self):
+        import hashlib
+        from unittest import mock
+        from .models import ReceiptBlob
+        digest = hashlib.sha256(self.RECEIPT).hexdigest()
+        # 다른 요청이 같은 내용의 행을 먼저 넣었다 — INSERT 가 부딪쳐도 IntegrityError 없이 그 행을 쓴다
+        ReceiptBlob.objects.create(sha256=digest, size=len(self.RECEIPT))
+        real_bulk_create = ReceiptBlob.objects.bulk_create
+        calls = []
+
+        def racing_bulk_create(objs, **kwargs):
+            created = real_bulk_create(objs, **kwargs)
+            if not calls:
+                # INSERT 와 잠금 사이에 release() 가 마지막 참조를 지우며 행을 삭제했다
+                ReceiptBlob.objects.filter(pk=digest).delete()
+            calls.append(kwargs)
+            return created
+
+        with mock.patch.object(ReceiptBlob.objects, "bulk_create", side_effect=racing_bulk_create):
+            attachment = self._upload(self.txs[0], self.RECEIPT)
+        self.assertEqual(calls, [{"ignore_conflicts": True}] * 2)
+        self.assertEqual(attachment.blob_id, digest)
+        self.assertTrue(ReceiptBlob.objects.filter(pk=digest).exists())
+
+    def test_blob_removed_with_last_reference(self):
+        import os
+        from django.conf import settings
+        from .models import ReceiptBlob
+        first = self._upload(self.txs[0], self.RECEIPT)
+        self._upload(self.txs[1], self.RECEIPT)
+        path = first.file.path
+
+        # 영수증만 삭제 → 다른 거래가 같은 파일을 쓰므로 남는다
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/transactions/{self.txs[0].pk}/attachment/delete/")
+        self.assertTrue(os.path.exists(path))
+        # 거래 삭제(CASCADE) → 마지막 참조이므로 blob 삭제, 커밋 뒤 파일 삭제
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/transactions/{self.txs[1].pk}/delete/")
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(ReceiptBlob.objects.exists())
+        # 임시 파일도 남지 않는다
+        receipts_dir = os.path.join(settings.MEDIA_ROOT, "receipts")
+        self.assertEqual([f for _, _, files in os.walk(receipts_dir) for f in files], [])
+
+    def test_rolled_back_delete_keeps_file(self):
+        import os
+        from django.db import transaction
+        from .models import Attachment, ReceiptBlob
+        attachment = self._upload(self.txs[0], self.RECEIPT)
+        path = attachment.file.path
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.txs[0].delete()
+                raise RuntimeError("롤백")
+        self.assertEqual(callbacks, [])
+        self.assertTrue(Attachment.objects.filter(pk=attachment.pk).exists())
+        self.assertTrue(ReceiptBlob.objects.filter(pk=attachment.blob_id).exists())
+        self.assertTrue(os.path.exists(path))
+
+    def test_bad_uploads_rejected_while_streaming(self):
+        import os
+        from django.conf import settings
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .models import Attachment
+        url = f"/transactions/{self.txs[0].pk}/attachment/upload/"
+        cases = [
+            ("fake.jpg", b"%PDF-1.7 not a jpeg", "파일 내용이 확장자와 맞지 않습니다."),
+            ("big.pdf", b"%PDF-" + b"0" * (5 * 1024 * 1024), "5MB 이하"),
+            ("note.txt", b"hello", "허용되지 않는 파일 형식"),
+        ]
+        for name, content, message in cases:
+            res = self.client.post(url, {"file": SimpleUploadedFile(name, content)})
+            self.assertEqual(res.status_code, 200, name)
+            self.assertContains(res, message)
+        self.assertFalse(Attachment.objects.exists())
+        receipts_dir = os.path.join(settings.MEDIA_ROOT, "receipts")
+        self.assertEqual([f for _, _, files in os.walk(receipts_dir) for f in files], [])
+
+    def test_handler_stops_at_first_bad_chunk(self):
+        from django.core.files.uploadhandler import StopFutureHandlers, StopUpload
+        from .uploads import ReceiptUploadHandler
+        handler = ReceiptUploadHandler()
+        handler.handle_raw_input(None, {}, 10 * 1024 * 1024, b"boundary")
+        # 선언된 본문 크기만으로 파일 내용을 받기 전에 멈춘다
+        with self.assertRaises(StopUpload):
+            handler.new_file("file", "big.png", "image/png", None)
+        self.assertIn("5MB", handler.error)
+
+        handler = ReceiptUploadHandler()
+        handler.handle_raw_input(None, {}, 1024, b"boundary")
+        with self.assertRaises(StopFutureHandlers):
+            handler.new_file("file", "a.png", "image/png", None)
+        with self.assertRaises(StopUpload):
+            handler.receive_data_chunk(b"GIF89a" + b"0" * 100, 0)
+        self.assertIsNone(handler.writer)
+
+    def test_upload_still_checks_csrf(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        res = client.post(f"/transactions/{self.txs[0].pk}/attachment/upload/", {
+            "file": SimpleUploadedFile("a.jpg", self.RECEIPT),
+        })
+        self.assertEqual(res.status_code, 403)
+
+
+
+class ReceiptDownloadTest(TestCase):
+    CONTENT = b"%PDF-1.7 receipt-content"
+
+    def setUp(self):
+        import shutil
+        import tempfile
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings
+        from . import receipts
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media, RECEIPT_SENDFILE="")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username="u1", password="pass1234!")
+        self.client.login(username="u1", password="pass1234!")
+        account = Account.objects.create(
+            user=self.user, name="생활비", bank_name="국민",
+            account_number="1234567890", balance=100000,
+        )
+        self.tx = Transaction.objects.create(
+            user=self.user, account=account, tx_type="OUT", amount=1000, occurred_at="2026-01-05",
+        )
+        self.attachment = receipts.store(self.tx, SimpleUploadedFile("영수증.pdf", self.CONTENT))
+        self.url = f"/transactions/{self.tx.pk}/attachment/"
+
+    def test_owner_only_with_validators(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), self.CONTENT)
+        self.assertEqual(res["ETag"], f'"{self.attachment.blob_id}"')
+        self.assertIn("Last-Modified", res)
+        self.assertEqual(res["Content-Type"], "application/pdf")
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertIn("inline", res["Content-Disposition"])
+        self.assertIn("private", res["Cache-Control"])
+        # 상세 페이지는 MEDIA_URL 이 아니라 이 뷰로 연결
+        self.assertContains(self.client.get(f"/transactions/{self.tx.pk}/"), f'href="{self.url}"')
+
+        other = Client()
+        User.objects.create_user(username="u2", password="pass1234!")
+        other.login(username="u2", password="pass1234!")
+        self.assertEqual(other.get(self.url).status_code, 404)
+        self.assertEqual(Client().get(self.url).status_code, 302)
+
+    def test_conditional_requests(self):
+        first = self.client.get(self.url)
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["ETag"], first["ETag"])
+        res = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MATCH='"other"').status_code, 412)
+
+    def test_range_requests(self):
+        size = len(self.CONTENT)
+        res = self.client.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b"".join(res.streaming_content), self.CONTENT[2:6])
+        self.assertEqual(res["Content-Range"], f"bytes 2-5/{size}")
+        self.assertEqual(res["Content-Length"], "4")
+
+        res = self.client.get(self.url, HTTP_RANGE="bytes=-7")
+        self.assertEqual(b"".join(res.streaming_content), self.CONTENT[-7:])
+
+        res = self.client.get(self.url, HTTP_RANGE=f"bytes={size}-")
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{size}")
+
+        # 여러 구간이나 If-Range 가 맞지 않으면 전체
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=0-1,4-5").status_code, 200)
+        res = self.client.get(self.url, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(res.status_code, 200)
+        res = self.client.get(self.url, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=res["ETag"])
+        self.assertEqual(res.status_code, 206)
+
+    def test_sendfile_offload(self):
+        from django.test import override_settings
+        with override_settings(RECEIPT_SENDFILE="x-accel-redirect"):
+            res = self.client.get(self.url, HTTP_RANGE="bytes=0-1")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["X-Accel-Redirect"], "/protected-media/" + self.attachment.file.name)
+        self.assertEqual(res["ETag"], f'"{self.attachment.blob_id}"')
+        self.assertEqual(res["Content-Type"], "application/pdf")
+
+        with override_settings(RECEIPT_SENDFILE="x-sendfile"):
+            res = self.client.get(self.url)
+        self.assertEqual(res["X-Sendfile"], self.attachment.file.path)
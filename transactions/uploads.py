@@ -0,0 +1,118 @@
+"""영수증 업로드 핸들러 — 본문을 받는 중에 검사하고 해시한다.
+
+기본 업로드 핸들러는 파일을 끝까지 메모리나 임시 파일에 받은 뒤에야 AttachmentForm 이
+크기·형식을 검사한다. attachment_upload 뷰는 ReceiptUploadHandler 를 맨 앞에 끼워
+청크가 도착하는 대로 검사하고, 어긋나면 그 자리에서 업로드를 멈춘다.
+
+  - 확장자가 ALLOWED_EXTENSIONS 가 아니면          → 파일 내용을 받기 전에
+  - 요청 Content-Length 가 한도보다 분명히 크면      → 파일 내용을 받기 전에
+  - 받은 바이트가 MAX_FILE_SIZE 를 넘으면           → 넘는 청크에서
+  - 앞부분이 확장자의 매직 바이트(FILE_SIGNATURES)와 다르면 → 첫 청크에서
+
+멈출 때는 StopUpload(connection_reset=True) 로 남은 본문을 읽지 않고 handler.error 에
+이유를 남긴다 (뷰가 폼 오류로 보여 줌). 파일보다 앞에 오는 필드(csrfmiddlewaretoken)는
+이미 읽었으므로 CSRF 검사는 그대로 된다.
+
+통과한 내용은 ContentAddressedStorage.open_blob() 의 임시 파일에 쓰면서 SHA-256 을 재므로
+receipts.store() 는 파일을 다시 읽지 않고 최종 위치로 옮기기만 한다.
+"""
+
+import os
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+
+from .forms import (
+    ALLOWED_EXTENSIONS, MAX_FILE_SIZE, SIGNATURE_LENGTH,
+    RECEIPT_EXTENSION_ERROR, RECEIPT_SIGNATURE_ERROR, RECEIPT_SIZE_ERROR,
+    signature_matches,
+)
+from .models import Attachment
+
+# 요청 본문 중 파일이 아닌 부분(경계 문자열·파트 헤더·CSRF 토큰)의 여유분
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class StagedUploadedFile(UploadedFile):
+    """핸들러가 임시 파일에 받아 해시까지 마친 영수증.
+
+    staged(StagedBlob)를 그대로 receipts.store() 에 넘긴다. 요청이 끝나 닫힐 때
+    최종 위치로 옮기지 않은 임시 파일은 지운다.
+    """
+
+    def __init__(self, staged, name, content_type, charset, content_type_extra):
+        super().__init__(
+            open(staged.temp_path, "rb"), name, content_type, staged.size,
+            charset, content_type_extra,
+        )
+        self.staged = staged
+
+    def temporary_file_path(self):
+        return self.staged.temp_path
+
+    def close(self):
+        try:
+            return self.file.close()
+        finally:
+            self.staged.discard()
+
+
+class ReceiptUploadHandler(FileUploadHandler):
+    """영수증 파일을 받으면서 크기·확장자·매직 바이트를 검사하고 SHA-256 을 잰다."""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.error = None
+        self.request_length = None
+        self.writer = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.request_length = content_length
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.extension = os.path.splitext(file_name)[1].lower()
+        if self.extension not in ALLOWED_EXTENSIONS:
+            self._reject(RECEIPT_EXTENSION_ERROR)
+        if self.request_length and self.request_length > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+            self._reject(RECEIPT_SIZE_ERROR)
+        self.head = b""
+        self.writer = Attachment._meta.get_field("file").storage.open_blob()
+        # 기본 핸들러(메모리·임시 파일)는 이 파일을 받지 않는다
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > MAX_FILE_SIZE:
+            self._reject(RECEIPT_SIZE_ERROR)
+        if len(self.head) < SIGNATURE_LENGTH:
+            self.head += raw_data[:SIGNATURE_LENGTH - len(self.head)]
+            if len(self.head) == SIGNATURE_LENGTH:
+                self._check_signature()
+        self.writer.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        # SIGNATURE_LENGTH 보다 짧은 파일은 여기서 검사
+        self._check_signature()
+        staged = self.writer.finish()
+        self.writer = None
+        return StagedUploadedFile(
+            staged, self.file_name, self.content_type, self.charset, self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        self._abort()
+
+    def _check_signature(self):
+        if not signature_matches(self.extension, self.head):
+            self._reject(RECEIPT_SIGNATURE_ERROR)
+
+    def _abort(self):
+        if self.writer is not None:
+            self.writer.abort()
+            self.writer = None
+
+    def _reject(self, message):
+        self.error = message
+        self._abort()
+        raise StopUpload(connection_reset=True)
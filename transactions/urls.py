@@ -13,12 +13,16 @@ urlpatterns = [
 
     # Transaction CRUD
     path("", views.transaction_list, name="transaction_list"),
+    path("export/", views.transaction_export, name="transaction_export"),
+    path("import/", views.statement_import, name="statement_import"),
     path("new/", views.transaction_create, name="transaction_create"),
+    path("batch/", views.transaction_batch_create, name="transaction_batch_create"),
     path("<int:pk>/", views.transaction_detail, name="transaction_detail"),
     path("<int:pk>/edit/", views.transaction_update, name="transaction_update"),
     path("<int:pk>/delete/", views.transaction_delete, name="transaction_delete"),
 
     # Attachment
+    path("<int:tx_pk>/attachment/", views.attachment_download, name="attachment_download"),
     path("<int:tx_pk>/attachment/upload/", views.attachment_upload, name="attachment_upload"),
     path("<int:tx_pk>/attachment/delete/", views.attachment_delete, name="attachment_delete"),
 
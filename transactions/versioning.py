@@ -0,0 +1,69 @@
+"""유저 데이터 버전 스탬프 — 파생 데이터 캐시(InMoney 지표 등) 무효화용.
+
+유저의 거래·계좌·정기 거래·목표가 바뀔 때마다 그 유저의 스탬프를 새 값으로 바꾼다.
+캐시는 계산 당시의 스탬프와 함께 저장되고, 읽을 때 스탬프가 다르면 버린다.
+카테고리처럼 모든 유저의 지표에 영향을 주는 데이터는 전역 스탬프를 바꾼다.
+
+  - save()/delete() 를 거치는 경로(뷰, 관리자 페이지, goal_update_view)는 signals.py 가
+  - bulk_create / QuerySet.update() 경로(process_recurring 등)는 호출한 쪽이 직접
+    bump_data_version() 을 부른다.
+
+스탬프는 증가 카운터가 아닌 임의 문자열이라 incr 를 원자적으로 지원하지 않는
+캐시(파일 캐시 등)에서도 동작한다. 값이 사라져도(캐시 비움, 만료) 새 스탬프가
+만들어지므로 이전 캐시는 자동으로 무효가 된다.
+"""
+
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+GLOBAL_VERSION_KEY = "userdata:version:global"
+
+
+def data_version_key(user_id):
+    return f"userdata:version:{user_id}"
+
+
+def version_keys(user_id):
+    """user_id 의 데이터에 딸린 스탬프 키 (유저, 전역)."""
+    return data_version_key(user_id), GLOBAL_VERSION_KEY
+
+
+def current_versions(user_id, found=None):
+    """(유저 스탬프, 전역 스탬프). 없는 스탬프는 새로 만든다.
+
+    found 에 cache.get_many() 결과를 넘기면 그 안에 있는 값은 다시 조회하지 않는다.
+    """
+    found = found or {}
+    versions = []
+    for key in version_keys(user_id):
+        value = found.get(key)
+        if value is None:
+            cache.add(key, uuid4().hex, None)
+            value = cache.get(key)
+        versions.append(value)
+    return tuple(versions)
+
+
+def _bump(keys):
+    cache.set_many({key: uuid4().hex for key in keys}, None)
+
+
+def bump_data_version(*user_ids):
+    """유저들의 데이터가 바뀌었음을 기록한다.
+
+    지금 바로 한 번, 그리고 DB 커밋 직후 한 번 더 바꾼다. 커밋 전에 다른 요청이
+    이전 데이터로 계산한 값을 새 스탬프로 저장하는 경우를 막기 위함이다.
+    """
+    keys = [data_version_key(user_id) for user_id in set(user_ids) if user_id]
+    if not keys:
+        return
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def bump_global_version():
+    """모든 유저의 파생 데이터를 무효화한다 (카테고리 변경 등)."""
+    _bump([GLOBAL_VERSION_KEY])
+    transaction.on_commit(lambda: _bump([GLOBAL_VERSION_KEY]))
@@ -1,62 +1,88 @@
 """transactions 앱 뷰 — 계좌·거래·영수증·정기거래 CRUD.
 
 잔액 관리 정책:
-  - 거래 생성 시 _apply_balance() 로 계좌 잔액을 원자적으로 갱신
-  - 거래 수정 시 기존 거래를 _reverse_balance() 로 되돌린 뒤 새 거래를 적용
-  - 거래 삭제 시 _reverse_balance() 로 잔액 복구
+  - 거래 생성·수정·삭제는 ledger.record() / revise() / remove() 가 계좌를
+    select_for_update 로 잠근 트랜잭션 안에서 잔액을 갱신하고, 영향받는 뒤쪽 거래의
+    balance_after 를 다시 계산 (ledger.py)
   - 출금 시 잔액 부족이면 경고를 표시하되, 사용자가 confirm 하면 음수 잔액 허용
+  - 시그널이 갱신하는 월별 집계(MonthlyRollup)도 같은 트랜잭션에서 커밋·롤백된다
+  - 은행 내역 가져오기(statement_import)는 묶음마다 계좌 잔액을 한 번에 갱신 (importer.py)
+  - 일괄 입력 API(transaction_batch_create)는 N 건을 계좌별 UPDATE 한 번으로 반영 (batch.py)
 """
 
+import io
+import json
+
 from django.contrib.auth.decorators import login_required
-from django.db.models import F, Q
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils.timezone import localdate
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_POST, require_safe
 from .models import Account, Transaction, Attachment, RecurringTransaction
-from .forms import AccountForm, TransactionForm, AttachmentForm, RecurringTransactionForm
+from .forms import (
+    AccountForm, TransactionForm, AttachmentForm, RecurringTransactionForm,
+    StatementImportForm, BatchTransactionFormSet,
+)
+from . import batch, categories, export, importer, ledger, receipts, serving
+from .dates import month_range
+from .pagination import keyset_paginate
+from .querysets import filter_transactions
+from .uploads import ReceiptUploadHandler
 
 
 # ──────────────────────────────────
-# 잔액 계산 헬퍼
+# Account CRUD
 # ──────────────────────────────────
 
-def _apply_balance(account_id, tx_type, amount):
-    """거래 적용: 입금이면 +, 출금이면 -"""
-    if tx_type == "IN":
-        Account.objects.filter(pk=account_id).update(balance=F("balance") + amount)
-    else:
-        Account.objects.filter(pk=account_id).update(balance=F("balance") - amount)
-
-
-def _reverse_balance(account_id, tx_type, amount):
-    """거래 되돌림: 입금이었으면 -, 출금이었으면 +"""
-    if tx_type == "IN":
-        Account.objects.filter(pk=account_id).update(balance=F("balance") - amount)
-    else:
-        Account.objects.filter(pk=account_id).update(balance=F("balance") + amount)
+def _with_activity(accounts, today):
+    """계좌마다 거래 수·마지막 거래일·이번 달 입금/출금 합계를 붙인다 (쿼리 1번).
+
+    모두 계좌별 상관 서브쿼리라 tx_account_date_idx (account, -occurred_at, -id) 로
+    그 계좌의 범위만 읽는다. 거래 수는 인덱스만으로 세고, 마지막 거래일은 인덱스의
+    첫 항목, 입출금 합계는 이번 달 구간의 거래만 읽는다.
+    """
+    start, end = month_range(today.year, today.month)
+    txs = Transaction.objects.filter(account=OuterRef("pk")).order_by().values("account")
+    this_month = txs.filter(occurred_at__gte=start, occurred_at__lt=end)
+
+    def scalar(qs, aggregate):
+        return Coalesce(Subquery(qs.annotate(value=aggregate).values("value")), 0)
+
+    return accounts.annotate(
+        tx_count=scalar(txs, Count("pk")),
+        last_tx_date=Subquery(
+            Transaction.objects.filter(account=OuterRef("pk"))
+            .order_by("-occurred_at", "-pk").values("occurred_at")[:1]
+        ),
+        month_income=scalar(this_month.filter(tx_type=Transaction.IN), Sum("amount")),
+        month_expense=scalar(this_month.filter(tx_type=Transaction.OUT), Sum("amount")),
+    )
 
 
-# ──────────────────────────────────
-# Account CRUD
-# ──────────────────────────────────
-
 @login_required
 def account_list(request):
-    """로그인 유저의 전체 계좌 목록."""
-    accounts = Account.objects.filter(user=request.user)
+    """로그인 유저의 전체 계좌 목록 + 계좌별 거래 수·마지막 거래일·이번 달 입출금."""
+    accounts = _with_activity(Account.objects.filter(user=request.user), localdate())
     return render(request, "transactions/account_list.html", {"accounts": accounts})
 
 
 @login_required
 def account_detail(request, pk):
-    """계좌 상세 — 해당 계좌의 거래 내역을 최신순으로 표시."""
+    """계좌 상세 — 해당 계좌의 거래 내역을 최신순으로 키셋 페이지 단위 표시."""
     account = get_object_or_404(Account, pk=pk, user=request.user)
-    transactions = (
-        Transaction.objects.filter(account=account, user=request.user)
-        .select_related("category")
-        .order_by("-occurred_at", "-pk")
+    page = keyset_paginate(
+        Transaction.objects.filter(account=account, user=request.user),
+        request.GET,
     )
+    categories.attach(page)
     return render(request, "transactions/account_detail.html", {
         "account": account,
-        "transactions": transactions,
+        "transactions": page,
+        "page": page,
     })
 
 
@@ -77,12 +103,12 @@ def account_create(request):
 
 @login_required
 def account_update(request, pk):
-    """계좌 정보 수정."""
+    """계좌 정보 수정. 잔액을 직접 고치면 원장(개설 잔액·balance_after)도 함께 옮긴다."""
     account = get_object_or_404(Account, pk=pk, user=request.user)
     if request.method == "POST":
         form = AccountForm(request.POST, instance=account)
         if form.is_valid():
-            form.save()
+            ledger.save_account(form.save(commit=False))
             return redirect("account_detail", pk=account.pk)
     else:
         form = AccountForm(instance=account)
@@ -94,7 +120,8 @@ def account_delete(request, pk):
     """계좌 삭제 확인 → POST 시 삭제 (CASCADE 로 하위 거래도 함께 삭제)."""
     account = get_object_or_404(Account, pk=pk, user=request.user)
     if request.method == "POST":
-        account.delete()
+        with transaction.atomic():
+            account.delete()
         return redirect("account_list")
     return render(request, "transactions/account_confirm_delete.html", {"account": account})
 
@@ -105,50 +132,70 @@ def account_delete(request, pk):
 
 @login_required
 def transaction_list(request):
-    """거래 내역 목록. 계좌·카테고리·입출금·기간·키워드 필터를 지원."""
-    qs = Transaction.objects.filter(user=request.user).select_related("account", "category")
-
-    # 계좌 필터
-    account_id = request.GET.get("account")
-    if account_id:
-        qs = qs.filter(account_id=account_id)
-
-    # 카테고리 필터
-    category_id = request.GET.get("category")
-    if category_id:
-        qs = qs.filter(category_id=category_id)
-
-    # 입출금 필터
-    tx_type = request.GET.get("tx_type")
-    if tx_type in ("IN", "OUT"):
-        qs = qs.filter(tx_type=tx_type)
-
-    # 기간 필터
-    date_from = request.GET.get("date_from")
-    date_to = request.GET.get("date_to")
-    if date_from:
-        qs = qs.filter(occurred_at__gte=date_from)
-    if date_to:
-        qs = qs.filter(occurred_at__lte=date_to)
-
-    # 키워드 검색 (메모 + 가맹점)
-    q = request.GET.get("q", "").strip()
-    if q:
-        qs = qs.filter(Q(memo__icontains=q) | Q(merchant__icontains=q))
+    """거래 내역 목록. 계좌·카테고리·입출금·기간·키워드 필터 + 키셋 페이지네이션."""
+    qs = filter_transactions(
+        Transaction.objects.filter(user=request.user).select_related("account"),
+        request.GET,
+    )
+    page = keyset_paginate(qs, request.GET)
+    categories.attach(page)
 
     accounts = Account.objects.filter(user=request.user, is_active=True)
 
-    from .models import Category
-    categories = Category.objects.all()
-
     return render(request, "transactions/transaction_list.html", {
-        "transactions": qs,
+        "transactions": page,
+        "page": page,
         "accounts": accounts,
-        "categories": categories,
+        "categories": categories.all_categories(),
         "params": request.GET,
     })
 
 
+@login_required
+def transaction_export(request):
+    """거래 내역 다운로드 (?format=csv|jsonl) — 목록과 같은 필터를 적용해 스트리밍."""
+    fmt = request.GET.get("format", "csv")
+    if fmt not in export.FORMATS:
+        return HttpResponseBadRequest("지원하지 않는 형식입니다.")
+    qs = filter_transactions(Transaction.objects.filter(user=request.user), request.GET)
+    lines = export.stream_lines(export.export_rows(qs), fmt)
+    if fmt == "csv":
+        # 엑셀에서 한글이 깨지지 않도록 BOM 을 붙인다
+        lines = _prepend("\ufeff", lines)
+    response = StreamingHttpResponse(lines, content_type=export.FORMATS[fmt])
+    filename = f"transactions-{localdate():%Y%m%d}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _prepend(first, lines):
+    yield first
+    yield from lines
+
+
+@login_required
+def statement_import(request):
+    """은행 거래 내역 파일(CSV/OFX)을 한 계좌의 거래로 가져온다."""
+    result = None
+    if request.method == "POST":
+        form = StatementImportForm(request.POST, request.FILES, user=request.user)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            lines = io.TextIOWrapper(upload.file, encoding=form.cleaned_data["encoding"], newline="")
+            rows = importer.parse_statement(lines, importer.detect_format(upload.name))
+            try:
+                result = importer.import_statement(form.cleaned_data["account"], rows)
+            except importer.PartialImport as e:
+                form.add_error("file", str(e))
+            except UnicodeDecodeError:
+                form.add_error("encoding", "파일을 읽을 수 없습니다. 인코딩을 확인해주세요.")
+            except ValueError as e:
+                form.add_error("file", str(e))
+    else:
+        form = StatementImportForm(user=request.user)
+    return render(request, "transactions/statement_import.html", {"form": form, "result": result})
+
+
 @login_required
 def transaction_detail(request, pk):
     """거래 상세 — 첨부 영수증이 있으면 함께 표시."""
@@ -187,11 +234,7 @@ def transaction_create(request):
                         "balance_warning": balance_warning,
                     })
 
-            # 잔액 업데이트
-            _apply_balance(account.pk, tx.tx_type, tx.amount)
-            account.refresh_from_db()
-            tx.balance_after = account.balance
-            tx.save()
+            ledger.record(tx)
             return redirect("transaction_list")
     else:
         form = TransactionForm(user=request.user)
@@ -201,13 +244,52 @@ def transaction_create(request):
     })
 
 
+@login_required
+@require_POST
+def transaction_batch_create(request):
+    """거래 N 건 일괄 등록 API (오프라인 입력 동기화 등).
+
+    JSON 본문 {"transactions": [{"account", "category", "tx_type", "amount",
+    "occurred_at", "merchant", "memo"}, ...]} 또는 폼셋(form-TOTAL_FORMS ...) POST.
+    모두 유효할 때만 한 번에 저장하고, 하나라도 틀리면 아무것도 저장하지 않고
+    행별 오류를 400 으로 돌려준다.
+    """
+    if request.content_type == "application/json":
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "JSON 형식이 아닙니다."}, status=400)
+        rows = payload.get("transactions") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list):
+            return JsonResponse(
+                {"status": "error", "message": "transactions 목록이 필요합니다."}, status=400,
+            )
+        formset = BatchTransactionFormSet(
+            BatchTransactionFormSet.data_from_json(rows), user=request.user,
+        )
+    else:
+        formset = BatchTransactionFormSet(request.POST, user=request.user)
+
+    if not formset.is_valid():
+        return JsonResponse({
+            "status": "error",
+            "errors": [form.errors.get_json_data() for form in formset],
+            "non_form_errors": formset.non_form_errors().get_json_data(),
+        }, status=400)
+
+    created = batch.create_transactions(request.user, [form.cleaned_data for form in formset])
+    return JsonResponse({
+        "status": "ok",
+        "created": len(created),
+        "transactions": [{"id": tx.pk, "balance_after": tx.balance_after} for tx in created],
+    }, status=201)
+
+
 @login_required
 def transaction_update(request, pk):
-    """거래 수정. ① 기존 거래 잔액 되돌림 → ② 잔액 부족 검사 → ③ 새 거래 적용."""
+    """거래 수정. 잔액 부족 검사(기존 거래를 되돌린 잔액 기준) → ledger.revise()."""
     tx = get_object_or_404(Transaction, pk=pk, user=request.user)
-    old_account_id = tx.account_id
-    old_tx_type = tx.tx_type
-    old_amount = tx.amount
+    before = ledger.position(tx)
 
     balance_warning = None
     if request.method == "POST":
@@ -215,30 +297,25 @@ def transaction_update(request, pk):
         if form.is_valid():
             new_tx = form.save(commit=False)
 
-            # 1) 기존 거래 되돌림
-            _reverse_balance(old_account_id, old_tx_type, old_amount)
-
-            # 2) 잔액 부족 경고 (출금 시)
-            Account.objects.get(pk=old_account_id)  # refresh
-            new_account = Account.objects.get(pk=new_tx.account_id)
-            if new_tx.tx_type == "OUT" and new_account.balance < new_tx.amount:
+            # 잔액 부족 경고 (출금 시) — 같은 계좌면 기존 거래를 되돌린 잔액으로 비교
+            available = new_tx.account.balance
+            if new_tx.account_id == before.account_id:
+                available -= ledger.signed_amount(before.tx_type, before.amount)
+            if new_tx.tx_type == "OUT" and available < new_tx.amount:
                 balance_warning = (
                     f"잔액이 부족합니다. "
-                    f"현재 잔액: {new_account.balance:,}원, 출금 금액: {new_tx.amount:,}원"
+                    f"현재 잔액: {available:,}원, 출금 금액: {new_tx.amount:,}원"
                 )
                 if "confirm" not in request.POST:
-                    # 되돌림을 다시 원복
-                    _apply_balance(old_account_id, old_tx_type, old_amount)
                     return render(request, "transactions/transaction_form.html", {
                         "form": form,
                         "balance_warning": balance_warning,
                     })
 
-            # 3) 새 거래 적용
-            _apply_balance(new_tx.account_id, new_tx.tx_type, new_tx.amount)
-            new_account.refresh_from_db()
-            new_tx.balance_after = new_account.balance
-            new_tx.save()
+            try:
+                ledger.revise(new_tx, before)
+            except Transaction.DoesNotExist:
+                raise Http404("거래가 삭제되었습니다.")
             return redirect("transaction_detail", pk=tx.pk)
     else:
         form = TransactionForm(instance=tx, user=request.user)
@@ -253,9 +330,7 @@ def transaction_delete(request, pk):
     """거래 삭제 확인 → POST 시 잔액 복구 후 삭제."""
     tx = get_object_or_404(Transaction, pk=pk, user=request.user)
     if request.method == "POST":
-        # 잔액 되돌림
-        _reverse_balance(tx.account_id, tx.tx_type, tx.amount)
-        tx.delete()
+        ledger.remove(tx)
         return redirect("transaction_list")
     return render(request, "transactions/transaction_confirm_delete.html", {"tx": tx})
 
@@ -265,33 +340,56 @@ def transaction_delete(request, pk):
 # ──────────────────────────────────
 
 @login_required
+@csrf_exempt
 def attachment_upload(request, tx_pk):
-    """영수증 업로드. 이미 첨부파일이 있으면 상세 페이지로 리다이렉트."""
+    """영수증 업로드. 이미 첨부파일이 있으면 상세 페이지로 리다이렉트.
+
+    ReceiptUploadHandler 가 본문을 받는 중에 크기·형식을 검사한다 (uploads.py).
+    핸들러는 request.POST 를 처음 읽기 전에 끼워야 하는데 CsrfViewMiddleware 가 먼저
+    POST 를 읽으므로, 미들웨어 검사는 건너뛰고 핸들러를 끼운 뒤 csrf_protect 로 검사한다.
+    """
     tx = get_object_or_404(Transaction, pk=tx_pk, user=request.user)
     if hasattr(tx, "attachment"):
         return redirect("transaction_detail", pk=tx.pk)
 
+    handler = ReceiptUploadHandler(request)
+    request.upload_handlers.insert(0, handler)
+    return _attachment_upload(request, tx, handler)
+
+
+@csrf_protect
+def _attachment_upload(request, tx, handler):
     if request.method == "POST":
         form = AttachmentForm(request.POST, request.FILES)
-        if form.is_valid():
-            att = form.save(commit=False)
-            att.user = request.user
-            att.transaction = tx
-            att.original_name = request.FILES["file"].name
-            att.save()
+        if handler.error:
+            # 중간에 멈춘 업로드는 파일이 없으므로 '필수 항목' 대신 멈춘 이유를 보인다
+            form.errors["file"] = form.error_class([handler.error])
+        elif form.is_valid():
+            receipts.store(tx, form.cleaned_data["file"])
             return redirect("transaction_detail", pk=tx.pk)
     else:
         form = AttachmentForm()
     return render(request, "transactions/attachment_form.html", {"form": form, "tx": tx})
 
 
+@login_required
+@require_safe
+def attachment_download(request, tx_pk):
+    """영수증 파일 보기/다운로드. 본인 거래의 영수증만 (다른 유저는 404).
+
+    ETag·Last-Modified 로 조건부 요청에 304, Range 요청에 206 으로 답하고,
+    RECEIPT_SENDFILE 이 설정되어 있으면 파일 전송은 앞단 서버에 맡긴다 (serving.py).
+    """
+    attachment = get_object_or_404(Attachment, transaction_id=tx_pk, user=request.user)
+    return serving.serve_receipt(request, attachment)
+
+
 @login_required
 def attachment_delete(request, tx_pk):
-    """영수증 삭제. 스토리지의 실제 파일도 함께 삭제."""
+    """영수증 삭제. 같은 내용을 쓰는 다른 영수증이 없으면 파일도 삭제 (signals → receipts.release)."""
     tx = get_object_or_404(Transaction, pk=tx_pk, user=request.user)
     attachment = get_object_or_404(Attachment, transaction=tx, user=request.user)
     if request.method == "POST":
-        attachment.file.delete(save=False)
         attachment.delete()
         return redirect("transaction_detail", pk=tx.pk)
     return render(request, "transactions/attachment_confirm_delete.html", {
@@ -307,8 +405,8 @@ def attachment_delete(request, tx_pk):
 @login_required
 def recurring_list(request):
     """정기 거래 목록."""
-    items = RecurringTransaction.objects.filter(user=request.user).select_related(
-        "account", "category"
+    items = categories.attach(
+        list(RecurringTransaction.objects.filter(user=request.user).select_related("account"))
     )
     return render(request, "transactions/recurring_list.html", {"items": items})
 